@@ -31,9 +31,11 @@ def register_commands(cli):
     @click.option('--not-backed-up', is_flag=True, help='Only backup files not yet in S3 (raw only)')
     @click.option('--year', type=int, help='Backup files from specific year (raw only)')
     @click.option('--imaging-session', help='Backup specific imaging session (raw only)')
+    @click.option('--workers', '-w', type=click.IntRange(min=1),
+                  help='Files uploaded concurrently (processed only, default from s3_config.json)')
     @click.pass_context
     def backup(ctx, target, processing_session, all_sessions, incomplete,
-               subfolder, file_type, force, not_backed_up, year, imaging_session):
+               subfolder, file_type, force, not_backed_up, year, imaging_session, workers):
         """Upload files to S3 cloud storage.
 
         TARGET: Type of files to backup (raw, processed, database)
@@ -73,6 +75,9 @@ def register_commands(cli):
             # Backup specific file types
             python -m main backup processed --processing-session ID --file-type xisf --file-type jpg
 
+            # Upload processed files one at a time
+            python -m main backup processed --all-sessions --workers 1
+
             # Backup database
             python -m main backup database
         """
@@ -85,7 +90,7 @@ def register_commands(cli):
             elif target == 'processed':
                 _backup_processed_files(
                     config_path, processing_session, all_sessions, incomplete,
-                    subfolder, file_type, force, verbose
+                    subfolder, file_type, force, verbose, workers
                 )
             elif target == 'database':
                 _backup_database(verbose)
@@ -120,7 +125,7 @@ def _backup_raw_files(not_backed_up, year, imaging_session, verbose):
 
 
 def _backup_processed_files(config_path, session_id, all_sessions, incomplete,
-                            subfolder, file_type, force, verbose):
+                            subfolder, file_type, force, verbose, workers=None):
     """Backup processed files to S3.
 
     Args:
@@ -132,6 +137,7 @@ def _backup_processed_files(config_path, session_id, all_sessions, incomplete,
         file_type: Specific file types to backup
         force: Force backup even if unchanged
         verbose: Verbose output flag
+        workers: Files uploaded concurrently (None = configured default)
     """
     if not session_id and not all_sessions:
         click.echo("Error: Specify --processing-session or --all-sessions")
@@ -153,7 +159,7 @@ def _backup_processed_files(config_path, session_id, all_sessions, incomplete,
             sys.exit(1)
 
         db_service = DatabaseService(config)
-        backup_manager = ProcessingSessionFileBackup(config, s3_config, db_service)
+        backup_manager = ProcessingSessionFileBackup(config, s3_config, db_service, workers=workers)
 
         if session_id:
             _backup_single_session(
@@ -3,7 +3,6 @@
 import sys
 
 import click
-from tqdm import tqdm
 
 from cli.utils import (
     load_app_config,
@@ -87,12 +86,12 @@ def _catalog_raw_files(config, cameras, telescopes, filter_mappings, verbose):
 
     db_service = get_db_service(config, cameras, telescopes, filter_mappings)
 
-    # Scan for files
-    file_monitor = FileMonitor(config, lambda x: None)
-    fits_files = file_monitor.scan_quarantine()
+    # Scan for files, skipping unchanged files cataloged by an earlier run
+    file_monitor = FileMonitor(config, lambda x: None, db_service)
+    fits_files = file_monitor.scan_quarantine(skip_cataloged=True)
 
     if not fits_files:
-        click.echo("✓ No files found in quarantine directory")
+        click.echo("✓ No uncataloged files found in quarantine directory")
         return
 
     click.echo(f"Found {len(fits_files)} files to process...")
@@ -107,60 +106,53 @@ def _catalog_raw_files(config, cameras, telescopes, filter_mappings, verbose):
     )
 
     # Dispose the connection pool before forking child processes.
-    # process_files_optimized uses ProcessPoolExecutor which fork()s on Linux.
+    # iter_file_batches uses ProcessPoolExecutor which fork()s on Linux.
     # Forked workers inherit open SQLite fds; when they exit those fds are
     # closed, leaving the parent pool with dead connections that cause
     # "unable to open database file" on the next write.
     db_service.db_manager.engine.dispose()
 
-    # Extract metadata
+    # Extract metadata and write each batch as soon as it is ready, so an
+    # interrupted run keeps everything already cataloged
     click.echo("Extracting metadata from FITS files...")
-    df, session_data = fits_processor.process_files_optimized(fits_files)
+    session_ids = set()
+    extracted_count = 0
+    added_count = 0
+    duplicate_count = 0
+    errors = []  # Collect error details
 
-    if df.is_empty():
-        click.echo("✗ No valid metadata extracted from files")
-        return
+    for df, session_data, _ in fits_processor.iter_file_batches(fits_files):
+        if df.is_empty():
+            continue
+        extracted_count += len(df)
 
-    # Add sessions to database FIRST (before files that reference them)
-    session_added_count = 0
-    if session_data:
-        click.echo(f"Processing {len(session_data)} imaging sessions...")
+        # Add sessions to database FIRST (before files that reference them)
         for session in session_data:
             try:
                 db_service.add_imaging_session(session)
-                session_added_count += 1
+                session_ids.add(session['id'])
             except Exception as e:
                 if verbose:
                     click.echo(f"Error adding session {session['id']}: {e}")
 
-    # Add files to database (after sessions exist)
-    added_count = 0
-    duplicate_count = 0
-    error_count = 0
-    errors = []  # Collect error details
+        # Add files to database (after sessions exist) in chunked bulk transactions
+        try:
+            result = db_service.add_fits_files_bulk(df)
+        except Exception as e:
+            if verbose:
+                click.echo(f"\nError adding files: {e}")
+            raise
 
-    with tqdm(total=len(df), desc="Adding to database", disable=False) as pbar:
-        for row in df.iter_rows(named=True):
-            try:
-                success, is_duplicate = db_service.add_fits_file(row)
-                if success:
-                    if is_duplicate:
-                        duplicate_count += 1
-                    else:
-                        added_count += 1
-                else:
-                    error_count += 1
-                    filename = row.get('file', 'unknown')
-                    errors.append((filename, "Failed to add to database"))
-                pbar.update(1)
+        added_count += result['added']
+        duplicate_count += len(result['duplicates'])
+        errors.extend(result['errors'])
 
-            except Exception as e:
-                error_count += 1
-                filename = row.get('file', 'unknown')
-                errors.append((filename, str(e)))
-                if verbose:
-                    click.echo(f"\nError adding file: {e}")
-                pbar.update(1)
+    if extracted_count == 0:
+        click.echo("✗ No valid metadata extracted from files")
+        return
+
+    session_added_count = len(session_ids)
+    error_count = len(errors)
 
     # Clean up any orphaned imaging sessions (sessions with no files)
     orphaned_count = db_service.cleanup_orphaned_imaging_sessions()
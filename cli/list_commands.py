@@ -3,6 +3,7 @@
 import sys
 
 import click
+from sqlalchemy import func
 
 from cli.utils import (
     load_app_config,
@@ -245,13 +246,17 @@ def register_commands(cli):
             ))
             click.echo("-" * 100)
 
+            # Count files for all listed imaging sessions in one query
+            db_session = db_service.db_manager.get_session()
+            file_counts = dict(db_session.query(
+                FitsFile.imaging_session_id, func.count(FitsFile.id)
+            ).filter(
+                FitsFile.imaging_session_id.in_([s.id for s in sessions])
+            ).group_by(FitsFile.imaging_session_id).all())
+            db_session.close()
+
             for s in sessions:
-                # Count files for this imaging session
-                db_session = db_service.db_manager.get_session()
-                file_count = db_session.query(FitsFile).filter(
-                    FitsFile.imaging_session_id == s.id
-                ).count()
-                db_session.close()
+                file_count = file_counts.get(s.id, 0)
 
                 click.echo(format_table_row(
                     [
@@ -302,6 +307,13 @@ def register_commands(cli):
             query = query.order_by(ProcessingSession.created_at.desc())
 
             sessions = query.limit(limit).all()
+
+            # Count files for all listed processing sessions in one query
+            file_counts = dict(db_session.query(
+                ProcessingSessionFile.processing_session_id, func.count(ProcessingSessionFile.id)
+            ).filter(
+                ProcessingSessionFile.processing_session_id.in_([s.id for s in sessions])
+            ).group_by(ProcessingSessionFile.processing_session_id).all())
             db_session.close()
 
             if not sessions:
@@ -316,12 +328,7 @@ def register_commands(cli):
             click.echo("-" * 110)
 
             for s in sessions:
-                # Count files in this processing session
-                db_session = db_service.db_manager.get_session()
-                file_count = db_session.query(ProcessingSessionFile).filter(
-                    ProcessingSessionFile.processing_session_id == s.id
-                ).count()
-                db_session.close()
+                file_count = file_counts.get(s.id, 0)
 
                 click.echo(format_table_row(
                     [
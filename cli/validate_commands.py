@@ -22,18 +22,21 @@ def register_commands(cli):
     @click.option('--check-files/--no-check-files', default=True,
                   help='Check if physical files exist (raw only)')
     @click.option('--limit', type=int, help='Limit number of files to validate (raw only)')
+    @click.option('--full', is_flag=True,
+                  help='Re-score every file, not just new or changed ones (raw only)')
     @click.option('--remove-missing', is_flag=True,
                   help='Remove missing file records from database (raw only)')
     @click.option('--dry-run', is_flag=True,
                   help='Dry run mode for remove-missing (raw only)')
     @click.pass_context
-    def validate(ctx, target, check_files, limit, remove_missing, dry_run):
+    def validate(ctx, target, check_files, limit, full, remove_missing, dry_run):
         """Validate files and check database integrity.
 
         TARGET: What to validate (raw, database)
 
         RAW FILES:
             - Scores files for migration readiness (0-100 points)
+            - Only re-scores new or changed files unless --full is given
             - Categories: auto-migrate (≥95), needs-review (80-94), manual (<80)
             - Optionally checks if physical files exist
             - Can remove missing file records
@@ -49,6 +52,9 @@ def register_commands(cli):
             # Validate and check physical files exist
             python -m main validate raw --check-files
 
+            # Re-score every file
+            python -m main validate raw --full
+
             # Validate limited set
             python -m main validate raw --limit 100
 
@@ -72,7 +78,7 @@ def register_commands(cli):
             validator = FitsValidator(db_service)
 
             if target == 'raw':
-                _validate_raw_files(validator, check_files, limit, remove_missing, dry_run, verbose)
+                _validate_raw_files(validator, check_files, limit, full, remove_missing, dry_run, verbose)
             elif target == 'database':
                 _show_validation_summary(validator)
 
@@ -80,13 +86,14 @@ def register_commands(cli):
             handle_error(e, verbose)
 
 
-def _validate_raw_files(validator, check_files, limit, remove_missing, dry_run, verbose):
+def _validate_raw_files(validator, check_files, limit, full, remove_missing, dry_run, verbose):
     """Validate raw FITS files and optionally remove missing records.
 
     Args:
         validator: FitsValidator instance
         check_files: Whether to check physical file existence
         limit: Maximum files to validate
+        full: Re-score every file instead of only new or changed ones
         remove_missing: Whether to remove missing file records
         dry_run: Dry run mode for removal
         verbose: Verbose output flag
@@ -99,12 +106,13 @@ def _validate_raw_files(validator, check_files, limit, remove_missing, dry_run,
     if check_files:
         click.echo("Checking for missing files on disk...")
 
-    stats = validator.validate_all_files(limit=limit, check_files=check_files)
+    stats = validator.validate_all_files(limit=limit, check_files=check_files, full=full)
 
     click.echo("\n" + "=" * 60)
     click.echo("VALIDATION RESULTS")
     click.echo("=" * 60)
-    click.echo(f"Total files:      {stats['total']:>6}")
+    click.echo(f"Validated files:  {stats['total']:>6}")
+    click.echo(f"Unchanged:        {stats['skipped']:>6}  (already up to date)")
     click.echo(f"Auto-migrate:     {stats['auto_migrate']:>6}  (≥95 points)")
     click.echo(f"Needs review:     {stats['needs_review']:>6}  (80-94 points)")
     click.echo(f"Manual only:      {stats['manual_only']:>6}  (<80 points)")
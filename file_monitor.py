@@ -2,17 +2,117 @@
 
 import asyncio
 import logging
+import os
+import threading
 import time
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 from config import Config
+from processing.file_walker import iter_fits_files
 
 logger = logging.getLogger(__name__)
 
+# Try to import optional filesystem event library (inotify on Linux)
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+    logger.debug("watchdog not available - event monitoring will fall back to polling")
+
 UPLOAD_TOKEN_PREFIX = ".upload_token."
 
 
+class QuarantineEventHandler(FileSystemEventHandler):
+    """
+    Collect FITS file events from the quarantine tree for debouncing.
+    
+    Every create, modify, close-write or move into place records the time of
+    the latest event for that path. FileMonitor flushes paths once they have
+    been quiet for the settle period. Deletes and moves away are recorded so
+    FileMonitor can forget the path, and the removal of an upload token is
+    flagged so files held back during the upload can be swept up.
+    """
+    
+    def __init__(self, extensions: List[str], is_bad_file: Callable[[str], bool]):
+        super().__init__()
+        self.extensions = tuple(extensions)
+        self.is_bad_file = is_bad_file
+        self.pending: Dict[str, float] = {}
+        self.removed: List[str] = []
+        self.token_removed = False
+        self.lock = threading.Lock()
+    
+    def _touch(self, path: str):
+        if not path.endswith(self.extensions) or self.is_bad_file(path):
+            return
+        with self.lock:
+            self.pending[path] = time.monotonic()
+    
+    def on_created(self, event):
+        if not event.is_directory:
+            self._touch(event.src_path)
+    
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._touch(event.src_path)
+    
+    def on_closed(self, event):
+        if not event.is_directory:
+            self._touch(event.src_path)
+    
+    def _remove(self, path: str, is_directory: bool):
+        if not is_directory and Path(path).name.startswith(UPLOAD_TOKEN_PREFIX):
+            with self.lock:
+                self.token_removed = True
+            return
+        if not is_directory and not path.endswith(self.extensions):
+            return
+        with self.lock:
+            self.pending.pop(path, None)
+            self.removed.append(path)
+    
+    def on_deleted(self, event):
+        self._remove(event.src_path, event.is_directory)
+    
+    def on_moved(self, event):
+        self._remove(event.src_path, event.is_directory)
+        if not event.is_directory:
+            self._touch(event.dest_path)
+    
+    def pop_removed(self) -> List[str]:
+        """Remove and return paths (files or directories) deleted or moved away."""
+        with self.lock:
+            removed, self.removed = self.removed, []
+        return removed
+    
+    def pop_token_removed(self) -> bool:
+        """Return whether an upload token was removed since the last call."""
+        with self.lock:
+            token_removed, self.token_removed = self.token_removed, False
+        return token_removed
+    
+    def pop_settled(self, settle_seconds: float) -> List[str]:
+        """Remove and return paths with no events for settle_seconds."""
+        cutoff = time.monotonic() - settle_seconds
+        with self.lock:
+            settled = [p for p, t in self.pending.items() if t <= cutoff]
+            for p in settled:
+                del self.pending[p]
+        return settled
+    
+    def requeue(self, paths: List[str]):
+        """Put paths back so they are retried after another settle period."""
+        with self.lock:
+            now = time.monotonic()
+            for p in paths:
+                self.pending.setdefault(p, now)
+
+
 class FileMonitor:
     """Simple file monitoring with manual and periodic scan capabilities."""
     
@@ -24,52 +124,34 @@ class FileMonitor:
         self.is_monitoring = False
         self.last_scan_files: set = set()
         self.last_scan_time: Optional[float] = None
+        # Set while the inotify watcher runs; see _is_file_locked()
+        self.read_only_lock_check = False
         
     def find_fits_files(self, directory: str, skip_recent: bool = False, 
-                       skip_minutes: Optional[int] = None) -> List[str]:
+                       skip_minutes: Optional[int] = None,
+                       skip_cataloged: bool = False) -> List[str]:
         """
         Find all FITS files in directory and subdirectories.
         
+        The tree is walked with the parallel scandir walker and each file is
+        stat'ed once; the stat result is reused for the mtime check. When a
+        database service is available, the (path, size, mtime, inode) of
+        every file is stored in a persistent scan index that survives restarts.
+        
         Args:
             directory: Path to scan
             skip_recent: If True, skip files modified recently
             skip_minutes: Minutes to look back (defaults to monitoring interval)
+            skip_cataloged: If True, skip files that are unchanged since the
+                last scan and already cataloged, without opening them
         """
-        fits_files = []
-        directory_path = Path(directory)
-        
-        if not directory_path.exists():
+        if not Path(directory).exists():
             logger.warning(f"Directory does not exist: {directory}")
-            return fits_files
+            return []
         
         logger.info(f"Scanning directory: {directory}")
         
-        # Find files with configured extensions
-        for extension in self.config.file_monitoring.extensions:
-            pattern = f"**/*{extension}"
-            files = list(directory_path.glob(pattern))
-            fits_files.extend([str(f) for f in files])
-        
-        # Filter out files marked as bad
-        original_count = len(fits_files)
-        fits_files = [f for f in fits_files if not self._is_bad_file(f)]
-        bad_count = original_count - len(fits_files)
-        
-        if bad_count > 0:
-            logger.info(f"Filtered out {bad_count} bad files")
-        
-        # Filter out locked files
-        unlocked_files = []
-        for f in fits_files:
-            if not self._is_file_locked(f):
-                unlocked_files.append(f)
-            else:
-                logger.debug(f"Skipping locked file: {f}")
-        
-        locked_count = len(fits_files) - len(unlocked_files)
-        if locked_count > 0:
-            logger.info(f"Skipping {locked_count} locked files")
-        fits_files = unlocked_files
+        entries = list(self._iter_entries(directory, skip_cataloged))
         
         # Filter out recently modified files (for auto-scan)
         if skip_recent:
@@ -84,27 +166,158 @@ class FileMonitor:
                     skip_minutes = 30
             
             cutoff_time = time.time() - (skip_minutes * 60)
-            stable_files = []
+            stable_entries = []
             
-            for f in fits_files:
-                try:
-                    mtime = Path(f).stat().st_mtime
-                    if mtime < cutoff_time:
-                        stable_files.append(f)
-                    else:
-                        logger.debug(f"Skipping recent file: {f}")
-                except Exception as e:
-                    logger.warning(f"Error checking mtime for {f}: {e}")
-                    stable_files.append(f)  # Include if we can't check
+            for f, st in entries:
+                if st.st_mtime < cutoff_time:
+                    stable_entries.append((f, st))
+                else:
+                    logger.debug(f"Skipping recent file: {f}")
             
-            recent_count = len(fits_files) - len(stable_files)
+            recent_count = len(entries) - len(stable_entries)
             if recent_count > 0:
                 logger.info(f"Skipping {recent_count} recently modified files")
-            fits_files = stable_files
+            entries = stable_entries
         
+        fits_files = [f for f, _ in entries]
         logger.info(f"Found {len(fits_files)} FITS files in {directory}")
         return sorted(fits_files)
     
+    def iter_fits_files(self, directory: str, skip_cataloged: bool = False) -> Iterator[str]:
+        """
+        Lazily yield the FITS files find_fits_files() would return (without skip_recent).
+        
+        Paths come out while the walk is still running, so they can be fed
+        straight into OptimizedFitsProcessor.iter_file_batches(). The scan
+        index is read before this returns; it is updated as the walk goes,
+        and paths it no longer finds are only dropped if the iterator is
+        run to the end.
+        """
+        if not Path(directory).exists():
+            logger.warning(f"Directory does not exist: {directory}")
+            return iter(())
+        
+        entries = self._iter_entries(directory, skip_cataloged)
+        
+        def paths():
+            try:
+                for f, _ in entries:
+                    yield f
+            finally:
+                entries.close()
+        
+        return paths()
+    
+    def _iter_entries(self, directory: str,
+                      skip_cataloged: bool) -> Iterator[Tuple[str, os.stat_result]]:
+        """Walk, apply the scan index and drop locked files, yielding (path, stat)."""
+        entries = self._scan_directory(directory)
+        if self.db_service:
+            entries = self._apply_scan_state(directory, entries, skip_cataloged)
+        return self._skip_locked(entries)
+    
+    def _skip_locked(self, entries: Iterator[Tuple[str, os.stat_result]]
+                     ) -> Iterator[Tuple[str, os.stat_result]]:
+        locked_count = 0
+        try:
+            for f, st in entries:
+                if self._is_file_locked(f):
+                    logger.debug(f"Skipping locked file: {f}")
+                    locked_count += 1
+                    continue
+                yield f, st
+        finally:
+            entries.close()
+            if locked_count > 0:
+                logger.info(f"Skipping {locked_count} locked files")
+    
+    def _scan_directory(self, directory: str) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Walk directory with the parallel scandir walker, yielding (path, stat)
+        for every file with a configured extension that is not marked bad.
+        """
+        paths = iter_fits_files(directory, self.config.file_monitoring.extensions,
+                                exclude=self._is_bad_file)
+        try:
+            for path in paths:
+                try:
+                    yield path, os.stat(path)
+                except OSError as e:
+                    logger.warning(f"Error reading {path}: {e}")
+        finally:
+            paths.close()
+    
+    def _apply_scan_state(self, directory: str,
+                          entries: Iterator[Tuple[str, os.stat_result]],
+                          skip_cataloged: bool) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Load the persistent scan index and return entries filtered through it.
+        
+        Entries whose catalog row has since been deleted are flagged as not
+        cataloged again. As the returned iterator runs, files seen for the
+        first time are recorded as cataloged if the catalog already holds
+        their path, changed files as not yet cataloged, and paths no longer
+        under directory are dropped once the walk has finished. When
+        skip_cataloged is set, files that are unchanged (or new) and already
+        cataloged are left out.
+        """
+        try:
+            self.db_service.reconcile_scan_state()
+            state = self.db_service.get_scan_state()
+            catalog = self.db_service.get_cataloged_paths(directory)
+        except Exception as e:
+            logger.warning(f"Could not load scan index, scanning all files: {e}")
+            return entries
+        
+        return self._filter_scan_state(directory, entries, skip_cataloged, state, catalog)
+    
+    def _filter_scan_state(self, directory: str,
+                           entries: Iterator[Tuple[str, os.stat_result]],
+                           skip_cataloged: bool, state: Dict, catalog: Dict
+                           ) -> Iterator[Tuple[str, os.stat_result]]:
+        changed = {}
+        seeded = {}
+        seen = set()
+        skipped = 0
+        complete = False
+        
+        try:
+            for f, st in entries:
+                seen.add(f)
+                signature = (st.st_size, st.st_mtime, st.st_ino)
+                known = state.get(f)
+                
+                if known is None:
+                    changed[f] = signature
+                    if f in catalog:
+                        seeded[f] = catalog[f]
+                        if skip_cataloged:
+                            skipped += 1
+                            continue
+                elif known[:3] != signature:
+                    changed[f] = signature
+                elif skip_cataloged and known[3]:
+                    skipped += 1
+                    continue
+                
+                yield f, st
+            complete = True
+        finally:
+            entries.close()
+            # An interrupted walk has not seen every file, so nothing counts as removed
+            removed = []
+            if complete:
+                root = os.path.join(str(Path(directory)), '')
+                removed = [path for path in state if path.startswith(root) and path not in seen]
+            
+            try:
+                self.db_service.save_scan_state(changed, removed, cataloged=seeded)
+            except Exception as e:
+                logger.warning(f"Could not update scan index: {e}")
+            
+            if skipped > 0:
+                logger.info(f"Skipping {skipped} unchanged, already cataloged files")
+    
     def _find_upload_tokens(self, directory: str) -> List[str]:
         """
         Find active upload token files in the directory.
@@ -145,21 +358,27 @@ class FileMonitor:
         Check if file is locked (being written to).
         
         This prevents processing files that are actively being copied.
+        While the inotify watcher runs the file is opened read-only, since
+        closing a writable handle raises a close-write event for it.
         """
+        mode = 'rb' if self.read_only_lock_check else 'r+b'
         try:
             # Try to open in read+write mode (fails if locked on Windows)
-            with open(filepath, 'r+b'):
+            with open(filepath, mode):
                 return False
         except (IOError, PermissionError, OSError):
             return True
     
     def scan_quarantine(self, skip_recent: bool = False,
-                        respect_upload_tokens: bool = False) -> List[str]:
+                        respect_upload_tokens: bool = False,
+                        skip_cataloged: bool = False) -> List[str]:
         """
         Perform manual scan of quarantine directory.
 
         Args:
             skip_recent: If True, skip recently modified files (for auto-scan).
+            skip_cataloged: If True, skip files that are unchanged and already
+                cataloged according to the persistent scan index.
             respect_upload_tokens: If True, abort the scan when any
                 ``.upload_token.<machine>`` file is present, returning an empty
                 list.  Automatic/periodic scans should pass ``True`` here;
@@ -181,7 +400,8 @@ class FileMonitor:
                 )
                 return []
 
-        files = self.find_fits_files(self.config.paths.quarantine_dir, skip_recent=skip_recent)
+        files = self.find_fits_files(self.config.paths.quarantine_dir, skip_recent=skip_recent,
+                                     skip_cataloged=skip_cataloged)
         self.last_scan_time = time.time()
         return files
     
@@ -211,7 +431,8 @@ class FileMonitor:
 
         current_files = set(self.find_fits_files(
             self.config.paths.quarantine_dir,
-            skip_recent=skip_recent
+            skip_recent=skip_recent,
+            skip_cataloged=True
         ))
 
         # Find new files
@@ -257,7 +478,8 @@ class FileMonitor:
         else:
             self.last_scan_files = set(self.find_fits_files(
                 self.config.paths.quarantine_dir,
-                skip_recent=True  # Skip recent files on initial scan too
+                skip_recent=True,  # Skip recent files on initial scan too
+                skip_cataloged=True
             ))
         self.last_scan_time = time.time()
         logger.info(f"Initial scan found {len(self.last_scan_files)} existing files")
@@ -289,6 +511,164 @@ class FileMonitor:
                 logger.error(f"Error during periodic monitoring: {e}")
                 await asyncio.sleep(30)  # Wait before retrying
     
+    async def start_event_monitoring(self, settle_seconds: Optional[int] = None,
+                                     force_polling: bool = False):
+        """
+        Start event-driven monitoring of quarantine directory.
+        
+        Uses inotify (via watchdog) on Linux so new frames are picked up as
+        soon as they are written, instead of on the next periodic scan.
+        Events are debounced: a file is only passed to on_new_files once it
+        has had no create/write/close/move events for settle_seconds.
+        Upload tokens defer delivery exactly as for periodic scans; files
+        arriving during an upload are held until the tokens are removed.
+        Files the baseline scan skipped as too recent, and everything present
+        while a token was up, are swept into the pending set once the
+        baseline is taken and whenever the last token goes away.
+        
+        Falls back to a polling observer if inotify cannot be used, and to
+        start_periodic_monitoring() if watchdog is not installed.
+        
+        Args:
+            settle_seconds: Quiet period before a file is considered complete
+            force_polling: Use the polling observer even if inotify is available
+        """
+        if not WATCHDOG_AVAILABLE:
+            logger.warning("watchdog not installed - using periodic monitoring instead")
+            await self.start_periodic_monitoring()
+            return
+        
+        self.is_monitoring = True
+        quarantine_dir = self.config.paths.quarantine_dir
+        
+        if settle_seconds is None:
+            if self.db_service:
+                settle_seconds = self.db_service.get_setting(
+                    'monitoring.settle_seconds',
+                    30
+                )
+            else:
+                settle_seconds = 30
+        
+        handler = QuarantineEventHandler(
+            self.config.file_monitoring.extensions, self._is_bad_file
+        )
+        observer = self._start_observer(handler, quarantine_dir, force_polling)
+        self.read_only_lock_check = not isinstance(observer, PollingObserver)
+        
+        # Establish baseline exactly as periodic monitoring does
+        sweep_needed = True
+        if self._find_upload_tokens(quarantine_dir):
+            logger.info("Upload token present at monitoring start — baseline scan deferred.")
+            self.last_scan_files = set()
+        else:
+            self.last_scan_files = set(self.find_fits_files(
+                quarantine_dir,
+                skip_recent=True,
+                skip_cataloged=True
+            ))
+        self.last_scan_time = time.time()
+        logger.info(f"Initial scan found {len(self.last_scan_files)} existing files")
+        
+        try:
+            while self.is_monitoring:
+                await asyncio.sleep(1)
+                
+                if not self.is_monitoring:
+                    break
+                
+                try:
+                    for path in handler.pop_removed():
+                        self._forget_path(path)
+                    
+                    if handler.pop_token_removed():
+                        sweep_needed = True
+                    if sweep_needed and not self._find_upload_tokens(quarantine_dir):
+                        sweep_needed = False
+                        self._sweep_into(handler, quarantine_dir)
+                    
+                    settled = handler.pop_settled(settle_seconds)
+                    if not settled:
+                        continue
+                    
+                    # Hold everything back while an upload is in progress
+                    if self._find_upload_tokens(quarantine_dir):
+                        handler.requeue(settled)
+                        continue
+                    
+                    new_files = []
+                    for f in settled:
+                        # Already delivered; events for it are ours or a re-touch
+                        if f in self.last_scan_files:
+                            continue
+                        if not os.path.isfile(f):
+                            continue
+                        if self._is_file_locked(f):
+                            handler.requeue([f])
+                            continue
+                        new_files.append(f)
+                    
+                    new_files = sorted(set(new_files))
+                    self.last_scan_files.update(new_files)
+                    self.last_scan_time = time.time()
+                    
+                    if new_files and self.on_new_files:
+                        logger.info(f"Processing {len(new_files)} new files detected by watcher")
+                        result = self.on_new_files(new_files)
+                        if asyncio.iscoroutine(result):
+                            await result
+                
+                except Exception as e:
+                    logger.error(f"Error during event monitoring: {e}")
+                    await asyncio.sleep(30)  # Wait before retrying
+        
+        finally:
+            observer.stop()
+            observer.join(timeout=5)
+            self.read_only_lock_check = False
+    
+    def _forget_path(self, path: str):
+        """Drop a deleted or moved-away file, or everything under a directory."""
+        self.last_scan_files.discard(path)
+        prefix = path.rstrip(os.sep) + os.sep
+        stale = [f for f in self.last_scan_files if f.startswith(prefix)]
+        self.last_scan_files.difference_update(stale)
+    
+    def _sweep_into(self, handler: QuarantineEventHandler, directory: str):
+        """
+        Queue uncataloged files that have not been delivered yet.
+        
+        Catches files no event will report again: those still being written
+        when the baseline was taken, and those that arrived while an upload
+        token deferred the baseline. They go through the usual settle period.
+        """
+        files = [
+            f for f in self.find_fits_files(directory, skip_cataloged=True)
+            if f not in self.last_scan_files
+        ]
+        if files:
+            logger.info(f"Queueing {len(files)} files not yet delivered")
+            handler.requeue(files)
+    
+    def _start_observer(self, handler, directory: str, force_polling: bool = False):
+        """Start an inotify observer, falling back to polling if it fails."""
+        if not force_polling:
+            try:
+                observer = Observer()
+                observer.schedule(handler, directory, recursive=True)
+                observer.start()
+                logger.info(f"Watching {directory} for new files ({type(observer).__name__})")
+                return observer
+            except OSError as e:
+                # e.g. inotify watch limit reached on very large trees
+                logger.warning(f"Native file watcher unavailable ({e}), falling back to polling")
+        
+        observer = PollingObserver(timeout=60)
+        observer.schedule(handler, directory, recursive=True)
+        observer.start()
+        logger.info(f"Watching {directory} for new files (polling)")
+        return observer
+    
     def stop_monitoring(self):
         """Stop periodic monitoring."""
         self.is_monitoring = False
@@ -0,0 +1,164 @@
+"""
+Parallel file mover for migrating files from quarantine into the library.
+
+Moves are grouped by the device of their destination folder and each
+device gets its own thread pool, so a slow NAS target does not hold up
+moves to local disk. Moves within one filesystem are a single os.rename;
+moves across filesystems copy in chunks, fsync, and only then unlink the
+source, so an interrupted move never loses the original.
+"""
+
+import errno
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Read/write size for cross-device copies
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Concurrent moves per destination device
+DEFAULT_WORKERS_PER_DEVICE = 4
+
+
+@dataclass
+class MoveJob:
+    """A single file move; payload carries caller data such as the database id."""
+    src: Path
+    dest: Path
+    payload: Any = None
+
+
+@dataclass
+class MoveResult:
+    """Outcome of a MoveJob."""
+    job: MoveJob
+    moved: bool = False
+    skipped: bool = False  # Source did not exist
+    error: Optional[str] = None
+    stat: Optional[os.stat_result] = None  # Stat of the destination after the move
+
+
+def _fsync_directory(directory: Path):
+    """Flush a directory entry so a rename or new file survives a crash."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def move_file(src: Path, dest: Path, chunk_size: int = COPY_CHUNK_SIZE) -> os.stat_result:
+    """
+    Move src to dest, replacing dest if it exists.
+
+    Uses os.rename when both are on the same filesystem. Otherwise the file
+    is copied in chunks to a temporary name next to dest, fsynced, renamed
+    into place, and only then is the source unlinked.
+
+    Args:
+        src: Source file path
+        dest: Destination file path (parent directory must exist)
+        chunk_size: Copy chunk size for cross-device moves
+
+    Returns:
+        os.stat_result of the moved file
+    """
+    try:
+        os.rename(src, dest)
+        return os.stat(dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    tmp = dest.with_name(f".{dest.name}.part")
+    try:
+        with open(src, 'rb') as fsrc, open(tmp, 'wb') as fdst:
+            shutil.copyfileobj(fsrc, fdst, chunk_size)
+            fdst.flush()
+            os.fsync(fdst.fileno())
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    _fsync_directory(dest.parent)
+    os.unlink(src)
+    return os.stat(dest)
+
+
+def _run_job(job: MoveJob, chunk_size: int) -> MoveResult:
+    """Worker: perform one move and capture the outcome."""
+    try:
+        if not job.src.exists():
+            return MoveResult(job, skipped=True)
+        return MoveResult(job, moved=True, stat=move_file(job.src, job.dest, chunk_size))
+    except Exception as e:
+        return MoveResult(job, error=str(e))
+
+
+class ParallelFileMover:
+    """Runs MoveJobs concurrently with one worker pool per destination device."""
+
+    def __init__(self, workers_per_device: int = DEFAULT_WORKERS_PER_DEVICE,
+                 chunk_size: int = COPY_CHUNK_SIZE):
+        self.workers_per_device = max(1, workers_per_device)
+        self.chunk_size = chunk_size
+
+    def _group_by_device(self, jobs: Iterable[MoveJob]) -> Dict[int, List[MoveJob]]:
+        """Create destination folders and group jobs by their device id."""
+        device_of: Dict[Path, int] = {}
+        groups: Dict[int, List[MoveJob]] = {}
+
+        for job in jobs:
+            parent = job.dest.parent
+            if parent not in device_of:
+                parent.mkdir(parents=True, exist_ok=True)
+                device_of[parent] = os.stat(parent).st_dev
+            groups.setdefault(device_of[parent], []).append(job)
+
+        return groups
+
+    def iter_moves(self, jobs: Iterable[MoveJob]) -> Iterator[MoveResult]:
+        """
+        Move all jobs, yielding results in completion order.
+
+        Args:
+            jobs: Moves to perform
+
+        Yields:
+            MoveResult for every job
+        """
+        groups = self._group_by_device(jobs)
+        if not groups:
+            return
+
+        pools = [
+            ThreadPoolExecutor(max_workers=self.workers_per_device,
+                               thread_name_prefix=f"mover-{device}")
+            for device in groups
+        ]
+        try:
+            futures = [
+                pool.submit(_run_job, job, self.chunk_size)
+                for pool, device_jobs in zip(pools, groups.values())
+                for job in device_jobs
+            ]
+            logger.info(f"Moving {len(futures)} files across {len(groups)} destination device(s)")
+
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True, cancel_futures=True)
@@ -2,21 +2,31 @@
 
 import os
 import re
+import json
 import shutil
 import logging
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 import click
+from sqlalchemy import bindparam, update
 from tqdm import tqdm
 
 from models import DatabaseService, FitsFile, ImagingSession
 from config import Config
+from file_mover import DEFAULT_WORKERS_PER_DEVICE, MoveJob, ParallelFileMover
+from processing.parallel_processor import HASH_CHUNK_SIZE
+from processing.parallel_processor import file_stat_fields
 
 logger = logging.getLogger(__name__)
 
+# Planned moves of the running migration, kept next to the database until
+# every moved file's row is committed
+MIGRATION_JOURNAL_NAME = 'migration_journal.jsonl'
+
 
 class FileOrganizer:
     """Handles file organization and migration from quarantine to structured library."""
@@ -25,6 +35,14 @@ class FileOrganizer:
         self.config = config
         self.db_service = db_service
         
+        # Concurrent moves per destination device, and moved files per
+        # database commit during migration
+        self.move_workers_per_device = DEFAULT_WORKERS_PER_DEVICE
+        self.migration_batch_size = 200
+        
+        # Threads used to hash quarantine files that changed since cataloging
+        self.hash_workers = 4
+        
     def get_next_catalog_id(self) -> int:
         """Get the next available catalog ID from database."""
         session = self.db_service.db_manager.get_session()
@@ -37,6 +55,99 @@ class FileOrganizer:
         finally:
             session.close()
     
+    def _update_file_stat(self, db_record: FitsFile, filepath: Path):
+        """Refresh stored size/mtime/inode after a file moves (inode changes across devices)."""
+        for column, value in file_stat_fields(str(filepath)).items():
+            setattr(db_record, column, value)
+    
+    def _migration_update_statement(self):
+        """Bulk UPDATE that re-points a migrated row (matched by old id) at its new file.
+
+        file_not_found is cleared as well: the stat reconciler may have flagged
+        the row while its file was moved but the row not yet updated.
+        """
+        columns = ['id', 'file', 'folder', 'orig_file', 'orig_folder',
+                   'file_size', 'file_mtime', 'file_inode']
+        table = FitsFile.__table__
+        values = {column: bindparam(f'b_{column}') for column in columns}
+        values['file_not_found'] = False
+        return update(table).where(
+            table.c.id == bindparam('b_old_id')
+        ).values(values)
+    
+    def _migration_row(self, old_id: int, catalog_id: int, src: Path, dest: Path,
+                       st: os.stat_result) -> Dict:
+        """Parameters for _migration_update_statement() for one moved file."""
+        return {
+            'b_old_id': old_id,
+            'b_id': catalog_id,
+            'b_file': dest.name,
+            'b_folder': str(dest.parent),
+            'b_orig_file': self.strip_catalog_prefix(src.name),
+            'b_orig_folder': str(src.parent),
+            'b_file_size': st.st_size,
+            'b_file_mtime': st.st_mtime,
+            'b_file_inode': st.st_ino
+        }
+    
+    def _migration_journal_path(self) -> Path:
+        return Path(self.config.paths.database_path).parent / MIGRATION_JOURNAL_NAME
+    
+    def _write_migration_journal(self, jobs: List[MoveJob]):
+        """Record every planned move (row id, source, destination) before any file moves."""
+        journal = self._migration_journal_path()
+        tmp = journal.with_name(journal.name + '.tmp')
+        with open(tmp, 'w') as f:
+            for job in jobs:
+                _, file_record = job.payload
+                f.write(json.dumps({'id': file_record['id'], 'src': str(job.src),
+                                    'dest': str(job.dest)}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, journal)
+    
+    def recover_interrupted_migration(self, session) -> int:
+        """
+        Commit the moves of an interrupted migration that never reached the database.
+        
+        A journaled row is re-pointed at its destination when it still points
+        at its source, the source is gone and the destination exists. Rows
+        recovered this way get new catalog ids. The journal is removed after.
+        
+        Returns:
+            Number of rows recovered
+        """
+        journal = self._migration_journal_path()
+        if not journal.exists():
+            return 0
+        
+        with open(journal) as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        
+        current = {}
+        ids = [entry['id'] for entry in entries]
+        for start in range(0, len(ids), self.migration_batch_size):
+            for file_id, folder, file in session.query(FitsFile.id, FitsFile.folder, FitsFile.file).filter(
+                FitsFile.id.in_(ids[start:start + self.migration_batch_size])
+            ):
+                current[file_id] = Path(folder) / file
+        
+        rows = []
+        next_catalog_id = self.get_next_catalog_id()
+        for entry in entries:
+            src, dest = Path(entry['src']), Path(entry['dest'])
+            if current.get(entry['id']) != src or src.exists() or not dest.exists():
+                continue
+            rows.append(self._migration_row(entry['id'], next_catalog_id, src, dest, dest.stat()))
+            next_catalog_id += 1
+        
+        if rows:
+            session.execute(self._migration_update_statement(), rows)
+            session.commit()
+            logger.warning(f"Recovered {len(rows)} files moved by an interrupted migration")
+        journal.unlink()
+        return len(rows)
+    
     def strip_catalog_prefix(self, filename: str) -> str:
         """Strip existing 6-digit catalog ID prefix from filename."""
         # Match pattern like "000123_" at start of filename
@@ -172,13 +283,102 @@ class FileOrganizer:
         hash_md5 = hashlib.md5()
         try:
             with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
                     hash_md5.update(chunk)
             return hash_md5.hexdigest()
         except Exception as e:
             logger.error(f"Error calculating MD5 for {filepath}: {e}")
             return ""
     
+    def _find_duplicate_files(self, db_session, physical_files: List[Path],
+                              progress_callback=None) -> List[Path]:
+        """
+        Find quarantine files whose content is cataloged at another existing path.
+        
+        The md5 stored in the catalog is reused whenever the file's size and
+        mtime still match the cataloged values; only files that are new or
+        have changed since cataloging are hashed, in a thread pool. Matches
+        are then resolved with set-based md5 lookups instead of one query
+        per file.
+        
+        Args:
+            db_session: Database session
+            physical_files: Quarantine files to classify
+            progress_callback: Optional callback(done, total) while hashing
+            
+        Returns:
+            Files that duplicate another existing cataloged file
+        """
+        # Catalog rows for everything in quarantine, keyed by path
+        cataloged = {
+            os.path.join(folder, filename): (md5sum, size, mtime)
+            for folder, filename, md5sum, size, mtime in db_session.query(
+                FitsFile.folder, FitsFile.file, FitsFile.md5sum,
+                FitsFile.file_size, FitsFile.file_mtime
+            ).filter(FitsFile.in_folder_tree(self.config.paths.quarantine_dir))
+        }
+        
+        file_md5s: Dict[str, str] = {}
+        to_hash = []
+        for physical_file in physical_files:
+            path = str(physical_file)
+            entry = cataloged.get(path)
+            if entry and entry[0] and entry[1] is not None:
+                try:
+                    st = physical_file.stat()
+                except OSError:
+                    continue
+                if (st.st_size, st.st_mtime) == (entry[1], entry[2]):
+                    file_md5s[path] = entry[0]
+                    continue
+            to_hash.append(path)
+        
+        if to_hash:
+            logger.info(f"Hashing {len(to_hash)} new or changed files "
+                        f"({len(file_md5s)} reused from catalog)")
+            with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+                for done, (path, md5_hash) in enumerate(
+                    zip(to_hash, executor.map(self._get_file_md5, to_hash)), 1
+                ):
+                    if md5_hash:
+                        file_md5s[path] = md5_hash
+                    if progress_callback and (done % 10 == 0 or done == len(to_hash)):
+                        progress_callback(done, len(to_hash))
+        
+        # All cataloged paths for the md5s seen, in chunked IN queries
+        paths_by_md5: Dict[str, List[Tuple[str, bool]]] = {}
+        unique_md5s = list(set(file_md5s.values()))
+        for start in range(0, len(unique_md5s), 500):
+            for md5sum, folder, filename, not_found in db_session.query(
+                FitsFile.md5sum, FitsFile.folder, FitsFile.file, FitsFile.file_not_found
+            ).filter(FitsFile.md5sum.in_(unique_md5s[start:start + 500])):
+                paths_by_md5.setdefault(md5sum, []).append(
+                    (os.path.join(folder, filename), bool(not_found))
+                )
+        
+        # A file is a duplicate only if ANOTHER existing file has the same MD5
+        physical_paths = set(file_md5s)
+        exists_cache: Dict[str, bool] = {}
+        duplicates = []
+        
+        for physical_file in physical_files:
+            path = str(physical_file)
+            md5_hash = file_md5s.get(path)
+            if not md5_hash:
+                continue
+            
+            for record_path, not_found in paths_by_md5.get(md5_hash, ()):
+                if record_path == path or not_found:
+                    continue
+                if record_path not in physical_paths and record_path not in exists_cache:
+                    exists_cache[record_path] = os.path.exists(record_path)
+                if record_path in physical_paths or exists_cache[record_path]:
+                    logger.info(f"Found duplicate: {physical_file.name} matches {record_path}")
+                    duplicates.append(physical_file)
+                    break
+        
+        return duplicates
+    
     def _cleanup_orphaned_sessions(self, db_session):
         """Delete imaging sessions that have no associated files."""
         try:
@@ -335,9 +535,13 @@ class FileOrganizer:
                 click.echo("Getting files from database...")
                 update_progress(0, stage_weight)
                 
+                recovered = self.recover_interrupted_migration(session)
+                if recovered:
+                    click.echo(f"Recovered {recovered} files moved by an interrupted migration")
+                
                 # Get database records for files still in quarantine
                 db_files = session.query(FitsFile).filter(
-                    FitsFile.folder.like(f"%{self.config.paths.quarantine_dir}%")
+                    FitsFile.in_folder_tree(self.config.paths.quarantine_dir)
                 ).all()
                 
                 # Only migrate files with scores > 95, leave everything else in place
@@ -394,62 +598,73 @@ class FileOrganizer:
                         }
                         migration_records.append(record)
                     
-                    # Group by destination and migrate
+                    # Group by destination and plan every move up front
                     file_groups = self.group_files_by_destination(migration_records)
-                    next_catalog_id = self.get_next_catalog_id()
-                    current_catalog_id = next_catalog_id
-                    
                     click.echo(f"Organizing into {len(file_groups)} destination folders...")
                     
-                    total_files = len(migration_records)
+                    jobs = []
+                    for dest_path, group_files in file_groups.items():
+                        for seq_num, file_record in enumerate(group_files, 1):
+                            new_filename = self.generate_standardized_filename(file_record, seq_num)
+                            jobs.append(MoveJob(
+                                src=Path(file_record['folder']) / file_record['file'],
+                                dest=Path(dest_path) / new_filename,
+                                payload=(len(jobs), file_record)
+                            ))
+                    
+                    total_files = len(jobs)
                     files_processed = 0
+                    # Catalog ids follow plan order, as in a sequential migration;
+                    # files that fail to move leave gaps
+                    first_catalog_id = self.get_next_catalog_id()
+                    pending_updates = []
+                    
+                    # Moves made before a crash can be committed by the next run
+                    self._write_migration_journal(jobs)
+                    
+                    def flush_updates():
+                        """Apply completed moves to the database in one bulk update."""
+                        if not pending_updates:
+                            return
+                        rows = [
+                            self._migration_row(file_record['id'], first_catalog_id + plan_index,
+                                                src, dest, st)
+                            for plan_index, file_record, src, dest, st in pending_updates
+                        ]
+                        session.execute(self._migration_update_statement(), rows)
+                        session.commit()
+                        pending_updates.clear()
+                    
+                    mover = ParallelFileMover(workers_per_device=self.move_workers_per_device)
                     
                     with tqdm(total=total_files, desc="Migrating files") as pbar:
-                        for dest_path, group_files in file_groups.items():
-                            os.makedirs(dest_path, exist_ok=True)
+                        for result in mover.iter_moves(jobs):
+                            stats['processed'] += 1
+                            files_processed += 1
+                            plan_index, file_record = result.job.payload
                             
-                            for seq_num, file_record in enumerate(group_files, 1):
-                                try:
-                                    stats['processed'] += 1
-                                    files_processed += 1
-                                    
-                                    old_filepath = Path(file_record['folder']) / file_record['file']
-                                    
-                                    if not old_filepath.exists():
-                                        logger.warning(f"Source file not found: {old_filepath}")
-                                        stats['skipped'] += 1
-                                        pbar.update(1)
-                                        continue
-                                    
-                                    new_filename = self.generate_standardized_filename(file_record, seq_num)
-                                    new_filepath = Path(dest_path) / new_filename
-                                    orig_filename = self.strip_catalog_prefix(file_record['file'])
-                                    
-                                    shutil.move(str(old_filepath), str(new_filepath))
-                                    
-                                    db_record = session.query(FitsFile).filter_by(id=file_record['id']).first()
-                                    if db_record:
-                                        db_record.id = current_catalog_id
-                                        db_record.file = new_filename
-                                        db_record.folder = dest_path
-                                        db_record.orig_file = orig_filename
-                                        db_record.orig_folder = file_record['folder']
-                                        current_catalog_id += 1
-                                    
-                                    stats['moved'] += 1
-                                    
-                                    # Update progress every 10 files or at completion
-                                    if files_processed % 10 == 0 or files_processed == total_files:
-                                        file_progress = (files_processed / total_files) * 100
-                                        update_progress(file_progress, stage_weight)
-                                    
-                                except Exception as e:
-                                    logger.error(f"Error processing file {file_record['file']}: {e}")
-                                    stats['errors'] += 1
-                                
-                                pbar.update(1)
+                            if result.skipped:
+                                logger.warning(f"Source file not found: {result.job.src}")
+                                stats['skipped'] += 1
+                            elif result.error:
+                                logger.error(f"Error processing file {file_record['file']}: {result.error}")
+                                stats['errors'] += 1
+                            else:
+                                pending_updates.append((plan_index, file_record, result.job.src,
+                                                        result.job.dest, result.stat))
+                                stats['moved'] += 1
+                                if len(pending_updates) >= self.migration_batch_size:
+                                    flush_updates()
+                            
+                            # Update progress every 10 files or at completion
+                            if files_processed % 10 == 0 or files_processed == total_files:
+                                file_progress = (files_processed / total_files) * 100
+                                update_progress(file_progress, stage_weight)
+                            
+                            pbar.update(1)
                     
-                    session.commit()
+                    flush_updates()
+                    self._migration_journal_path().unlink()
                     click.echo(f"Database migration complete: {stats['moved']} files moved")
                 
                 current_progress += 70  # Stage 1 complete
@@ -468,53 +683,33 @@ class FileOrganizer:
                 if remaining_files:
                     click.echo(f"Found {len(remaining_files)} remaining files to categorize...")
                     
-                    duplicates_to_move = []
                     bad_files_to_move = []
                     total_remaining = len(remaining_files)
                     
+                    # Check for bad files (case-insensitive check for BAD_ prefix)
+                    candidates = []
+                    for physical_file in remaining_files:
+                        if physical_file.name.upper().startswith("BAD_"):
+                            bad_files_to_move.append(physical_file)
+                        else:
+                            candidates.append(physical_file)
+                    
+                    # Check for duplicates; anything not duplicate or bad is
+                    # left in quarantine for manual review
                     with tqdm(total=total_remaining, desc="Categorizing files") as pbar:
-                        for idx, physical_file in enumerate(remaining_files):
-
-                            # Check for bad files (case-insensitive check for BAD_ prefix)
-                            if physical_file.name.upper().startswith("BAD_"):
-                                bad_files_to_move.append(physical_file)
-                                pbar.update(1)
-                                continue
-
-                            # Check for duplicates
-                            # A file is a duplicate only if ANOTHER file (not itself) has the same MD5
-                            md5_hash = self._get_file_md5(str(physical_file))
-                            if md5_hash:
-                                # Get all records with this MD5
-                                all_records = session.query(FitsFile).filter_by(md5sum=md5_hash).all()
-
-                                # Check if any OTHER file (different path) exists with this MD5
-                                is_duplicate = False
-                                physical_file_str = str(physical_file)
-
-                                for record in all_records:
-                                    record_path = Path(record.folder) / record.file
-                                    record_path_str = str(record_path)
-
-                                    # Is this a different file than the one we're checking?
-                                    if record_path_str != physical_file_str:
-                                        # Does that different file exist?
-                                        if record_path.exists():
-                                            is_duplicate = True
-                                            logger.info(f"Found duplicate: {physical_file.name} matches {record_path}")
-                                            break
-
-                                if is_duplicate:
-                                    duplicates_to_move.append(physical_file)
-
-                            # If not duplicate or bad, leave in quarantine for manual review
-
-                            # Update progress every 10 files
-                            if (idx + 1) % 10 == 0 or (idx + 1) == total_remaining:
-                                cat_progress = ((idx + 1) / total_remaining) * 100
-                                update_progress(cat_progress, stage_weight)
-
-                            pbar.update(1)
+                        pbar.update(len(bad_files_to_move))
+                        
+                        def hash_progress(done, total):
+                            pbar.n = len(bad_files_to_move) + done
+                            pbar.refresh()
+                            update_progress(done / total * 100, stage_weight)
+                        
+                        duplicates_to_move = self._find_duplicate_files(
+                            session, candidates, progress_callback=hash_progress
+                        )
+                        pbar.n = total_remaining
+                        pbar.refresh()
+                    update_progress(100, stage_weight)
                     
                     # Move bad files
                     if bad_files_to_move:
@@ -538,6 +733,7 @@ class FileOrganizer:
 
                                         if db_record:
                                             db_record.folder = str(bad_files_folder)
+                                            self._update_file_stat(db_record, bad_dest)
                                             db_session.commit()
                                     finally:
                                         db_session.close()
@@ -570,6 +766,7 @@ class FileOrganizer:
 
                                         if db_record:
                                             db_record.folder = str(duplicates_folder)
+                                            self._update_file_stat(db_record, duplicate_dest)
                                             db_session.commit()
                                     finally:
                                         db_session.close()
@@ -657,7 +854,7 @@ class FileOrganizer:
         try:
             # Get database records for files ready to migrate (validation score > 95)
             db_files = session.query(FitsFile).filter(
-                FitsFile.folder.like(f"%{self.config.paths.quarantine_dir}%"),
+                FitsFile.in_folder_tree(self.config.paths.quarantine_dir),
                 FitsFile.validation_score > 95.0
             ).limit(limit).all()
 
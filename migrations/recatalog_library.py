@@ -99,18 +99,12 @@ def recatalog(report_path: Path, dry_run: bool = False, batch_size: int = 50,
         batch_dup = 0
         batch_err = 0
         if not df.is_empty():
-            for row in df.iter_rows(named=True):
-                try:
-                    success, is_duplicate = db_service.add_fits_file(row)
-                    if is_duplicate:
-                        batch_dup += 1
-                    elif success:
-                        batch_added += 1
-                    else:
-                        batch_err += 1
-                except Exception as e:
-                    print(f"  ERROR adding {row.get('file', '?')}: {e}")
-                    batch_err += 1
+            result = db_service.add_fits_files_bulk(df)
+            for filename, error in result['errors']:
+                print(f"  ERROR adding {filename}: {error}")
+            batch_added = result['added']
+            batch_dup = len(result['duplicates'])
+            batch_err = len(result['errors'])
 
         print(f"  added={batch_added}  duplicates={batch_dup}  errors={batch_err}")
         total_added += batch_added
@@ -13,14 +13,17 @@ Changes from Phase 2:
 """
 
 import logging
+import os
+import time
 import warnings
 from datetime import datetime
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Callable, Iterable
 
 from sqlalchemy import (
     Boolean, DateTime, Float, Integer, String, Text,
-    create_engine, Column, Index, ForeignKey, event, inspect, text
+    and_, bindparam, create_engine, Column, Index, ForeignKey, event, inspect, insert, or_, text, update
 )
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, synonym
 from sqlalchemy.sql import func
@@ -156,6 +159,12 @@ class FitsFile(Base):
     bad = Column(Boolean, default=False)
     file_not_found = Column(Boolean, default=False)
 
+    # On-disk stat captured at catalog/migration time (kept current by
+    # DatabaseService.reconcile_file_stats) so size totals never touch disk
+    file_size = Column(Integer)
+    file_mtime = Column(Float)
+    file_inode = Column(Integer)
+
     # Original location tracking
     orig_file = Column(String(255))
     orig_folder = Column(String(500))
@@ -164,6 +173,8 @@ class FitsFile(Base):
     validation_score = Column(Float)
     migration_ready = Column(Boolean, default=False)
     validation_notes = Column(Text)
+    # Fingerprint of the scored fields and equipment facts behind validation_score
+    validation_fingerprint = Column(String(16))
 
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -180,8 +191,52 @@ class FitsFile(Base):
         Index('idx_software_creator', 'software_creator'),
         Index('idx_observer', 'observer'),
         Index('idx_sky_quality', 'sky_quality_mpsas'),
+        Index('idx_folder', 'folder'),
+        Index('idx_created_at', 'created_at'),
+        # Sort keys of the file browser: keyset pagination orders by column, id,
+        # which a single-column index (implicitly ending in rowid) covers
+        Index('idx_obs_date', 'obs_date'),
+        Index('idx_file', 'file'),
+        Index('idx_object', 'object'),
+        Index('idx_frame_type', 'frame_type'),
+        Index('idx_camera', 'camera'),
+        Index('idx_telescope', 'telescope'),
+        Index('idx_filter', 'filter'),
+        Index('idx_exposure', 'exposure'),
+        # Common file browser filters combined with the default date sort
+        Index('idx_frame_type_date', 'frame_type', 'obs_date'),
+        Index('idx_camera_date', 'camera', 'obs_date'),
     )
 
+    @classmethod
+    def in_folder_tree(cls, directory: str):
+        """SQL filter for files in directory or below it.
+
+        Expressed as a range on folder rather than LIKE '%dir%' so SQLite
+        can use idx_folder.
+        """
+        root = str(directory).rstrip(os.sep) or os.sep
+        prefix = root if root.endswith(os.sep) else root + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        return or_(cls.folder == root, and_(cls.folder >= prefix, cls.folder < upper))
+
+    @classmethod
+    def filename_contains(cls, pattern: str, indexed: bool = False):
+        """SQL filter for files whose name contains pattern (LIKE wildcards allowed).
+
+        With indexed set the match runs against the fits_files_fts trigram
+        index (see DatabaseManager.filename_search_index) instead of scanning
+        every filename.
+        """
+        like = f'%{pattern}%'
+        if not indexed:
+            return cls.file.like(like)
+        return cls.id.in_(
+            text("SELECT rowid FROM fits_files_fts WHERE file LIKE :filename_like")
+            .bindparams(filename_like=like)
+            .columns(rowid=Integer)
+        )
+
 
 class ProcessLog(Base):
     """Log of processing sessions."""
@@ -422,6 +477,180 @@ class ProcessedFile(Base):
         return f"<ProcessedFile(id={self.id}, filename='{self.filename}', type='{self.file_type}')>"
 
 
+class QuarantineScanState(Base):
+    """Persistent index of files seen by the quarantine monitor.
+
+    Lets the monitor skip files that are unchanged since the last scan and
+    already cataloged, without opening them, even across restarts.
+    """
+    __tablename__ = 'quarantine_scan_state'
+
+    path = Column(String(1000), primary_key=True)
+    size = Column(Integer)
+    mtime = Column(Float)
+    inode = Column(Integer)
+    cataloged = Column(Boolean, default=False)
+    md5sum = Column(String(32))  # Catalog entry the file matched, to notice its removal
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<QuarantineScanState(path='{self.path}', cataloged={self.cataloged})>"
+
+
+class FitsFileStats(Base):
+    """Frame totals per night and equipment, for the dashboard.
+
+    Maintained by SQLite triggers on fits_files (see
+    DatabaseManager._create_stats_triggers), so every insert, update and
+    delete keeps it current whichever code path makes it. Unknown values
+    are stored as '' so they take part in the primary key.
+    """
+    __tablename__ = 'fits_file_stats'
+
+    obs_day = Column(String(10), primary_key=True)
+    camera = Column(String(50), primary_key=True)
+    telescope = Column(String(50), primary_key=True)
+    filter = Column(String(20), primary_key=True)
+    frame_type = Column(String(20), primary_key=True)
+
+    file_count = Column(Integer, nullable=False, default=0)
+    total_exposure = Column(Float, nullable=False, default=0)
+    total_size = Column(Integer, nullable=False, default=0)  # Files still on disk
+    missing_count = Column(Integer, nullable=False, default=0)
+    review_count = Column(Integer, nullable=False, default=0)  # Score 80-95
+    manual_count = Column(Integer, nullable=False, default=0)  # Score above 0, below 80
+    unscored_count = Column(Integer, nullable=False, default=0)
+
+
+class FitsObjectStats(Base):
+    """LIGHT frame counts per object, year and equipment (trigger-maintained like FitsFileStats)."""
+    __tablename__ = 'fits_object_stats'
+
+    obs_year = Column(String(4), primary_key=True)
+    camera = Column(String(50), primary_key=True)
+    telescope = Column(String(50), primary_key=True)
+    object = Column(String(100), primary_key=True)
+
+    frame_count = Column(Integer, nullable=False, default=0)
+
+
+class FitsFacetCount(Base):
+    """File counts per combination of the file browser's filter columns.
+
+    Backs the filter dropdowns: the distinct values of one column, with
+    counts, restricted by selections in the others, come from a GROUP BY
+    here instead of a DISTINCT scan of fits_files. Trigger-maintained like
+    FitsFileStats; unknown values are stored as ''.
+    """
+    __tablename__ = 'fits_facet_counts'
+
+    frame_type = Column(String(20), primary_key=True)
+    camera = Column(String(50), primary_key=True)
+    telescope = Column(String(50), primary_key=True)
+    object = Column(String(100), primary_key=True)
+    filter = Column(String(20), primary_key=True)
+    obs_date = Column(String(10), primary_key=True)
+
+    file_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('idx_facet_camera', 'camera'),
+        Index('idx_facet_object', 'object'),
+        Index('idx_facet_obs_date', 'obs_date'),
+    )
+
+
+# Stats columns derived from one fits_files row ({row} is NEW or OLD)
+_FILE_STATS_KEY = ("COALESCE({row}.obs_date, '')", "COALESCE({row}.camera, '')",
+                   "COALESCE({row}.telescope, '')", "COALESCE({row}.filter, '')",
+                   "COALESCE({row}.frame_type, '')")
+_FILE_STATS_VALUES = {
+    'file_count': "1",
+    'total_exposure': "COALESCE({row}.exposure, 0)",
+    'total_size': "CASE WHEN {row}.file_not_found IS NOT 1 THEN COALESCE({row}.file_size, 0) ELSE 0 END",
+    'missing_count': "CASE WHEN {row}.file_not_found = 1 THEN 1 ELSE 0 END",
+    'review_count': "CASE WHEN {row}.validation_score BETWEEN 80 AND 95 THEN 1 ELSE 0 END",
+    'manual_count': "CASE WHEN {row}.validation_score > 0 AND {row}.validation_score < 80 THEN 1 ELSE 0 END",
+    'unscored_count': "CASE WHEN {row}.validation_score IS NULL THEN 1 ELSE 0 END",
+}
+_OBJECT_STATS_KEY = ("substr(COALESCE({row}.obs_date, ''), 1, 4)", "COALESCE({row}.camera, '')",
+                     "COALESCE({row}.telescope, '')", "{row}.object")
+_OBJECT_STATS_FILTER = "{row}.frame_type = 'LIGHT' AND {row}.object IS NOT NULL AND {row}.object != ''"
+
+# Columns whose change moves a row between stats buckets
+_STATS_SOURCE_COLUMNS = ('obs_date', 'camera', 'telescope', 'filter', 'frame_type', 'object',
+                         'exposure', 'file_size', 'file_not_found', 'validation_score')
+_STATS_TRIGGERS = ('fits_stats_insert', 'fits_stats_delete', 'fits_stats_update')
+# Triggers keeping fits_files_fts in step with fits_files. A migration changes
+# a row's id (the index rowid) along with its file, so updates of either
+# re-index the row.
+_FTS_TRIGGERS = {
+    'fits_fts_insert': (
+        "CREATE TRIGGER fits_fts_insert AFTER INSERT ON fits_files BEGIN "
+        "INSERT INTO fits_files_fts (rowid, file) VALUES (NEW.id, NEW.file); END"
+    ),
+    'fits_fts_delete': (
+        "CREATE TRIGGER fits_fts_delete AFTER DELETE ON fits_files BEGIN "
+        "INSERT INTO fits_files_fts (fits_files_fts, rowid, file) "
+        "VALUES ('delete', OLD.id, OLD.file); END"
+    ),
+    'fits_fts_update': (
+        "CREATE TRIGGER fits_fts_update AFTER UPDATE OF id, file ON fits_files BEGIN "
+        "INSERT INTO fits_files_fts (fits_files_fts, rowid, file) "
+        "VALUES ('delete', OLD.id, OLD.file); "
+        "INSERT INTO fits_files_fts (rowid, file) VALUES (NEW.id, NEW.file); END"
+    ),
+}
+
+# fits_facet_counts key columns, each taken from the fits_files column of the same name
+_FACET_COLUMNS = ('frame_type', 'camera', 'telescope', 'object', 'filter', 'obs_date')
+_FACET_TRIGGERS = ('fits_facets_insert', 'fits_facets_delete', 'fits_facets_update')
+
+
+def _stats_trigger_body(row: str, sign: str) -> str:
+    """Statements adding (sign '') or removing (sign '-') one row's contribution."""
+    file_key = ['obs_day', 'camera', 'telescope', 'filter', 'frame_type']
+    values = [v.format(row=row) for v in _FILE_STATS_KEY]
+    values += [f"{sign}({v.format(row=row)})" for v in _FILE_STATS_VALUES.values()]
+    updates = ', '.join(f"{col} = {col} + excluded.{col}" for col in _FILE_STATS_VALUES)
+    statements = [
+        f"INSERT INTO fits_file_stats ({', '.join(file_key + list(_FILE_STATS_VALUES))}) "
+        f"VALUES ({', '.join(values)}) "
+        f"ON CONFLICT ({', '.join(file_key)}) DO UPDATE SET {updates};",
+        f"INSERT INTO fits_object_stats (obs_year, camera, telescope, object, frame_count) "
+        f"SELECT {', '.join(v.format(row=row) for v in _OBJECT_STATS_KEY)}, {sign}1 "
+        f"WHERE {_OBJECT_STATS_FILTER.format(row=row)} "
+        f"ON CONFLICT (obs_year, camera, telescope, object) "
+        f"DO UPDATE SET frame_count = frame_count + excluded.frame_count;",
+    ]
+    if sign:
+        # Drop buckets that became empty
+        statements += [
+            "DELETE FROM fits_file_stats WHERE file_count = 0 AND "
+            + ' AND '.join(f"{col} = {v.format(row=row)}" for col, v in zip(file_key, _FILE_STATS_KEY)) + ";",
+            "DELETE FROM fits_object_stats WHERE frame_count = 0 AND "
+            + ' AND '.join(f"{col} = {v.format(row=row)}" for col, v in
+                           zip(['obs_year', 'camera', 'telescope', 'object'], _OBJECT_STATS_KEY)) + ";",
+        ]
+    return '\n'.join(statements)
+
+
+def _facet_trigger_body(row: str, sign: str) -> str:
+    """Statements adding (sign '') or removing (sign '-') one row's facet count."""
+    key = ', '.join(f"COALESCE({row}.{col}, '')" for col in _FACET_COLUMNS)
+    statements = [
+        f"INSERT INTO fits_facet_counts ({', '.join(_FACET_COLUMNS)}, file_count) "
+        f"VALUES ({key}, {sign}1) "
+        f"ON CONFLICT ({', '.join(_FACET_COLUMNS)}) DO UPDATE SET file_count = file_count + excluded.file_count;",
+    ]
+    if sign:
+        statements.append(
+            "DELETE FROM fits_facet_counts WHERE file_count = 0 AND "
+            + ' AND '.join(f"{col} = COALESCE({row}.{col}, '')" for col in _FACET_COLUMNS) + ";"
+        )
+    return '\n'.join(statements)
+
+
 class SystemSettings(Base):
     """Runtime system settings that persist across restarts."""
     __tablename__ = 'system_settings'
@@ -446,8 +675,12 @@ class SchemaVersion(Base):
 class DatabaseManager:
     """Database connection and session management."""
 
-    def __init__(self, connection_string: str):
-        self.engine = create_engine(connection_string, echo=False, pool_pre_ping=True)
+    def __init__(self, connection_string: str, pool_size: Optional[int] = None):
+        """pool_size: connections kept open (default: SQLAlchemy's 5 + overflow 10)."""
+        engine_kwargs = {}
+        if pool_size:
+            engine_kwargs = {'pool_size': pool_size, 'max_overflow': pool_size}
+        self.engine = create_engine(connection_string, echo=False, pool_pre_ping=True, **engine_kwargs)
 
         if 'sqlite' in connection_string:
             @event.listens_for(self.engine, "connect")
@@ -460,10 +693,17 @@ class DatabaseManager:
 
         self.SessionLocal = sessionmaker(bind=self.engine)
 
+        # Set by create_tables() once the fits_files_fts trigram index exists
+        self.filename_search_index = False
+
     def create_tables(self):
         """Create all tables and add any columns missing from existing tables."""
         Base.metadata.create_all(bind=self.engine)
         self._add_missing_columns()
+        self._add_missing_indexes()
+        self._create_stats_triggers()
+        self._create_facet_triggers()
+        self._create_filename_search_index()
 
     def _add_missing_columns(self):
         """Add columns present in the model but absent from the database.
@@ -491,6 +731,155 @@ class DatabaseManager:
                     logger.info("Added missing column: %s.%s", table_name, column.name)
                 conn.commit()
 
+    def _add_missing_indexes(self):
+        """Create model indexes that are absent from existing tables.
+
+        create_all() only creates indexes together with new tables, so
+        indexes added to an existing model are created here.
+        """
+        for table in Base.metadata.tables.values():
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+
+    def _create_stats_triggers(self):
+        """Create the triggers maintaining fits_file_stats / fits_object_stats.
+
+        When the triggers are new the stats tables are rebuilt from
+        fits_files in the same transaction, so they start out consistent.
+        """
+        if self.engine.dialect.name != 'sqlite':
+            return
+
+        with self.engine.begin() as conn:
+            existing = {row[0] for row in conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'fits_stats_%'"
+            ))}
+            if existing.issuperset(_STATS_TRIGGERS):
+                return
+
+            for name in existing:
+                conn.execute(text(f"DROP TRIGGER {name}"))
+            conn.execute(text(
+                f"CREATE TRIGGER fits_stats_insert AFTER INSERT ON fits_files BEGIN\n"
+                f"{_stats_trigger_body('NEW', '')}\nEND"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER fits_stats_delete AFTER DELETE ON fits_files BEGIN\n"
+                f"{_stats_trigger_body('OLD', '-')}\nEND"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER fits_stats_update AFTER UPDATE OF {', '.join(_STATS_SOURCE_COLUMNS)} "
+                f"ON fits_files BEGIN\n"
+                f"{_stats_trigger_body('OLD', '-')}\n{_stats_trigger_body('NEW', '')}\nEND"
+            ))
+            self._rebuild_stats(conn)
+            logger.info("Created catalog statistics triggers")
+
+    def _create_facet_triggers(self):
+        """Create the triggers maintaining fits_facet_counts, backfilling it when they are new."""
+        if self.engine.dialect.name != 'sqlite':
+            return
+
+        with self.engine.begin() as conn:
+            existing = {row[0] for row in conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'fits_facets_%'"
+            ))}
+            if existing.issuperset(_FACET_TRIGGERS):
+                return
+
+            for name in existing:
+                conn.execute(text(f"DROP TRIGGER {name}"))
+            conn.execute(text(
+                f"CREATE TRIGGER fits_facets_insert AFTER INSERT ON fits_files BEGIN\n"
+                f"{_facet_trigger_body('NEW', '')}\nEND"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER fits_facets_delete AFTER DELETE ON fits_files BEGIN\n"
+                f"{_facet_trigger_body('OLD', '-')}\nEND"
+            ))
+            # Only changes to a facet column move a row to another combination
+            conn.execute(text(
+                f"CREATE TRIGGER fits_facets_update AFTER UPDATE OF {', '.join(_FACET_COLUMNS)} "
+                f"ON fits_files BEGIN\n"
+                f"{_facet_trigger_body('OLD', '-')}\n{_facet_trigger_body('NEW', '')}\nEND"
+            ))
+            self._rebuild_facets(conn)
+            logger.info("Created filter facet triggers")
+
+    def _create_filename_search_index(self):
+        """Create the FTS5 trigram index on fits_files.file used for filename search.
+
+        The index is an external-content table kept current by triggers, so
+        filenames are not stored twice. SQLite builds without FTS5 or the
+        trigram tokenizer (before 3.34) fall back to LIKE on fits_files.
+        """
+        if self.engine.dialect.name != 'sqlite':
+            return
+
+        try:
+            with self.engine.begin() as conn:
+                existing = dict(conn.execute(text(
+                    "SELECT name, sql FROM sqlite_master WHERE name = 'fits_files_fts' "
+                    "OR (type = 'trigger' AND name LIKE 'fits_fts_%')"
+                )).all())
+                # Triggers from an older definition are replaced and the index rebuilt
+                if 'fits_files_fts' in existing and all(
+                    existing.get(name) == sql for name, sql in _FTS_TRIGGERS.items()
+                ):
+                    self.filename_search_index = True
+                    return
+
+                for name in existing.keys() - {'fits_files_fts'}:
+                    conn.execute(text(f"DROP TRIGGER {name}"))
+                conn.execute(text("DROP TABLE IF EXISTS fits_files_fts"))
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE fits_files_fts USING fts5("
+                    "file, content='fits_files', content_rowid='id', tokenize='trigram')"
+                ))
+                for sql in _FTS_TRIGGERS.values():
+                    conn.execute(text(sql))
+                conn.execute(text("INSERT INTO fits_files_fts (fits_files_fts) VALUES ('rebuild')"))
+                logger.info("Created filename search index")
+        except OperationalError as e:
+            logger.warning(f"Filename search index unavailable, using LIKE: {e}")
+            return
+
+        self.filename_search_index = True
+
+    def rebuild_stats(self):
+        """Recompute the stats and facet tables from fits_files (repair; the triggers keep them current)."""
+        with self.engine.begin() as conn:
+            self._rebuild_stats(conn)
+            self._rebuild_facets(conn)
+
+    @staticmethod
+    def _rebuild_facets(conn):
+        conn.execute(text("DELETE FROM fits_facet_counts"))
+        key = ', '.join(f"COALESCE({col}, '')" for col in _FACET_COLUMNS)
+        conn.execute(text(
+            f"INSERT INTO fits_facet_counts ({', '.join(_FACET_COLUMNS)}, file_count) "
+            f"SELECT {key}, COUNT(*) FROM fits_files GROUP BY 1, 2, 3, 4, 5, 6"
+        ))
+
+    @staticmethod
+    def _rebuild_stats(conn):
+        conn.execute(text("DELETE FROM fits_file_stats"))
+        conn.execute(text("DELETE FROM fits_object_stats"))
+
+        file_key = ', '.join(v.format(row='fits_files') for v in _FILE_STATS_KEY)
+        sums = ', '.join(f"SUM({v.format(row='fits_files')})" for v in _FILE_STATS_VALUES.values())
+        conn.execute(text(
+            f"INSERT INTO fits_file_stats (obs_day, camera, telescope, filter, frame_type, "
+            f"{', '.join(_FILE_STATS_VALUES)}) "
+            f"SELECT {file_key}, {sums} FROM fits_files GROUP BY 1, 2, 3, 4, 5"
+        ))
+        object_key = ', '.join(v.format(row='fits_files') for v in _OBJECT_STATS_KEY)
+        conn.execute(text(
+            f"INSERT INTO fits_object_stats (obs_year, camera, telescope, object, frame_count) "
+            f"SELECT {object_key}, COUNT(*) FROM fits_files "
+            f"WHERE {_OBJECT_STATS_FILTER.format(row='fits_files')} GROUP BY 1, 2, 3, 4"
+        ))
+
     def get_session(self):
         """Get a database session."""
         return self.SessionLocal()
@@ -528,6 +917,354 @@ class DatabaseService:
         finally:
             session.close()
 
+    def add_fits_files_bulk(self, rows, chunk_size: int = 500,
+                            progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """Add many FITS file records in chunked transactions.
+
+        Duplicates are resolved with set-based md5 lookups (one query per
+        chunk rather than one per file), and new rows in each chunk are
+        written with a single executemany INSERT. If a chunk insert fails,
+        that chunk is retried row by row so failures are reported per file.
+
+        Args:
+            rows: Polars DataFrame from OptimizedFitsProcessor, or an iterable of dicts
+            chunk_size: Number of rows per transaction
+            progress_callback: Optional callback(processed, total)
+
+        Returns:
+            Dict with 'added' count, 'duplicates' (list of filenames) and
+            'errors' (list of (filename, error message) tuples)
+        """
+        if hasattr(rows, 'iter_rows'):
+            rows = list(rows.iter_rows(named=True))
+        else:
+            rows = list(rows)
+
+        result = {'added': 0, 'duplicates': [], 'errors': []}
+        total = len(rows)
+        seen_md5s = set()
+        processed = 0
+
+        session = self.db_manager.get_session()
+        try:
+            for start in range(0, total, chunk_size):
+                chunk = rows[start:start + chunk_size]
+
+                chunk_md5s = {row.get('md5sum') for row in chunk if row.get('md5sum')}
+                existing = set()
+                if chunk_md5s:
+                    existing = {
+                        md5 for (md5,) in session.query(FitsFile.md5sum).filter(
+                            FitsFile.md5sum.in_(chunk_md5s)
+                        )
+                    }
+
+                new_rows = []
+                for row in chunk:
+                    md5 = row.get('md5sum')
+                    if md5 and (md5 in existing or md5 in seen_md5s):
+                        result['duplicates'].append(row.get('file', 'unknown'))
+                        continue
+                    if md5:
+                        seen_md5s.add(md5)
+                    new_rows.append(row)
+
+                if new_rows:
+                    try:
+                        session.execute(insert(FitsFile), new_rows)
+                        session.commit()
+                        result['added'] += len(new_rows)
+                    except Exception as e:
+                        session.rollback()
+                        logger.warning(f"Bulk insert of {len(new_rows)} rows failed ({e}), retrying row by row")
+                        self._insert_rows_individually(session, new_rows, result)
+
+                processed += len(chunk)
+                if progress_callback:
+                    progress_callback(processed, total)
+
+            # Added and duplicate files are both known to the catalog now
+            failed_files = {filename for filename, _ in result['errors']}
+            self.mark_files_cataloged({
+                os.path.join(row['folder'], row['file']): row.get('md5sum')
+                for row in rows
+                if row.get('folder') and row.get('file') and row['file'] not in failed_files
+            })
+
+            return result
+
+        finally:
+            session.close()
+
+    def _insert_rows_individually(self, session, rows: Iterable[dict], result: Dict):
+        """Insert rows one at a time, recording per-row failures in result."""
+        for row in rows:
+            try:
+                session.execute(insert(FitsFile), [row])
+                session.commit()
+                result['added'] += 1
+            except Exception as e:
+                session.rollback()
+                result['errors'].append((row.get('file', 'unknown'), str(e)))
+
+    def get_scan_state(self) -> Dict[str, Tuple[int, float, int, bool]]:
+        """Get the quarantine scan index as path -> (size, mtime, inode, cataloged)."""
+        session = self.db_manager.get_session()
+        try:
+            rows = session.query(
+                QuarantineScanState.path, QuarantineScanState.size,
+                QuarantineScanState.mtime, QuarantineScanState.inode,
+                QuarantineScanState.cataloged
+            ).all()
+            return {path: (size, mtime, inode, bool(cataloged))
+                    for path, size, mtime, inode, cataloged in rows}
+        finally:
+            session.close()
+
+    def save_scan_state(self, changed: Dict[str, Tuple[int, float, int]],
+                        removed: Iterable[str] = (),
+                        cataloged: Optional[Dict[str, Optional[str]]] = None,
+                        chunk_size: int = 500):
+        """Record new/changed files and drop removed paths.
+
+        Args:
+            changed: Mapping of path -> (size, mtime, inode)
+            removed: Paths that no longer exist on disk
+            cataloged: Mapping of path -> md5sum for changed paths the catalog
+                already holds; all other changed paths are recorded as not
+                yet cataloged
+        """
+        cataloged = cataloged or {}
+        stale = list(changed.keys()) + list(removed)
+        if not stale:
+            return
+
+        session = self.db_manager.get_session()
+        try:
+            for start in range(0, len(stale), chunk_size):
+                session.query(QuarantineScanState).filter(
+                    QuarantineScanState.path.in_(stale[start:start + chunk_size])
+                ).delete(synchronize_session=False)
+
+            new_rows = [
+                {'path': path, 'size': size, 'mtime': mtime, 'inode': inode,
+                 'cataloged': path in cataloged, 'md5sum': cataloged.get(path)}
+                for path, (size, mtime, inode) in changed.items()
+            ]
+            for start in range(0, len(new_rows), chunk_size):
+                session.execute(insert(QuarantineScanState), new_rows[start:start + chunk_size])
+
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
+    def mark_files_cataloged(self, files: Dict[str, Optional[str]], chunk_size: int = 500):
+        """Flag files as present in the catalog in the quarantine scan index.
+
+        Paths the index has not seen yet (cataloged without a monitor scan)
+        are added with their current size, mtime and inode.
+
+        Args:
+            files: Mapping of path -> md5sum of the matching catalog entry
+        """
+        paths = list(files)
+        if not paths:
+            return
+
+        session = self.db_manager.get_session()
+        try:
+            for start in range(0, len(paths), chunk_size):
+                chunk = paths[start:start + chunk_size]
+                known = {
+                    path for (path,) in session.query(QuarantineScanState.path).filter(
+                        QuarantineScanState.path.in_(chunk)
+                    )
+                }
+
+                updates = [{'path': path, 'cataloged': True, 'md5sum': files[path]}
+                           for path in chunk if path in known]
+                if updates:
+                    session.execute(update(QuarantineScanState), updates)
+
+                new_rows = []
+                for path in chunk:
+                    if path in known:
+                        continue
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    new_rows.append({'path': path, 'size': st.st_size, 'mtime': st.st_mtime,
+                                     'inode': st.st_ino, 'cataloged': True, 'md5sum': files[path]})
+                if new_rows:
+                    session.execute(insert(QuarantineScanState), new_rows)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
+    def get_cataloged_paths(self, directory: str) -> Dict[str, Optional[str]]:
+        """Get path -> md5sum for catalog entries in directory or below it."""
+        session = self.db_manager.get_session()
+        try:
+            rows = session.query(FitsFile.folder, FitsFile.file, FitsFile.md5sum).filter(
+                FitsFile.in_folder_tree(directory)
+            )
+            return {os.path.join(folder, file): md5sum for folder, file, md5sum in rows}
+        finally:
+            session.close()
+
+    def reconcile_scan_state(self, chunk_size: int = 500) -> int:
+        """Clear the cataloged flag on scan index entries whose catalog entry is gone.
+
+        An entry stays cataloged while fits_files still holds its md5sum
+        (the file itself or the copy it duplicated); entries flagged before
+        md5sums were recorded are checked by path instead.
+
+        Returns:
+            Number of entries flagged as not cataloged
+        """
+        session = self.db_manager.get_session()
+        try:
+            rows = session.query(QuarantineScanState.path, QuarantineScanState.md5sum).filter(
+                QuarantineScanState.cataloged.is_(True)
+            ).all()
+
+            with_md5 = [(path, md5) for path, md5 in rows if md5]
+            without_md5 = [path for path, md5 in rows if not md5]
+            stale = []
+
+            for start in range(0, len(with_md5), chunk_size):
+                chunk = with_md5[start:start + chunk_size]
+                present = {
+                    md5 for (md5,) in session.query(FitsFile.md5sum).filter(
+                        FitsFile.md5sum.in_({md5 for _, md5 in chunk})
+                    )
+                }
+                stale.extend(path for path, md5 in chunk if md5 not in present)
+
+            folders = sorted({os.path.dirname(path) for path in without_md5})
+            present = set()
+            for start in range(0, len(folders), chunk_size):
+                present.update(
+                    os.path.join(folder, file) for folder, file in session.query(
+                        FitsFile.folder, FitsFile.file
+                    ).filter(FitsFile.folder.in_(folders[start:start + chunk_size]))
+                )
+            stale.extend(path for path in without_md5 if path not in present)
+
+            for start in range(0, len(stale), chunk_size):
+                session.query(QuarantineScanState).filter(
+                    QuarantineScanState.path.in_(stale[start:start + chunk_size])
+                ).update({QuarantineScanState.cataloged: False}, synchronize_session=False)
+            session.commit()
+            return len(stale)
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
+    def reconcile_file_stats(self, batch_size: int = 500, pause_seconds: float = 0.5,
+                             progress_callback: Optional[Callable[[int, int], None]] = None,
+                             should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, int]:
+        """Compare stored size/mtime/inode with the files on disk and fix drift.
+
+        Walks fits_files in id order, one batch per transaction, and sleeps
+        between batches so it can run in the background on a NAS without
+        starving interactive requests. Rows cataloged before the stat
+        columns existed are filled in; files that have gone missing are
+        flagged file_not_found (and cleared again if they reappear).
+
+        This runs outside the operation lock, so each write only applies if
+        the row still has the folder and file that were stat'ed: a row a
+        migration re-pointed in the meantime is left alone.
+
+        Args:
+            batch_size: Number of rows checked per transaction
+            pause_seconds: Sleep between batches to keep I/O low-priority
+            progress_callback: Optional callback(checked, total)
+            should_stop: Optional callable checked between batches; returning
+                True ends the run early (the next run starts over)
+
+        Returns:
+            Dict with 'checked', 'updated' and 'missing' counts
+        """
+        result = {'checked': 0, 'updated': 0, 'missing': 0}
+
+        table = FitsFile.__table__
+        unchanged_path = and_(
+            table.c.id == bindparam('b_id'),
+            table.c.folder == bindparam('b_folder'),
+            table.c.file == bindparam('b_file'),
+        )
+        missing_stmt = update(table).where(unchanged_path).values(file_not_found=True)
+        stat_stmt = update(table).where(unchanged_path).values(
+            file_size=bindparam('b_size'), file_mtime=bindparam('b_mtime'),
+            file_inode=bindparam('b_inode'), file_not_found=False
+        )
+
+        session = self.db_manager.get_session()
+        try:
+            total = session.query(func.count(FitsFile.id)).scalar() or 0
+            last_id = 0
+
+            while not (should_stop and should_stop()):
+                rows = session.query(
+                    FitsFile.id, FitsFile.folder, FitsFile.file, FitsFile.file_size,
+                    FitsFile.file_mtime, FitsFile.file_inode, FitsFile.file_not_found
+                ).filter(FitsFile.id > last_id).order_by(FitsFile.id).limit(batch_size).all()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+
+                missing = []
+                changed = []
+                for file_id, folder, filename, size, mtime, inode, not_found in rows:
+                    key = {'b_id': file_id, 'b_folder': folder, 'b_file': filename}
+                    try:
+                        st = os.stat(os.path.join(folder, filename))
+                    except OSError:
+                        result['missing'] += 1
+                        if not not_found:
+                            missing.append(key)
+                        continue
+
+                    current = (st.st_size, st.st_mtime, st.st_ino)
+                    if (size, mtime, inode) != current or not_found:
+                        changed.append(dict(key, b_size=current[0], b_mtime=current[1],
+                                            b_inode=current[2]))
+
+                if missing or changed:
+                    for stmt, params in ((missing_stmt, missing), (stat_stmt, changed)):
+                        if params:
+                            result['updated'] += session.execute(stmt, params).rowcount
+                    session.commit()
+
+                result['checked'] += len(rows)
+                if progress_callback:
+                    progress_callback(result['checked'], total)
+
+                if pause_seconds:
+                    time.sleep(pause_seconds)
+
+            logger.info(
+                f"File stat reconcile: {result['checked']} checked, "
+                f"{result['updated']} updated, {result['missing']} missing"
+            )
+            return result
+
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
     def get_cameras(self) -> List[Camera]:
         """Get all cameras."""
         session = self.db_manager.get_session()
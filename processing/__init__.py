@@ -6,7 +6,11 @@ equipment identification, session generation, and parallel processing.
 """
 
 # Re-export main processor for backwards compatibility
-from .fits_processor import OptimizedFitsProcessor
+from .fits_processor import (
+    OptimizedFitsProcessor,
+    get_worker_pool,
+    shutdown_worker_pool
+)
 
 # Re-export commonly used functions for backwards compatibility
 from .metadata_extractor import (
@@ -28,9 +32,13 @@ from .equipment_identifier import (
 
 from .session_generator import generate_session_id_with_hash
 
+from .file_walker import iter_fits_files
+
 from .parallel_processor import (
     extract_fits_metadata_worker,
-    extract_fits_metadata_with_streaming_hash
+    extract_fits_metadata_with_streaming_hash,
+    init_fits_worker,
+    read_header_with_streaming_hash
 )
 
 __all__ = [
@@ -55,7 +63,14 @@ __all__ = [
     # Session generation
     'generate_session_id_with_hash',
     
+    # File discovery
+    'iter_fits_files',
+    
     # Parallel processing
     'extract_fits_metadata_worker',
     'extract_fits_metadata_with_streaming_hash',
+    'read_header_with_streaming_hash',
+    'init_fits_worker',
+    'get_worker_pool',
+    'shutdown_worker_pool',
 ]
\ No newline at end of file
@@ -6,10 +6,135 @@ and normalization based on FITS header data.
 """
 
 import logging
-from typing import Dict, Optional
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Header FOCALLEN values within this many mm of a configured telescope match it
+FOCAL_LENGTH_TOLERANCE = 0.5
+
+# Instrument values that never identify a camera
+_IGNORED_INSTRUMENTS = frozenset(['N/A', 'None', 'ERROR', 'UNKNOWN'])
+
+
+class CameraIndex:
+    """
+    Prebuilt lookup tables for camera identification.
+    
+    Cameras are indexed by sensor dimensions, and fuzzy instrument-name
+    matches are memoized, so identifying a frame is a dictionary lookup
+    instead of scans over every camera. Where several cameras match, the
+    first one in cameras_dict wins, as with a linear scan.
+    """
+    
+    def __init__(self, cameras_dict: Dict):
+        self.cameras_dict = cameras_dict
+        
+        # (x, y) -> camera and x -> camera, keeping the first in dict order
+        self.by_size: Dict[Tuple[int, int], str] = {}
+        self.by_width: Dict[int, str] = {}
+        for camera_name, camera in cameras_dict.items():
+            self.by_size.setdefault((camera.x, camera.y), camera_name)
+            self.by_width.setdefault(camera.x, camera_name)
+        
+        self.names_upper: List[Tuple[str, str]] = [
+            (camera_name, camera_name.upper()) for camera_name in cameras_dict
+        ]
+        self.instrument_cache: Dict[str, str] = {}
+    
+    def find_by_size(self, actual_x: int, actual_y: Optional[int]) -> Optional[str]:
+        """Find the camera with the given unbinned sensor dimensions."""
+        if actual_y is None:
+            return self.by_width.get(actual_x)
+        return self.by_size.get((actual_x, actual_y))
+    
+    def find_by_instrument(self, instrument: str) -> str:
+        """Match an instrument string to a camera name, memoizing the result."""
+        camera_name = self.instrument_cache.get(instrument)
+        if camera_name is not None:
+            return camera_name
+        
+        camera_name = "UNKNOWN"
+        if instrument in self.cameras_dict:
+            # Direct match
+            camera_name = instrument
+        else:
+            # Fuzzy match
+            instrument_upper = instrument.upper()
+            for name, name_upper in self.names_upper:
+                if name_upper in instrument_upper or instrument_upper in name_upper:
+                    camera_name = name
+                    break
+        
+        self.instrument_cache[instrument] = camera_name
+        return camera_name
+
+
+class TelescopeIndex:
+    """
+    Telescopes sorted by focal length for bisection lookups.
+    
+    Telescopes with equal focal lengths keep their telescopes_dict order, so
+    the first configured one wins as with a linear scan.
+    """
+    
+    def __init__(self, telescopes_dict: Dict):
+        self.telescopes_dict = telescopes_dict
+        
+        telescopes = sorted(
+            ((telescope.focal, telescope_name)
+             for telescope_name, telescope in telescopes_dict.items()
+             if telescope.focal is not None),
+            key=lambda item: item[0]
+        )
+        self.focal_lengths: List[float] = [focal for focal, _ in telescopes]
+        self.names: List[str] = [name for _, name in telescopes]
+    
+    def find(self, focal_length: float,
+             tolerance: float = FOCAL_LENGTH_TOLERANCE) -> Optional[str]:
+        """Find the telescope whose focal length is closest within tolerance."""
+        lo = bisect_left(self.focal_lengths, focal_length - tolerance)
+        hi = bisect_right(self.focal_lengths, focal_length + tolerance)
+        if lo == hi:
+            return None
+        
+        # Closest focal length wins; ties go to the earliest entry
+        best = min(range(lo, hi), key=lambda i: abs(self.focal_lengths[i] - focal_length))
+        return self.names[best]
+
+
+# Most recently built indexes, reused while the same equipment dicts are passed
+_camera_index: Optional[CameraIndex] = None
+_telescope_index: Optional[TelescopeIndex] = None
+
+
+def get_camera_index(cameras_dict: Dict) -> CameraIndex:
+    """
+    Get a CameraIndex for cameras_dict, building it only when the dict changes.
+    
+    Workers pass the same dict object for every frame, so each builds the
+    index once. The dict must not be modified in place after indexing.
+    """
+    global _camera_index
+    
+    if _camera_index is None or _camera_index.cameras_dict is not cameras_dict:
+        _camera_index = CameraIndex(cameras_dict)
+    
+    return _camera_index
+
+
+def get_telescope_index(telescopes_dict: Dict) -> TelescopeIndex:
+    """
+    Get a TelescopeIndex for telescopes_dict, building it only when the dict changes.
+    """
+    global _telescope_index
+    
+    if _telescope_index is None or _telescope_index.telescopes_dict is not telescopes_dict:
+        _telescope_index = TelescopeIndex(telescopes_dict)
+    
+    return _telescope_index
+
 
 def identify_camera_simple(x_pixels: Optional[int], y_pixels: Optional[int],
                           instrument: Optional[str], binning: int, 
@@ -30,28 +155,20 @@ def identify_camera_simple(x_pixels: Optional[int], y_pixels: Optional[int],
     Returns:
         Camera name or "UNKNOWN"
     """
+    index = get_camera_index(cameras_dict)
+    
     # Try to identify by pixel dimensions first
     if x_pixels:
         actual_x = x_pixels * binning
         actual_y = y_pixels * binning if y_pixels else None
         
-        for camera_name, camera in cameras_dict.items():
-            if camera.x == actual_x:
-                if actual_y is None or camera.y == actual_y:
-                    return camera_name
+        camera_name = index.find_by_size(actual_x, actual_y)
+        if camera_name:
+            return camera_name
     
     # Try to identify by instrument name
-    if instrument and instrument not in ['N/A', 'None', 'ERROR', 'UNKNOWN']:
-        # Direct match
-        if instrument in cameras_dict:
-            return instrument
-        
-        # Fuzzy match
-        instrument_upper = instrument.upper()
-        for camera_name in cameras_dict.keys():
-            if camera_name.upper() in instrument_upper or \
-               instrument_upper in camera_name.upper():
-                return camera_name
+    if instrument and instrument not in _IGNORED_INSTRUMENTS:
+        return index.find_by_instrument(instrument)
     
     return "UNKNOWN"
 
@@ -63,6 +180,9 @@ def identify_telescope_simple(focal_length: Optional[float],
     
     Simplified version for parallel processing.
     
+    Focal lengths within FOCAL_LENGTH_TOLERANCE of a configured telescope
+    match it, so header values like 529.8 still identify a 530 mm scope.
+    
     Args:
         focal_length: Telescope focal length in mm
         telescopes_dict: Dictionary mapping telescope names to telescope objects
@@ -73,12 +193,8 @@ def identify_telescope_simple(focal_length: Optional[float],
     if not focal_length:
         return "UNKNOWN"
     
-    # Look for exact focal length match
-    for telescope_name, telescope in telescopes_dict.items():
-        if telescope.focal == focal_length:
-            return telescope_name
-    
-    return "UNKNOWN"
+    telescope_name = get_telescope_index(telescopes_dict).find(focal_length)
+    return telescope_name or "UNKNOWN"
 
 
 def normalize_filter(filter_name: str, filter_mappings: Dict[str, str]) -> str:
@@ -0,0 +1,143 @@
+"""
+Streaming directory walker for FITS file discovery.
+
+Walks large archive trees with os.scandir, one thread per top-level
+subdirectory, and yields matching file paths as they are found so that
+processing can start before the walk has finished.
+"""
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sentinel put on the results queue when a subtree walker finishes
+_WALK_DONE = object()
+
+# Directories' worth of matches the walkers may queue ahead of the consumer
+MAX_QUEUED_BATCHES = 64
+
+# How often a walker blocked on a full queue checks whether to stop
+QUEUE_POLL_SECONDS = 0.1
+
+
+def _put(results: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put item on the bounded queue, giving up once stop is set."""
+    while not stop.is_set():
+        try:
+            results.put(item, timeout=QUEUE_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _walk_subtree(root: str, matches: Callable[[os.DirEntry], bool],
+                  results: queue.Queue, stop: threading.Event):
+    """
+    Walk one subtree depth-first, putting one list of matches per directory.
+
+    Symlinked directories are not followed (same as Path.rglob). The walk
+    ends early, dropping what it has found, once stop is set.
+    """
+    pending = [root]
+    try:
+        while pending and not stop.is_set():
+            current = pending.pop()
+            found = []
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif matches(entry):
+                                found.append(entry.path)
+                        except OSError as e:
+                            logger.warning(f"Error reading {entry.path}: {e}")
+            except OSError as e:
+                logger.warning(f"Error scanning directory {current}: {e}")
+
+            if found and not _put(results, found, stop):
+                return
+    finally:
+        _put(results, _WALK_DONE, stop)
+
+
+def iter_fits_files(directory: str, extensions: Iterable[str],
+                    exclude: Optional[Callable[[str], bool]] = None,
+                    max_workers: int = 8) -> Iterator[str]:
+    """
+    Lazily yield FITS file paths under directory.
+
+    Files directly in directory are yielded first while each top-level
+    subdirectory is walked in its own thread; their paths follow in the
+    order the walkers find them. Walkers queue at most MAX_QUEUED_BATCHES
+    directories ahead of a slow consumer, and closing the generator early
+    stops them.
+
+    Args:
+        directory: Root directory to search
+        extensions: File extensions to match (case-insensitive, e.g. '.fits')
+        exclude: Optional predicate on the full path; matching files are skipped
+        max_workers: Maximum number of walker threads
+
+    Yields:
+        Matching file paths
+    """
+    root = str(Path(directory))
+    extensions = tuple(ext.lower() for ext in extensions)
+
+    def matches(entry: os.DirEntry) -> bool:
+        if os.path.splitext(entry.name)[1].lower() not in extensions:
+            return False
+        if exclude and exclude(entry.path):
+            return False
+        return entry.is_file()
+
+    top_dirs = []
+    top_files = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        top_dirs.append(entry.path)
+                    elif matches(entry):
+                        top_files.append(entry.path)
+                except OSError as e:
+                    logger.warning(f"Error reading {entry.path}: {e}")
+    except OSError as e:
+        logger.warning(f"Error scanning directory {root}: {e}")
+        return
+
+    if not top_dirs:
+        yield from top_files
+        return
+
+    results: queue.Queue = queue.Queue(maxsize=MAX_QUEUED_BATCHES)
+    stop = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(top_dirs)),
+                              thread_name_prefix="fits-walker")
+    try:
+        for subdir in top_dirs:
+            pool.submit(_walk_subtree, subdir, matches, results, stop)
+
+        yield from top_files
+
+        remaining = len(top_dirs)
+        while remaining:
+            batch = results.get()
+            if batch is _WALK_DONE:
+                remaining -= 1
+                continue
+            yield from batch
+    finally:
+        # Runs when the walk completes or the consumer closes the generator
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
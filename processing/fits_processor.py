@@ -8,18 +8,83 @@ metadata extraction, equipment identification, and parallel processing.
 import logging
 import multiprocessing as mp
 import os
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from functools import partial
-from pathlib import Path
-from typing import Dict, List, Tuple
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import polars as pl
 from tqdm import tqdm
 
-from .parallel_processor import extract_fits_metadata_with_streaming_hash
+from .file_walker import iter_fits_files
+from .parallel_processor import init_fits_worker, process_file_chunk
 
 logger = logging.getLogger(__name__)
 
+# Persistent worker pool shared by every processor in this process
+_worker_pool: Optional[ProcessPoolExecutor] = None
+_worker_pool_key: Optional[tuple] = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool(max_workers: int, cameras: Dict, telescopes: Dict,
+                    filter_mappings: Dict[str, str]) -> ProcessPoolExecutor:
+    """
+    Get the warm FITS worker pool, starting it on first use.
+    
+    Workers load the equipment tables and software profiles once through
+    init_fits_worker() and stay alive between scans, so long-running
+    processes such as the web app only pay start-up cost on the first scan.
+    The pool is restarted if the worker count or equipment tables change.
+    
+    Args:
+        max_workers: Number of worker processes
+        cameras: Dictionary of camera configurations
+        telescopes: Dictionary of telescope configurations
+        filter_mappings: Dictionary of filter name mappings
+        
+    Returns:
+        ProcessPoolExecutor whose workers accept process_file_chunk tasks
+    """
+    global _worker_pool, _worker_pool_key
+    
+    key = (max_workers, cameras, telescopes, filter_mappings)
+    
+    with _worker_pool_lock:
+        if _worker_pool is not None and _worker_pool_key != key:
+            logger.info("Equipment or worker count changed, restarting worker pool")
+            _worker_pool.shutdown(wait=True)
+            _worker_pool = None
+        
+        if _worker_pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=init_fits_worker,
+                initargs=(cameras, telescopes, filter_mappings)
+            )
+            # Fork all workers now, since a lazy walker starts threads and
+            # forking with live threads is unsafe.
+            pool.submit(os.getpid).result()
+            
+            _worker_pool = pool
+            _worker_pool_key = key
+            logger.info(f"Started FITS worker pool with {max_workers} workers")
+        
+        return _worker_pool
+
+
+def shutdown_worker_pool():
+    """Stop the warm FITS worker pool, if one is running."""
+    global _worker_pool, _worker_pool_key
+    
+    with _worker_pool_lock:
+        if _worker_pool is not None:
+            _worker_pool.shutdown(wait=True)
+            _worker_pool = None
+            _worker_pool_key = None
+
 
 class OptimizedFitsProcessor:
     """
@@ -54,8 +119,13 @@ class OptimizedFitsProcessor:
         # Determine optimal number of workers
         self.cpu_count = mp.cpu_count()
         # Leave two cores free, max 12 workers
-        self.metadata_workers = min(self.cpu_count - 2, 12)
-        self.md5_workers = min(self.cpu_count - 2, 12)
+        self.metadata_workers = max(1, min(self.cpu_count - 2, 12))
+        self.md5_workers = max(1, min(self.cpu_count - 2, 12))
+        
+        # Files per submitted task, and tasks allowed in flight per worker.
+        # Together these bound memory regardless of how many files are queued.
+        self.submit_chunk_size = 8
+        self.max_in_flight = self.metadata_workers * 2
         
         logger.info(
             f"Initialized with {self.metadata_workers} metadata workers, "
@@ -74,29 +144,35 @@ class OptimizedFitsProcessor:
         """
         logger.info(f"Scanning for FITS files in {directory}...")
         
-        # Get file extensions from config
-        extensions = tuple(self.config.file_monitoring.extensions)
-        
         fits_files = []
-        dir_path = Path(directory)
-        
-        # Count total files first for better progress reporting
-        all_files = list(dir_path.rglob('*'))
-        
-        with tqdm(total=len(all_files), desc="Scanning files", unit="files") as pbar:
-            for file_path in all_files:
+        with tqdm(desc="Scanning files", unit="files") as pbar:
+            for filepath in self.iter_fits_files(directory):
+                fits_files.append(filepath)
                 pbar.update(1)
-                
-                if file_path.is_file():
-                    # Check file extension
-                    if file_path.suffix.lower() in extensions:
-                        # Skip files marked as bad
-                        if not self._is_bad_file(str(file_path)):
-                            fits_files.append(str(file_path))
         
         logger.info(f"Found {len(fits_files)} FITS files")
         return fits_files
     
+    def iter_fits_files(self, directory: str) -> Iterator[str]:
+        """
+        Lazily yield FITS files in directory and subdirectories.
+        
+        Top-level subdirectories are walked in parallel with os.scandir, so
+        paths can be fed to process_files_optimized() while the walk is
+        still running. Files marked as bad are skipped.
+        
+        Args:
+            directory: Root directory to search
+            
+        Yields:
+            FITS file paths
+        """
+        return iter_fits_files(
+            directory,
+            self.config.file_monitoring.extensions,
+            exclude=self._is_bad_file
+        )
+    
     def _is_bad_file(self, filepath: str) -> bool:
         """
         Check if filename is marked as bad/corrupt.
@@ -111,7 +187,7 @@ class OptimizedFitsProcessor:
         bad_markers = ['BAD_', 'CORRUPT_', 'ERROR_']
         return any(marker in filename.upper() for marker in bad_markers)
     
-    def process_files_optimized(self, filepaths: List[str]) -> Tuple[pl.DataFrame, List[dict]]:
+    def process_files_optimized(self, filepaths: Iterable[str]) -> Tuple[pl.DataFrame, List[dict]]:
         """
         Process multiple FITS files with streaming optimization (metadata + MD5 in one pass).
         
@@ -119,63 +195,22 @@ class OptimizedFitsProcessor:
         It uses parallel processing to extract metadata and calculate MD5
         hashes in a single pass through each file.
         
+        All results are returned in one DataFrame; use iter_file_batches()
+        to receive them incrementally instead.
+        
         Args:
-            filepaths: List of FITS file paths to process
+            filepaths: FITS file paths to process; may be a lazy iterator
+                such as iter_fits_files(), consumed while workers run
             
         Returns:
             Tuple of (DataFrame with all results, list of session dictionaries)
         """
-        results = []
-        failed_files = []
-        sessions = {}
-        
-        logger.info(f"Processing {len(filepaths)} files with streaming optimization...")
+        logger.info("Processing files with streaming optimization...")
         
         # Single phase: Extract metadata AND calculate MD5 in one pass
-        with tqdm(total=len(filepaths), desc="Processing files (streaming)", 
-                 unit="files") as pbar:
-            
-            # Create worker function with bound parameters
-            worker_func = partial(
-                extract_fits_metadata_with_streaming_hash,
-                cameras_dict=self.cameras,
-                telescopes_dict=self.telescopes,
-                filter_mappings=self.filter_mappings
-            )
-            
-            # Process in parallel with ProcessPoolExecutor
-            with ProcessPoolExecutor(max_workers=self.metadata_workers) as executor:
-                future_to_file = {
-                    executor.submit(worker_func, filepath): filepath 
-                    for filepath in filepaths
-                }
-                
-                for future in as_completed(future_to_file):
-                    filepath = future_to_file[future]
-                    try:
-                        metadata = future.result()
-                        if metadata:
-                            # Extract session data
-                            session_data = metadata.pop('_session_data', None)
-                            if session_data and session_data['id'] != 'UNKNOWN':
-                                sessions[session_data['id']] = session_data
-
-                            results.append(metadata)
-                        else:
-                            failed_files.append(filepath)
-                    except Exception as e:
-                        logger.error(f"Failed to process {filepath}: {e}")
-                        failed_files.append(filepath)
-                    
-                    pbar.update(1)
-                    
-                    # Update progress info every 50 files
-                    if len(results) % 50 == 0:
-                        pbar.set_postfix({
-                            'success': len(results),
-                            'failed': len(failed_files),
-                            'sessions': len(sessions)
-                        })
+        results, failed_files, sessions = self._collect_all(
+            filepaths, compute_hash=True, desc="Processing files (streaming)"
+        )
         
         # Report results
         logger.info(f"Successfully processed: {len(results)} files")
@@ -197,7 +232,7 @@ class OptimizedFitsProcessor:
             # Return empty DataFrame with expected schema
             return pl.DataFrame(), []
 
-    def process_files_metadata_only(self, filepaths: List[str]) -> Tuple[pl.DataFrame, List[dict]]:
+    def process_files_metadata_only(self, filepaths: Iterable[str]) -> Tuple[pl.DataFrame, List[dict]]:
         """
         Process files extracting only metadata (no MD5 calculation).
         
@@ -205,55 +240,16 @@ class OptimizedFitsProcessor:
         hash calculation is not needed or will be done separately.
         
         Args:
-            filepaths: List of FITS file paths to process
+            filepaths: FITS file paths to process; may be a lazy iterator
             
         Returns:
             Tuple of (DataFrame with all results, list of session dictionaries)
         """
-        from .parallel_processor import extract_fits_metadata_worker
-        
-        results = []
-        failed_files = []
-        sessions = {}
+        logger.info("Processing files (metadata only)...")
         
-        logger.info(f"Processing {len(filepaths)} files (metadata only)...")
-        
-        with tqdm(total=len(filepaths), desc="Extracting metadata", 
-                 unit="files") as pbar:
-            
-            # Create worker function with bound parameters
-            worker_func = partial(
-                extract_fits_metadata_worker,
-                cameras_dict=self.cameras,
-                telescopes_dict=self.telescopes,
-                filter_mappings=self.filter_mappings
-            )
-            
-            # Process in parallel
-            with ProcessPoolExecutor(max_workers=self.metadata_workers) as executor:
-                future_to_file = {
-                    executor.submit(worker_func, filepath): filepath 
-                    for filepath in filepaths
-                }
-                
-                for future in as_completed(future_to_file):
-                    filepath = future_to_file[future]
-                    try:
-                        metadata = future.result()
-                        if metadata:
-                            # Extract session data
-                            session_data = metadata.pop('_session_data', None)
-                            if session_data and session_data['id'] != 'UNKNOWN':
-                                sessions[session_data['id']] = session_data
-
-                            results.append(metadata)
-                        else:
-                            failed_files.append(filepath)
-                    except Exception as e:
-                        logger.error(f"Failed to process {filepath}: {e}")
-                        failed_files.append(filepath)
-                    
-                    pbar.update(1)
+        results, failed_files, sessions = self._collect_all(
+            filepaths, compute_hash=False, desc="Extracting metadata"
+        )
         
         # Report results
         logger.info(f"Successfully processed: {len(results)} files")
@@ -268,29 +264,176 @@ class OptimizedFitsProcessor:
         else:
             return pl.DataFrame(), []
 
+    def iter_file_batches(self, filepaths: Iterable[str], batch_size: int = 500,
+                          compute_hash: bool = True
+                          ) -> Iterator[Tuple[pl.DataFrame, List[dict], List[str]]]:
+        """
+        Process files and yield results incrementally as Polars record batches.
+        
+        A batch is emitted every batch_size completed files, so callers can
+        write each one to the database before the rest are done. Memory is
+        bounded by the in-flight window plus one batch, and an interrupted
+        run keeps every batch already written.
+        
+        Args:
+            filepaths: FITS file paths to process; may be a lazy iterator
+            batch_size: Number of completed files per emitted batch
+            compute_hash: Whether to compute MD5 hashes alongside metadata
+            
+        Yields:
+            Tuple of (DataFrame for the batch, list of session dictionaries,
+            list of file paths that failed in the batch)
+        """
+        desc = "Processing files (streaming)" if compute_hash else "Extracting metadata"
+        
+        for results, failed_files, sessions in self._iter_worker_results(
+            filepaths, compute_hash, desc, batch_size
+        ):
+            df = pl.DataFrame(results, infer_schema_length=None) if results else pl.DataFrame()
+            yield df, list(sessions.values()), failed_files
+
+    def _collect_all(self, filepaths: Iterable[str], compute_hash: bool,
+                     desc: str) -> Tuple[List[dict], List[str], Dict[str, dict]]:
+        """Run all files through the pool and gather every batch together."""
+        results = []
+        failed_files = []
+        sessions = {}
+        
+        for batch_results, batch_failed, batch_sessions in self._iter_worker_results(
+            filepaths, compute_hash, desc
+        ):
+            results.extend(batch_results)
+            failed_files.extend(batch_failed)
+            sessions.update(batch_sessions)
+        
+        return results, failed_files, sessions
+
+    def _iter_worker_results(self, filepaths: Iterable[str], compute_hash: bool,
+                             desc: str, batch_size: int = 500
+                             ) -> Iterator[Tuple[List[dict], List[str], Dict[str, dict]]]:
+        """
+        Run filepaths through the warm worker pool.
+        
+        Only file paths cross the process boundary; the equipment tables
+        were loaded into each worker when the pool started. Paths are
+        submitted in chunks of submit_chunk_size as they are produced, with
+        at most max_in_flight chunks outstanding, so a lazy iterator from
+        iter_fits_files() keeps walking while earlier files are processed
+        and nothing is queued up front.
+        
+        Yields:
+            Tuple of (metadata results, failed file paths, sessions by id)
+            every batch_size completed files, plus a final partial batch
+        """
+        total = len(filepaths) if hasattr(filepaths, '__len__') else None
+        chunk_func = partial(process_file_chunk, compute_hash=compute_hash)
+        path_iter = iter(filepaths)
+        
+        results = []
+        failed_files = []
+        sessions = {}
+        counts = {'success': 0, 'failed': 0}
+        all_sessions = set()
+        
+        def collect(future, chunk):
+            try:
+                chunk_results = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to process {len(chunk)} files: {e}")
+                chunk_results = [(filepath, None) for filepath in chunk]
+            
+            for filepath, metadata in chunk_results:
+                if metadata:
+                    # Extract session data
+                    session_data = metadata.pop('_session_data', None)
+                    if session_data and session_data['id'] != 'UNKNOWN':
+                        sessions[session_data['id']] = session_data
+                        all_sessions.add(session_data['id'])
+
+                    results.append(metadata)
+                    counts['success'] += 1
+                else:
+                    failed_files.append(filepath)
+                    counts['failed'] += 1
+                
+                pbar.update(1)
+                
+                # Update progress info every 50 files
+                if counts['success'] % 50 == 0:
+                    pbar.set_postfix({
+                        'success': counts['success'],
+                        'failed': counts['failed'],
+                        'sessions': len(all_sessions)
+                    })
+        
+        executor = get_worker_pool(
+            self.metadata_workers, self.cameras, self.telescopes, self.filter_mappings
+        )
+        
+        in_flight = {}
+        exhausted = False
+        
+        with tqdm(total=total, desc=desc, unit="files") as pbar:
+            try:
+                
+                while in_flight or not exhausted:
+                    # Top up the window with new chunks
+                    while not exhausted and len(in_flight) < self.max_in_flight:
+                        chunk = list(islice(path_iter, self.submit_chunk_size))
+                        if not chunk:
+                            exhausted = True
+                            if total is None:
+                                pbar.total = pbar.n + sum(len(c) for c in in_flight.values())
+                                pbar.refresh()
+                            break
+                        in_flight[executor.submit(chunk_func, chunk)] = chunk
+                    
+                    if not in_flight:
+                        break
+                    
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future, in_flight.pop(future))
+                    
+                    if len(results) + len(failed_files) >= batch_size:
+                        yield results, failed_files, sessions
+                        results, failed_files, sessions = [], [], {}
+            except BrokenProcessPool:
+                # A worker died; discard the pool so the next scan starts fresh
+                logger.error("FITS worker pool broke, restarting on next scan")
+                shutdown_worker_pool()
+                raise
+            finally:
+                # Abandon chunks not yet started if the caller stopped early
+                for future in in_flight:
+                    future.cancel()
+        
+        if results or failed_files:
+            yield results, failed_files, sessions
+
     def scan_quarantine(self) -> Tuple[pl.DataFrame, List[dict]]:
         """
         Scan the quarantine directory and process all FITS files.
         
-        This is a convenience method that combines find_fits_files() and
-        process_files_optimized() in a single call. Primarily used by
-        the web interface and CLI.
+        This is a convenience method that streams iter_fits_files() into
+        process_files_optimized() in a single call, for scripts that want
+        every file in one DataFrame. The catalog paths (web scan, CLI
+        catalog) go through FileMonitor instead, which applies the scan
+        index to the same walker.
         
         Returns:
             Tuple of (DataFrame with all results, list of session dictionaries)
         """
         logger.info(f"Scanning quarantine directory: {self.config.paths.quarantine_dir}")
         
-        # Find all FITS files
-        filepaths = self.find_fits_files(self.config.paths.quarantine_dir)
+        # Stream paths from the walker straight into the worker pool
+        filepaths = self.iter_fits_files(self.config.paths.quarantine_dir)
+        df, sessions = self.process_files_optimized(filepaths)
         
-        if not filepaths:
+        if df.is_empty():
             logger.info("No FITS files found in quarantine directory")
-            return pl.DataFrame(), []
-        
-        # Process the files
-        logger.info(f"Processing {len(filepaths)} files...")
-        df, sessions = self.process_files_optimized(filepaths)
         
         return df, sessions
     
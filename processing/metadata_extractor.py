@@ -218,8 +218,8 @@ def extract_fits_metadata_simple(filepath: str, header,
     # Get profile manager (auto-loads from profiles/ directory)
     profile_manager = get_profile_manager()
     
-    # Detect capture software
-    detected_software = profile_manager.detect_software(header)
+    # Detect capture software and read all profile-driven fields in one pass
+    profile_fields = profile_manager.extract_fields(header)
     
     # Extract basic metadata
     metadata = {
@@ -250,29 +250,29 @@ def extract_fits_metadata_simple(filepath: str, header,
     # =======================================================================
     
     # Extract header values using profile system with fallbacks
-    raw_object = profile_manager.get_value(header, 'target', detected_software)
+    raw_object = profile_fields['target']
     if not raw_object:
         raw_object = get_header_value(header, ['OBJECT', 'TARGET'])
     
-    instrument = profile_manager.get_value(header, 'camera', detected_software)
+    instrument = profile_fields['camera']
     if not instrument:
         instrument = get_header_value(header, ['INSTRUME'])
     
     # Get filter NAME from profile
-    filter_raw = profile_manager.get_value(header, 'filter', detected_software)
+    filter_raw = profile_fields['filter']
     if not filter_raw:
         filter_raw = get_header_value(header, ['FILTER'])
 
     # Get filter WHEEL device from profile
-    filter_wheel = profile_manager.get_value(header, 'filter_wheel', detected_software)
+    filter_wheel = profile_fields['filter_wheel']
     if not filter_wheel:
         filter_wheel = get_header_value(header, ['FWHEEL'])
     
-    telescope_raw = profile_manager.get_value(header, 'telescope', detected_software)
+    telescope_raw = profile_fields['telescope']
     if not telescope_raw:
         telescope_raw = get_header_value(header, ['TELESCOP'])
     
-    frame_type_raw = profile_manager.get_value(header, 'frame_type', detected_software)
+    frame_type_raw = profile_fields['frame_type']
     if not frame_type_raw:
         frame_type_raw = get_header_value(header, ['IMAGETYP', 'FRAMETYPE'])
     
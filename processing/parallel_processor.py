@@ -8,15 +8,93 @@ that extract metadata and calculate MD5 hashes efficiently.
 import hashlib
 import logging
 import os
-from io import BytesIO
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 from astropy.io import fits
 
+from .equipment_identifier import get_camera_index, get_telescope_index
 from .metadata_extractor import extract_fits_metadata_simple
+from .software_profiles import get_profile_manager
+from .timezone_utils import TIMEZONE_AVAILABLE, get_timezone_finder
 
 logger = logging.getLogger(__name__)
 
+# FITS files are organised in 2880-byte logical records made of 80-byte cards
+FITS_BLOCK_SIZE = 2880
+FITS_CARD_SIZE = 80
+FITS_END_CARD = b'END' + b' ' * (FITS_CARD_SIZE - 3)
+
+# Read size used when hashing the data section (multiple of the FITS block size)
+HASH_CHUNK_SIZE = FITS_BLOCK_SIZE * 364  # ~1 MB
+
+# Equipment tables loaded once per worker process by init_fits_worker()
+_worker_equipment: Optional[Tuple[Dict, Dict, Dict[str, str]]] = None
+
+
+def file_stat_fields(filepath: str) -> Dict[str, Optional[float]]:
+    """
+    Stat a file and return the FitsFile size/mtime/inode columns.
+    
+    Values are None if the file cannot be stat'ed.
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError as e:
+        logger.warning(f"Could not stat {filepath}: {e}")
+        return {'file_size': None, 'file_mtime': None, 'file_inode': None}
+    
+    return {'file_size': st.st_size, 'file_mtime': st.st_mtime, 'file_inode': st.st_ino}
+
+
+def read_header_with_streaming_hash(filepath: str,
+                                    chunk_size: int = HASH_CHUNK_SIZE) -> Tuple[fits.Header, str]:
+    """
+    Parse the primary FITS header and compute the file MD5 in a single read.
+    
+    The primary header is read block by block until the END card is found,
+    then the remainder of the file is fed to the hash in fixed-size chunks.
+    Memory use is bounded by the header size plus one chunk, regardless of
+    how large the image data is.
+    
+    Args:
+        filepath: Path to FITS file
+        chunk_size: Number of bytes to read per chunk for the data section
+        
+    Returns:
+        Tuple of (primary header, md5 hex digest)
+        
+    Raises:
+        ValueError: If no END card is found in the primary header
+    """
+    hash_md5 = hashlib.md5()
+    header_blocks = []
+    
+    with open(filepath, 'rb') as f:
+        # Primary header: whole 2880-byte blocks up to and including END
+        found_end = False
+        while not found_end:
+            block = f.read(FITS_BLOCK_SIZE)
+            if not block:
+                break
+            hash_md5.update(block)
+            header_blocks.append(block)
+            
+            for offset in range(0, len(block), FITS_CARD_SIZE):
+                if block[offset:offset + FITS_CARD_SIZE] == FITS_END_CARD:
+                    header_blocks[-1] = block[:offset + FITS_CARD_SIZE]
+                    found_end = True
+                    break
+        
+        if not found_end:
+            raise ValueError(f"No END card found in primary header of {filepath}")
+        
+        # Data section and any extensions: hash only, never held in memory
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hash_md5.update(chunk)
+    
+    header = fits.Header.fromstring(b''.join(header_blocks).decode('ascii', errors='replace'))
+    return header, hash_md5.hexdigest()
+
 
 def extract_fits_metadata_worker(filepath: str, cameras_dict: Dict, 
                                 telescopes_dict: Dict, 
@@ -46,6 +124,7 @@ def extract_fits_metadata_worker(filepath: str, cameras_dict: Dict,
                 filepath, header, cameras_dict, 
                 telescopes_dict, filter_mappings
             )
+            metadata.update(file_stat_fields(filepath))
             
             logger.debug(f"Successfully processed metadata for {filepath}")
             return metadata
@@ -61,8 +140,9 @@ def extract_fits_metadata_with_streaming_hash(filepath: str, cameras_dict: Dict,
     """
     Worker function that extracts metadata AND calculates MD5 hash in a single file read.
     
-    This optimized version reads the file once and performs both MD5 calculation
-    and metadata extraction, reducing I/O overhead.
+    The file is read once: the primary header is parsed from the leading
+    2880-byte blocks and the data section is hashed in fixed-size chunks,
+    so worker memory stays constant regardless of frame size.
     
     Args:
         filepath: Path to FITS file
@@ -74,40 +154,82 @@ def extract_fits_metadata_with_streaming_hash(filepath: str, cameras_dict: Dict,
         Dictionary of extracted metadata with md5sum field or None on error
     """
     try:
-        # Initialize MD5 hash
-        hash_md5 = hashlib.md5()
-        
-        # Read entire file and calculate hash
-        with open(filepath, 'rb') as f:
-            file_data = f.read()
-            hash_md5.update(file_data)
+        # Parse the header from the leading blocks and hash the rest in chunks
+        header, file_md5 = read_header_with_streaming_hash(filepath)
         
-        file_md5 = hash_md5.hexdigest()
+        # Use the common metadata extraction function
+        metadata = extract_fits_metadata_simple(
+            filepath, header, cameras_dict, 
+            telescopes_dict, filter_mappings
+        )
         
-        # Now process FITS metadata from the file data in memory
-        # Create a BytesIO object to simulate file for astropy
-        file_like = BytesIO(file_data)
+        # Add MD5 hash and on-disk stat to metadata
+        metadata['md5sum'] = file_md5
+        metadata.update(file_stat_fields(filepath))
         
-        with fits.open(file_like, lazy_load_hdus=True) as hdul:
-            header = hdul[0].header
-            
-            # Use the common metadata extraction function
-            metadata = extract_fits_metadata_simple(
-                filepath, header, cameras_dict, 
-                telescopes_dict, filter_mappings
-            )
-            
-            # Add MD5 hash to metadata
-            metadata['md5sum'] = file_md5
-            
-            logger.debug(f"Successfully processed metadata + hash for {filepath}")
-            return metadata
+        logger.debug(f"Successfully processed metadata + hash for {filepath}")
+        return metadata
                 
     except Exception as e:
         logger.error(f"Error processing FITS file {filepath}: {e}")
         return None
 
 
+def init_fits_worker(cameras_dict: Dict, telescopes_dict: Dict,
+                     filter_mappings: Dict[str, str]):
+    """
+    Process pool initializer that loads shared lookup data once per worker.
+    
+    The equipment tables are stored in module globals so tasks only need
+    to carry file paths, and the equipment indexes, software profiles and
+    timezone finder are built up front instead of on the first file each
+    worker sees.
+    
+    Args:
+        cameras_dict: Dictionary of camera configurations
+        telescopes_dict: Dictionary of telescope configurations
+        filter_mappings: Dictionary of filter name mappings
+    """
+    global _worker_equipment
+    
+    _worker_equipment = (cameras_dict, telescopes_dict, filter_mappings)
+    
+    get_camera_index(cameras_dict)
+    get_telescope_index(telescopes_dict)
+    get_profile_manager()
+    if TIMEZONE_AVAILABLE:
+        get_timezone_finder()
+
+
+def process_file_chunk(filepaths: List[str],
+                       compute_hash: bool = True) -> List[Tuple[str, Optional[Dict]]]:
+    """
+    Process a chunk of paths inside one pool task.
+    
+    Must run in a worker started with init_fits_worker(). Submitting several
+    files per task amortises inter-process overhead when there are
+    thousands of small frames.
+    
+    Args:
+        filepaths: Chunk of file paths
+        compute_hash: Whether to compute MD5 hashes alongside metadata
+        
+    Returns:
+        List of (filepath, metadata or None) in input order
+    """
+    if _worker_equipment is None:
+        raise RuntimeError("Worker not initialized; use init_fits_worker as the pool initializer")
+    
+    cameras_dict, telescopes_dict, filter_mappings = _worker_equipment
+    worker_func = (extract_fits_metadata_with_streaming_hash if compute_hash
+                   else extract_fits_metadata_worker)
+    
+    return [
+        (filepath, worker_func(filepath, cameras_dict, telescopes_dict, filter_mappings))
+        for filepath in filepaths
+    ]
+
+
 def _compute_md5_worker(filepath: str) -> tuple[str, str]:
     """
     Worker function to compute MD5 hash of a file.
@@ -125,7 +247,7 @@ def _compute_md5_worker(filepath: str) -> tuple[str, str]:
         hash_md5 = hashlib.md5()
         with open(filepath, 'rb') as f:
             # Read in chunks for better memory efficiency
-            for chunk in iter(lambda: f.read(8192), b""):
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
                 hash_md5.update(chunk)
         return filepath, hash_md5.hexdigest()
     except Exception as e:
@@ -9,10 +9,20 @@ import json
 import logging
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Profile-driven fields and the SoftwareProfile attribute listing their keywords
+FIELD_KEY_ATTRS = {
+    'camera': 'camera_keys',
+    'telescope': 'telescope_keys',
+    'filter': 'filter_keys',
+    'filter_wheel': 'filter_wheel_keys',
+    'target': 'target_keys',
+    'frame_type': 'frame_type_keys'
+}
+
 
 @dataclass
 class SoftwareProfile:
@@ -52,6 +62,7 @@ class ProfileManager:
     
     def __init__(self, custom_profiles_path: Optional[str] = None):
         self.profiles: Dict[str, SoftwareProfile] = {}
+        self._compiled = False
         
         # Auto-load from profiles directory if not specified
         if custom_profiles_path is None:
@@ -94,6 +105,7 @@ class ProfileManager:
                 try:
                     profile = SoftwareProfile(**profile_data)
                     self.profiles[profile.name] = profile
+                    self._compiled = False
                     logger.info(f"Loaded custom profile: {profile.name}")
                 except Exception as e:
                     logger.error(f"Error loading profile from {profiles_path}: {e}")
@@ -123,25 +135,139 @@ class ProfileManager:
         except Exception as e:
             logger.error(f"Error reading directory {directory_path}: {e}")
     
-    def detect_software(self, header) -> Optional[str]:
+    def _compile(self):
         """
-        Detect capture software from FITS header.
+        Build priority-ordered lookup plans from the loaded profiles.
         
-        Returns profile name or None if not detected.
+        Detection becomes a map from each discriminating keyword to the
+        (rank, pattern, profile) entries that test it, and every field gets
+        an ordered tuple of (keyword, frame type mappings) per profile plus
+        one for auto-detection across all profiles. Keywords already tried
+        by a higher-priority profile are dropped from the auto plan, since
+        the first keyword present in the header always wins.
         """
-        # Try profiles in priority order
-        sorted_profiles = sorted(
+        self._sorted_profiles = sorted(
             self.profiles.values(),
             key=lambda p: p.priority,
             reverse=True
         )
         
-        for profile in sorted_profiles:
-            if profile.matches(header):
-                return profile.name
+        self._detection_plan: Dict[str, List[Tuple[int, str, str]]] = {}
+        for rank, profile in enumerate(self._sorted_profiles):
+            for key, pattern in profile.detection_keywords.items():
+                self._detection_plan.setdefault(key.upper(), []).append(
+                    (rank, pattern.lower(), profile.name)
+                )
+        
+        self._field_plans: Dict[Optional[str], Dict[str, Tuple]] = {}
+        auto_plans = {field_type: [] for field_type in FIELD_KEY_ATTRS}
+        auto_seen = {field_type: set() for field_type in FIELD_KEY_ATTRS}
+        
+        for profile in self._sorted_profiles:
+            mappings = profile.frame_type_mappings or None
+            plans = {}
+            for field_type, key_attr in FIELD_KEY_ATTRS.items():
+                field_mappings = mappings if field_type == 'frame_type' else None
+                plan = tuple(
+                    (key.upper(), field_mappings)
+                    for key in getattr(profile, key_attr, [])
+                )
+                plans[field_type] = plan
+                
+                for key, key_mappings in plan:
+                    if key not in auto_seen[field_type]:
+                        auto_seen[field_type].add(key)
+                        auto_plans[field_type].append((key, key_mappings))
+            self._field_plans[profile.name] = plans
+        
+        self._field_plans[None] = {
+            field_type: tuple(plan) for field_type, plan in auto_plans.items()
+        }
+        
+        self._wanted_keys = frozenset(self._detection_plan).union(
+            key for plans in self._field_plans.values()
+            for plan in plans.values() for key, _ in plan
+        )
+        self._compiled = True
+    
+    def _ensure_compiled(self):
+        """Compile lookup plans if profiles changed since the last build."""
+        if not self._compiled:
+            self._compile()
+    
+    def _read_keys(self, header, keys) -> Dict[str, Any]:
+        """
+        Read the values of the given keywords from the header.
+        
+        For astropy headers this is a single pass over the cards, keeping
+        the first occurrence of each keyword. Malformed cards are skipped.
+        """
+        values = {}
+        
+        cards = getattr(header, 'cards', None)
+        if cards is None:
+            for key in keys:
+                try:
+                    if key in header:
+                        values[key] = header[key]
+                except Exception as e:
+                    logger.debug(f"Error reading {key}: {e}")
+            return values
+        
+        for card in cards:
+            try:
+                key = card.keyword
+                if key in keys and key not in values:
+                    values[key] = card.value
+            except Exception as e:
+                # Skip malformed header cards
+                logger.debug(f"Error reading card: {e}")
+        
+        return values
+    
+    def _detect_from_values(self, values: Dict[str, Any]) -> Optional[str]:
+        """Pick the highest-priority profile whose detection pattern matches."""
+        best = None
+        
+        for key, entries in self._detection_plan.items():
+            if key not in values:
+                continue
+            value = str(values[key]).lower()
+            for rank, pattern, name in entries:
+                if best is not None and rank >= best[0]:
+                    break
+                if pattern in value:
+                    best = (rank, name)
+                    break
+        
+        return best[1] if best else None
+    
+    def _resolve_field(self, values: Dict[str, Any], field_type: str,
+                       profile_name: Optional[str]) -> Any:
+        """Resolve a field from pre-read header values using its lookup plan."""
+        plans = self._field_plans.get(profile_name) or self._field_plans[None]
+        
+        for key, mappings in plans.get(field_type, ()):
+            if key in values:
+                value = values[key]
+                
+                # Apply frame type mapping if applicable
+                if mappings:
+                    value = mappings.get(value, value)
+                
+                return value
         
         return None
     
+    def detect_software(self, header) -> Optional[str]:
+        """
+        Detect capture software from FITS header.
+        
+        Returns profile name or None if not detected.
+        """
+        self._ensure_compiled()
+        return self._detect_from_values(self._read_keys(header, self._detection_plan))
+    
     def get_profile(self, name: str) -> Optional[SoftwareProfile]:
         """Get profile by name."""
         return self.profiles.get(name)
@@ -159,48 +285,39 @@ class ProfileManager:
         Returns:
             Value from header or None
         """
-        if profile_name and profile_name in self.profiles:
-            profiles_to_try = [self.profiles[profile_name]]
-        else:
-            # Try all profiles in priority order
-            profiles_to_try = sorted(
-                self.profiles.values(),
-                key=lambda p: p.priority,
-                reverse=True
-            )
-        
-        # Map field type to profile attribute
-        key_attr_map = {
-            'camera': 'camera_keys',
-            'telescope': 'telescope_keys',
-            'filter': 'filter_keys',
-            'filter_wheel': 'filter_wheel_keys',
-            'target': 'target_keys',
-            'frame_type': 'frame_type_keys'
-        }
-        
-        key_attr = key_attr_map.get(field_type)
-        if not key_attr:
+        if field_type not in FIELD_KEY_ATTRS:
             return None
         
-        for profile in profiles_to_try:
-            keys = getattr(profile, key_attr, [])
-            for key in keys:
-                try:
-                    if key in header:
-                        value = header[key]
-                        
-                        # Apply frame type mapping if applicable
-                        if field_type == 'frame_type' and profile.frame_type_mappings:
-                            value = profile.frame_type_mappings.get(value, value)
-                        
-                        return value
-                except Exception as e:
-                    # Skip malformed header cards
-                    logger.debug(f"Error reading {key}: {e}")
-                    continue
+        self._ensure_compiled()
+        plans = self._field_plans.get(profile_name) or self._field_plans[None]
+        keys = frozenset(key for key, _ in plans[field_type])
         
-        return None
+        return self._resolve_field(self._read_keys(header, keys), field_type, profile_name)
+    
+    def extract_fields(self, header) -> Dict[str, Any]:
+        """
+        Detect the capture software and extract every profile-driven field.
+        
+        All keywords any profile may need are read in one pass over the
+        header cards, then detection and the per-field lookup plans run
+        against those values.
+        
+        Args:
+            header: FITS header
+            
+        Returns:
+            Dictionary with 'software' (profile name or None) and one entry
+            per field in FIELD_KEY_ATTRS (value or None)
+        """
+        self._ensure_compiled()
+        values = self._read_keys(header, self._wanted_keys)
+        
+        detected = self._detect_from_values(values)
+        fields = {'software': detected}
+        for field_type in FIELD_KEY_ATTRS:
+            fields[field_type] = self._resolve_field(values, field_type, detected)
+        
+        return fields
     
     def list_profiles(self) -> List[Dict]:
         """Get list of all profiles with basic info."""
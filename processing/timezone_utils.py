@@ -7,10 +7,15 @@ calculate observation dates in local time.
 
 import logging
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Coordinates are rounded to this many decimal places (~1 km) before lookup so
+# that frames from the same site share cache entries.
+COORD_CACHE_PRECISION = 2
+
 # Try to import optional timezone libraries
 try:
     from timezonefinder import TimezoneFinder
@@ -20,6 +25,52 @@ except ImportError:
     TIMEZONE_AVAILABLE = False
     logger.debug("timezonefinder/pytz not available - will use config offset")
 
+# One TimezoneFinder per process; loading its polygon data is expensive.
+_timezone_finder = None
+
+
+def get_timezone_finder():
+    """
+    Get the process-wide TimezoneFinder, creating it on first use.
+    
+    Each multiprocessing worker builds its own instance once and reuses it
+    for every file it processes.
+    """
+    global _timezone_finder
+    
+    if _timezone_finder is None:
+        _timezone_finder = TimezoneFinder()
+    
+    return _timezone_finder
+
+
+@lru_cache(maxsize=1024)
+def _timezone_name_at(latitude: float, longitude: float) -> Optional[str]:
+    """Look up the IANA timezone name for (rounded) coordinates."""
+    return get_timezone_finder().timezone_at(lat=latitude, lng=longitude)
+
+
+@lru_cache(maxsize=4096)
+def _cached_offset_hours(latitude: float, longitude: float,
+                         hour: datetime) -> Optional[int]:
+    """Offset in hours for rounded coordinates at an hour-truncated timestamp."""
+    tz_name = _timezone_name_at(latitude, longitude)
+    
+    if tz_name:
+        tz = pytz.timezone(tz_name)
+        # Get offset at the specific timestamp (handles DST)
+        offset = tz.utcoffset(hour)
+        if offset:
+            return int(offset.total_seconds() / 3600)
+    
+    return None
+
+
+def clear_timezone_cache():
+    """Clear memoized timezone lookups (mainly for testing and benchmarks)."""
+    _timezone_name_at.cache_clear()
+    _cached_offset_hours.cache_clear()
+
 
 def get_timezone_offset_from_coords(latitude: float, longitude: float, 
                                     timestamp: datetime) -> Optional[int]:
@@ -38,15 +89,13 @@ def get_timezone_offset_from_coords(latitude: float, longitude: float,
         return None
     
     try:
-        tf = TimezoneFinder()
-        tz_name = tf.timezone_at(lat=latitude, lng=longitude)
-        
-        if tz_name:
-            tz = pytz.timezone(tz_name)
-            # Get offset at the specific timestamp (handles DST)
-            offset = tz.utcoffset(timestamp)
-            if offset:
-                return int(offset.total_seconds() / 3600)
+        # Results are memoized per site and hour; DST can only change on an
+        # hour boundary so truncating the timestamp keeps offsets correct.
+        return _cached_offset_hours(
+            round(latitude, COORD_CACHE_PRECISION),
+            round(longitude, COORD_CACHE_PRECISION),
+            timestamp.replace(minute=0, second=0, microsecond=0)
+        )
     
     except Exception as e:
         logger.debug(f"Could not determine timezone from coordinates: {e}")
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from collections import defaultdict
 
 import click
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
 from models import DatabaseService, FitsFile, ProcessingSession, ProcessingSessionFile
@@ -40,6 +41,8 @@ class ProcessingSessionInfo:
     processing_started: Optional[datetime] = None
     processing_completed: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    total_exposure: float = 0.0  # LIGHT integration time in seconds
+    total_size: int = 0  # Bytes of staged files
 
     def __post_init__(self):
         """Ensure social_urls is a list."""
@@ -1213,8 +1216,53 @@ _No processing steps completed yet_
             self._create_session_info_file(session_folder, ps.id, ps.name, objects,
                                          frame_counts, ps.notes, None)
         
-    def list_processing_sessions(self, status_filter: Optional[str] = None) -> List[ProcessingSessionInfo]:
-        """List all processing sessions with optional status filter."""
+    def _session_file_totals(self, session: Session, session_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Per-session frame counts, LIGHT exposure and staged size in one grouped query.
+        
+        Returns:
+            Dict of session id -> {'frame_counts': {...}, 'total_exposure': s, 'total_size': bytes}
+        """
+        totals = defaultdict(lambda: {
+            'frame_counts': {'LIGHT': 0, 'DARK': 0, 'FLAT': 0, 'BIAS': 0},
+            'total_exposure': 0.0,
+            'total_size': 0
+        })
+        if not session_ids:
+            return totals
+        
+        rows = session.query(
+            ProcessingSessionFile.processing_session_id,
+            ProcessingSessionFile.frame_type,
+            func.count(ProcessingSessionFile.id),
+            func.sum(case((ProcessingSessionFile.frame_type == 'LIGHT', FitsFile.exposure), else_=0)),
+            func.sum(ProcessingSessionFile.file_size)
+        ).outerjoin(
+            FitsFile, FitsFile.id == ProcessingSessionFile.fits_file_id
+        ).filter(
+            ProcessingSessionFile.processing_session_id.in_(session_ids)
+        ).group_by(
+            ProcessingSessionFile.processing_session_id, ProcessingSessionFile.frame_type
+        ).all()
+        
+        for session_id, frame_type, count, exposure, size in rows:
+            entry = totals[session_id]
+            if frame_type in entry['frame_counts']:
+                entry['frame_counts'][frame_type] += count
+            entry['total_exposure'] += exposure or 0
+            entry['total_size'] += size or 0
+        
+        return totals
+    
+    def list_processing_sessions(self, status_filter: Optional[str] = None,
+                                 limit: Optional[int] = None, offset: int = 0,
+                                 session_id: Optional[str] = None) -> List[ProcessingSessionInfo]:
+        """
+        List processing sessions (newest first) with optional status filter.
+        
+        limit/offset select one page; session_id selects a single session.
+        File counts for all listed sessions come from one grouped query.
+        """
         session = self.db_service.db_manager.get_session()
         
         try:
@@ -1222,21 +1270,20 @@ _No processing steps completed yet_
             
             if status_filter:
                 query = query.filter(ProcessingSession.status == status_filter)
+            if session_id:
+                query = query.filter(ProcessingSession.id == session_id)
             
             query = query.order_by(ProcessingSession.created_at.desc())
+            if limit is not None:
+                query = query.offset(offset).limit(limit)
             sessions = query.all()
             
+            file_totals = self._session_file_totals(session, [ps.id for ps in sessions])
+            
             result = []
             for ps in sessions:
-                # Get file counts
-                file_counts = session.query(ProcessingSessionFile.frame_type).filter(
-                    ProcessingSessionFile.processing_session_id == ps.id
-                ).all()
-                
-                frame_counts = {'LIGHT': 0, 'DARK': 0, 'FLAT': 0, 'BIAS': 0}
-                for (frame_type,) in file_counts:
-                    if frame_type in frame_counts:
-                        frame_counts[frame_type] += 1
+                totals = file_totals[ps.id]
+                frame_counts = totals['frame_counts']
                 
                 # Parse JSON fields
                 objects = json.loads(ps.objects) if ps.objects else []
@@ -1260,7 +1307,9 @@ _No processing steps completed yet_
                     social_urls=social_urls,
                     processing_started=ps.processing_started,
                     processing_completed=ps.processing_completed,
-                    updated_at=ps.updated_at
+                    updated_at=ps.updated_at,
+                    total_exposure=totals['total_exposure'],
+                    total_size=totals['total_size']
                 ))
             
             return result
@@ -1268,13 +1317,36 @@ _No processing steps completed yet_
         finally:
             session.close()    
     
+    def count_processing_sessions(self, status_filter: Optional[str] = None) -> int:
+        """Count processing sessions with optional status filter."""
+        session = self.db_service.db_manager.get_session()
+        
+        try:
+            query = session.query(func.count(ProcessingSession.id))
+            if status_filter:
+                query = query.filter(ProcessingSession.status == status_filter)
+            return query.scalar() or 0
+            
+        finally:
+            session.close()
+    
+    def list_processing_session_ids(self, status_filter: Optional[str] = None) -> List[str]:
+        """Processing session IDs, newest first, without loading file counts."""
+        session = self.db_service.db_manager.get_session()
+        
+        try:
+            query = session.query(ProcessingSession.id)
+            if status_filter:
+                query = query.filter(ProcessingSession.status == status_filter)
+            return [session_id for (session_id,) in query.order_by(ProcessingSession.created_at.desc())]
+            
+        finally:
+            session.close()
+    
     def get_processing_session(self, session_id: str) -> Optional[ProcessingSessionInfo]:
         """Get details for a specific processing session."""
-        sessions = self.list_processing_sessions()
-        for session in sessions:
-            if session.id == session_id:
-                return session
-        return None
+        sessions = self.list_processing_sessions(session_id=session_id)
+        return sessions[0] if sessions else None
     
     def update_session_status(self, session_id: str, status: str, 
                             notes: Optional[str] = None) -> bool:
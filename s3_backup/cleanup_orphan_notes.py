@@ -21,7 +21,7 @@ sys.path.append(str(Path(__file__).parent))
 from config import load_config
 from models import DatabaseManager, DatabaseService
 from s3_backup.manager import S3BackupManager, S3BackupConfig
-from s3_backup.models import Base as BackupBase, S3BackupSessionNote, S3BackupProcessingSession
+from s3_backup.models import create_backup_tables, S3BackupSessionNote, S3BackupProcessingSession
 
 logger = logging.getLogger(__name__)
 
@@ -213,7 +213,7 @@ def main(config, s3_config, dry_run, imaging, processing, verbose):
         db_service = DatabaseService(db_manager)
         
         # Create backup tables if needed
-        BackupBase.metadata.create_all(bind=db_manager.engine)
+        create_backup_tables(db_manager.engine)
         
         s3_config_obj = S3BackupConfig(s3_config)
         
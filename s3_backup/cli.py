@@ -18,7 +18,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 from config import load_config
 from models import DatabaseManager, DatabaseService, ImagingSession as SessionModel
 from s3_backup.manager import S3BackupManager, S3BackupConfig
-from s3_backup.models import Base as BackupBase, S3BackupArchive
+from s3_backup.scheduler import BackupScheduler
+from s3_backup.models import create_backup_tables, S3BackupArchive
 from s3_backup.models import S3BackupSessionNote, S3BackupProcessingSession
 
 logger = logging.getLogger(__name__)
@@ -31,7 +32,7 @@ def get_backup_manager(config_path: str = 'config.json', s3_config_path: str = '
     db_service = DatabaseService(db_manager)
     
     # Create backup tables if needed
-    BackupBase.metadata.create_all(bind=db_manager.engine)
+    create_backup_tables(db_manager.engine)
     
     s3_config = S3BackupConfig(s3_config_path)
     
@@ -85,7 +86,11 @@ def cleanup(ctx, dry_run):
             click.echo(f"✓ Temp directory does not exist: {temp_dir}")
             return
 
-        archives = list(temp_dir.glob("*.tar*"))
+        # Archives of interrupted uploads are needed to resume them
+        in_progress = backup_manager.in_progress_archive_paths()
+        archives = [p for p in temp_dir.glob("*.tar*") if p not in in_progress]
+        if in_progress:
+            click.echo(f"Keeping {len(in_progress)} archive(s) of interrupted uploads (resumed by 'upload')")
         if not archives:
             click.echo(f"✓ No orphaned archives found in: {temp_dir}")
             return
@@ -203,10 +208,10 @@ def status(ctx):
         total_sessions = session_db.query(SessionModel).count()
         
         # Get backed up sessions
-        backed_up = session_db.query(S3BackupArchive).count()
+        backed_up = session_db.query(S3BackupArchive).filter(S3BackupArchive.is_complete()).count()
         
         # Get backup stats
-        backed_up_archives = session_db.query(S3BackupArchive).all()
+        backed_up_archives = session_db.query(S3BackupArchive).filter(S3BackupArchive.is_complete()).all()
         
         total_original_size = sum(a.original_size_bytes or 0 for a in backed_up_archives)
         total_compressed_size = sum(a.compressed_size_bytes or 0 for a in backed_up_archives)
@@ -262,9 +267,20 @@ def status(ctx):
 @click.option('--limit', '-l', type=int, help='Limit number of NEW sessions to upload (skips existing)')
 @click.option('--skip-existing', is_flag=True, default=True, help='Skip already backed up sessions')
 @click.option('--no-cleanup', is_flag=True, help='Keep local archives after upload')
+@click.option('--stream/--no-stream', default=None,
+              help='Stream archives straight to S3 without a temp file (default: archive_settings.streaming_upload)')
+@click.option('--max-temp-gb', type=float,
+              help='Temp space for archives waiting to upload (default: archive_settings.max_temp_space_gb)')
+@click.option('--max-bandwidth', type=float,
+              help='Upload bandwidth limit in MB/s (default: upload_settings.max_bandwidth_mbps)')
 @click.pass_context
-def upload(ctx, session_id, year, limit, skip_existing, no_cleanup):
-    """Upload imaging session(s) to S3."""
+def upload(ctx, session_id, year, limit, skip_existing, no_cleanup, stream, max_temp_gb, max_bandwidth):
+    """Upload imaging session(s) to S3.
+    
+    Archives are built in the temp dir one session ahead of the upload, and
+    an interrupted upload resumes where it stopped on the next run. With
+    --stream, each session is instead tarred straight into S3 in turn.
+    """
     backup_manager, db_manager, db_service = get_backup_manager(
         ctx.obj['config'], ctx.obj['s3_config']
     )
@@ -354,56 +370,52 @@ def upload(ctx, session_id, year, limit, skip_existing, no_cleanup):
             'checked_count': checked_count
         }
         
-        # Upload each session
-        with tqdm(total=len(sessions), desc="Uploading sessions", unit="session") as pbar:
-            for session_model in sessions:
-                pbar.set_description(f"Processing {session_model.id[:20]}")
-
-                result = backup_manager.backup_session(
+        if stream is None:
+            stream = backup_manager.s3_config.config.get('archive_settings', {}).get('streaming_upload', False)
+        
+        if stream:
+            backups = (
+                backup_manager.backup_session(
                     session_model.id,
                     skip_existing=skip_existing,
-                    cleanup_archive=not no_cleanup
+                    cleanup_archive=not no_cleanup,
+                    streaming=True
                 )
+                for session_model in sessions
+            )
+        else:
+            scheduler = BackupScheduler(
+                backup_manager,
+                max_temp_bytes=int(max_temp_gb * 1024 ** 3) if max_temp_gb else None,
+                max_bandwidth_mbps=max_bandwidth
+            )
+            backups = scheduler.iter_backups(
+                [session_model.id for session_model in sessions],
+                skip_existing=skip_existing,
+                cleanup_archive=not no_cleanup
+            )
+        
+        # Upload each session
+        with tqdm(total=len(sessions), desc="Uploading sessions", unit="session") as pbar:
+            for result in backups:
+                pbar.set_description(f"Processed {result.session_id[:20]}")
                 
                 if result.success:
                     if result.error and "skipped" in result.error.lower():
                         results['skipped'] += 1
-                        tqdm.write(f"⏭️  Skipped (exists): {session_model.id}")
+                        tqdm.write(f"⏭️  Skipped (exists): {result.session_id}")
                     else:
                         results['success'] += 1
                         results['total_uploaded_bytes'] += result.compressed_size
-
-                        # Save to database
-                        backup_archive = S3BackupArchive(
-                            session_id=session_model.id,
-                            session_date=session_model.date,
-                            session_year=datetime.strptime(session_model.date, '%Y-%m-%d').year,
-                            s3_bucket=backup_manager.s3_config.bucket,
-                            s3_key=result.s3_key,
-                            s3_region=backup_manager.s3_config.region,
-                            s3_etag=result.s3_etag,
-                            file_count=result.file_count,
-                            original_size_bytes=result.original_size,
-                            compressed_size_bytes=result.compressed_size,
-                            compression_ratio=result.compression_ratio,
-                            uploaded_at=datetime.now(),
-                            verified=True,
-                            verification_method='etag',
-                            camera_name=session_model.camera,
-                            telescope_name=session_model.telescope
-                        )
-                        
-                        session_db.add(backup_archive)
-                        session_db.commit()
                         
                         tqdm.write(
-                            f"✅ {session_model.id}: "
+                            f"✅ {result.session_id}: "
                             f"{result.file_count} files, "
                             f"{format_bytes(result.compressed_size)}"
                         )
                 else:
                     results['failed'] += 1
-                    tqdm.write(f"❌ Failed: {session_model.id} - {result.error}")
+                    tqdm.write(f"❌ Failed: {result.session_id} - {result.error}")
                 
                 pbar.update(1)
         
@@ -441,7 +453,7 @@ def verify(ctx, session_id, verify_all):
     
     try:
         # Get archives to verify
-        query = session_db.query(S3BackupArchive)
+        query = session_db.query(S3BackupArchive).filter(S3BackupArchive.is_complete())
         
         if session_id:
             query = query.filter(S3BackupArchive.session_id == session_id)
@@ -457,6 +469,9 @@ def verify(ctx, session_id, verify_all):
         
         click.echo(f"\nVerifying {len(archives)} archive(s)...")
         
+        # One fresh listing of the archive prefix answers every check below
+        backup_manager.inventory.load(backup_manager.s3_config.config['s3_paths']['raw_archives'], refresh=True)
+        
         verified_count = 0
         failed_count = 0
         
@@ -512,7 +527,8 @@ def list_sessions(ctx, year, not_backed_up):
         for session_model in sessions:
             # Check if backed up
             backup_archive = session_db.query(S3BackupArchive).filter(
-                S3BackupArchive.session_id == session_model.id
+                S3BackupArchive.session_id == session_model.id,
+                S3BackupArchive.is_complete()
             ).first()
 
             backed_up = backup_archive is not None
@@ -1191,44 +1207,34 @@ def _sync_fits_archives(backup_manager, session_db, dry_run):
         click.echo("   Listing archives in S3...")
         
         s3_archives = {}
-        paginator = backup_manager.s3_client.get_paginator('list_objects_v2')
         
-        # Scan the raw_archives path
+        # Scan the raw_archives path (a fresh listing, which also refreshes the inventory cache)
         raw_path = backup_manager.s3_config.config['s3_paths']['raw_archives']
         
-        for page in paginator.paginate(
-            Bucket=backup_manager.s3_config.bucket,
-            Prefix=raw_path
-        ):
-            if 'Contents' not in page:
-                continue
-            
-            for obj in page['Contents']:
-                key = obj['Key']
+        for key, obj in backup_manager.inventory.objects(raw_path, refresh=True).items():
+            # Parse session_id from key (e.g., "backups/raw/2024/SESSION_ID.tar.gz")
+            if key.endswith('.tar') or key.endswith('.tar.gz'):
+                filename = Path(key).stem
+                if filename.endswith('.tar'):
+                    filename = filename[:-4]  # Remove .tar from .tar.gz
                 
-                # Parse session_id from key (e.g., "backups/raw/2024/SESSION_ID.tar.gz")
-                if key.endswith('.tar') or key.endswith('.tar.gz'):
-                    filename = Path(key).stem
-                    if filename.endswith('.tar'):
-                        filename = filename[:-4]  # Remove .tar from .tar.gz
-                    
-                    session_id = filename
-                    
-                    # Extract year from path
-                    parts = key.split('/')
-                    try:
-                        year_idx = parts.index('raw') + 1
-                        year = int(parts[year_idx])
-                    except:
-                        year = None
-                    
-                    s3_archives[session_id] = {
-                        's3_key': key,
-                        'year': year,
-                        'size': obj['Size'],
-                        'etag': obj['ETag'].strip('"'),
-                        'last_modified': obj['LastModified']
-                    }
+                session_id = filename
+                
+                # Extract year from path
+                parts = key.split('/')
+                try:
+                    year_idx = parts.index('raw') + 1
+                    year = int(parts[year_idx])
+                except:
+                    year = None
+                
+                s3_archives[session_id] = {
+                    's3_key': key,
+                    'year': year,
+                    'size': obj.size,
+                    'etag': obj.etag,
+                    'last_modified': obj.last_modified
+                }
         
         stats['in_s3'] = len(s3_archives)
         click.echo(f"   Found {stats['in_s3']} archives in S3")
@@ -1312,68 +1318,49 @@ def _sync_markdown_files(backup_manager, session_db, dry_run):
         
         s3_imaging = {}
         s3_processing = {}
-        paginator = backup_manager.s3_client.get_paginator('list_objects_v2')
         
-        # Scan imaging session notes
+        # Scan imaging session notes (fresh listings, which also refresh the inventory cache)
         session_path = backup_manager.s3_config.config['s3_paths']['session_notes']
         
-        for page in paginator.paginate(
-            Bucket=backup_manager.s3_config.bucket,
-            Prefix=session_path
-        ):
-            if 'Contents' not in page:
-                continue
-            
-            for obj in page['Contents']:
-                key = obj['Key']
+        for key, obj in backup_manager.inventory.objects(session_path, refresh=True).items():
+            # FIXED: Look for .md files (no suffix)
+            if key.endswith('.md'):
+                # Extract session_id from filename
+                filename = Path(key).stem  # Just the session_id
+                session_id = filename
                 
-                # FIXED: Look for .md files (no suffix)
-                if key.endswith('.md'):
-                    # Extract session_id from filename
-                    filename = Path(key).stem  # Just the session_id
-                    session_id = filename
-                    
-                    # Extract year from path
-                    parts = key.split('/')
-                    try:
-                        year = int(parts[-2])  # Year is parent directory
-                    except:
-                        year = None
-                    
-                    s3_imaging[session_id] = {
-                        's3_key': key,
-                        'year': year,
-                        'size': obj['Size'],
-                        'etag': obj['ETag'].strip('"'),
-                        'last_modified': obj['LastModified']
-                    }
+                # Extract year from path
+                parts = key.split('/')
+                try:
+                    year = int(parts[-2])  # Year is parent directory
+                except:
+                    year = None
+                
+                s3_imaging[session_id] = {
+                    's3_key': key,
+                    'year': year,
+                    'size': obj.size,
+                    'etag': obj.etag,
+                    'last_modified': obj.last_modified
+                }
 
         # Scan processing session notes
         processing_path = backup_manager.s3_config.config['s3_paths']['processing_notes']
         
-        for page in paginator.paginate(
-            Bucket=backup_manager.s3_config.bucket,
-            Prefix=processing_path
-        ):
-            if 'Contents' not in page:
-                continue
-            
-            for obj in page['Contents']:
-                key = obj['Key']
+        for key, obj in backup_manager.inventory.objects(processing_path, refresh=True).items():
+            # FIXED: Look for .md files (no suffix, not in subfolders)
+            if key.endswith('.md'):
+                # Extract session_id from filename
+                filename = Path(key).stem
+                session_id = filename
+                
+                s3_processing[session_id] = {
+                    's3_key': key,
+                    'size': obj.size,
+                    'etag': obj.etag,
+                    'last_modified': obj.last_modified
+                }
                 
-                # FIXED: Look for .md files (no suffix, not in subfolders)
-                if key.endswith('.md'):
-                    # Extract session_id from filename
-                    filename = Path(key).stem
-                    session_id = filename
-                    
-                    s3_processing[session_id] = {
-                        's3_key': key,
-                        'size': obj['Size'],
-                        'etag': obj['ETag'].strip('"'),
-                        'last_modified': obj['LastModified']
-                    }
-                    
         stats['in_s3'] = len(s3_imaging) + len(s3_processing)
         click.echo(f"   Found {len(s3_imaging)} imaging + {len(s3_processing)} processing = {stats['in_s3']} markdown files in S3")
         
@@ -1520,13 +1507,15 @@ def _print_sync_summary(stats, dry_run):
 @cli.command('backup-database')
 @click.option('--db-path', type=click.Path(exists=True), help='Path to SQLite database file (default: from config)')
 @click.option('--description', help='Optional description for this backup version')
+@click.option('--full', is_flag=True, help='Upload the whole file instead of only changed chunks')
 @click.pass_context
-def backup_database(ctx, db_path, description):
+def backup_database(ctx, db_path, description, full):
     """
     Backup the database file to S3 with versioning.
     
-    Creates a timestamped backup of the SQLite database in S3.
-    S3 bucket versioning keeps all previous versions automatically.
+    By default takes a consistent snapshot and uploads only the chunks that
+    changed since earlier backups; every version stays restorable.
+    With --full, uploads the whole file and relies on S3 bucket versioning.
     """
     backup_manager, db_manager, db_service = get_backup_manager(
         ctx.obj['config'], ctx.obj['s3_config']
@@ -1547,12 +1536,19 @@ def backup_database(ctx, db_path, description):
         
         click.echo(f"\n💾 Backing up database: {db_path.name}")
         
-        result = backup_manager.backup_database(db_path, description)
+        result = backup_manager.backup_database(db_path, description,
+                                                incremental=False if full else None)
         
         if result['success']:
             click.echo(f"✅ Database backup successful!")
             click.echo(f"   S3 Key: {result['s3_key']}")
             click.echo(f"   Size: {format_bytes(result['size'])}")
+            if 'total_chunks' in result:
+                click.echo(f"   Changed chunks: {result['uploaded_chunks']}/{result['total_chunks']} "
+                           f"({format_bytes(result['uploaded_bytes'])} uploaded)")
+            if result.get('pruned', {}).get('deleted_versions'):
+                click.echo(f"   Pruned: {result['pruned']['deleted_versions']} old versions, "
+                           f"{result['pruned']['deleted_chunks']} unused chunks")
             if result.get('version_id'):
                 click.echo(f"   Version ID: {result['version_id']}")
             if description:
@@ -1588,10 +1584,11 @@ def list_database_backups(ctx):
                 v['timestamp'],
                 format_bytes(v['size']),
                 v.get('description', '-')[:40],
-                v.get('version_id', '-')[:20]
+                v.get('mode', 'full'),
+                v.get('version_id') or '-'
             ])
         
-        headers = ['Timestamp', 'Size', 'Description', 'Version ID']
+        headers = ['Timestamp', 'Size', 'Description', 'Type', 'Version ID']
         click.echo(tabulate(table_data, headers=headers, tablefmt='grid'))
         click.echo(f"\nTotal: {len(versions)} backup(s)\n")
         
@@ -1600,7 +1597,7 @@ def list_database_backups(ctx):
 
 
 @cli.command('restore-database')
-@click.option('--version-id', required=True, help='S3 version ID to restore')
+@click.option('--version-id', required=True, help='Version ID to restore (from list-database-backups)')
 @click.option('--output', type=click.Path(), required=True, help='Output path for restored database')
 @click.pass_context
 def restore_database(ctx, version_id, output):
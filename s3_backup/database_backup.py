@@ -0,0 +1,374 @@
+"""Incremental SQLite database backups.
+
+A backup takes a consistent snapshot with SQLite's online backup API, cuts
+it into fixed-size chunks and uploads only the chunks S3 does not have yet.
+Chunks are stored under the SHA-256 of their content, so a chunk shared by
+many versions is stored once; each version is a small JSON manifest listing
+its chunks in order, and restoring a version concatenates them again.
+
+SQLite rewrites pages in place, so page-aligned fixed-size chunks keep a
+small change confined to a few chunks. Content-defined chunking only pays
+off when data shifts position, which database pages do not (a VACUUM
+rewrites most chunks either way).
+
+Chunks and manifests are stored untagged in STANDARD. The tag-based
+archival lifecycle rules must never move them to Glacier: a new version
+reuses chunks written long ago, so it could not be restored. Old versions
+are removed by prune() instead, which also deletes the chunks no remaining
+version references.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+DEFAULT_CHUNK_SIZE_MB = 1
+
+# Retention defaults: keep the newest versions, and everything younger than keep_days
+DEFAULT_KEEP_VERSIONS = 30
+DEFAULT_KEEP_DAYS = 30
+
+# Unreferenced chunks younger than this may belong to a backup still in progress
+CHUNK_GRACE_PERIOD = timedelta(days=1)
+
+# A backup reusing a chunk older than this copies it onto itself first, so a
+# concurrent prune() still sees it inside the grace period
+CHUNK_REFRESH_AGE = CHUNK_GRACE_PERIOD / 2
+
+# Keys per delete_objects request (S3 maximum)
+DELETE_BATCH_SIZE = 1000
+
+# Pages copied per backup-API step; other connections can write between steps
+SNAPSHOT_PAGES_PER_STEP = 4096
+
+MANIFEST_FORMAT = 1
+
+# Version ids look like "fits_catalog.db@20250115T093000Z"
+VERSION_ID_PATTERN = re.compile(r'^(?P<database>.+)@(?P<timestamp>\d{8}T\d{6}Z)$')
+
+
+def snapshot_database(db_path: Path, snapshot_path: Path) -> int:
+    """
+    Copy db_path to snapshot_path with the SQLite online backup API.
+
+    The copy is a consistent state of the database even while other
+    connections write to it. Returns the database page size.
+    """
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        target = sqlite3.connect(str(snapshot_path))
+        try:
+            source.backup(target, pages=SNAPSHOT_PAGES_PER_STEP)
+            return target.execute('PRAGMA page_size').fetchone()[0]
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+
+def iter_chunks(path: Path, chunk_size: int) -> Iterator[bytes]:
+    """Read path in chunk_size pieces."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+class IncrementalDatabaseBackup:
+    """Chunked, deduplicated database versions under one S3 prefix."""
+
+    def __init__(self, s3_client, bucket: str, prefix: str, temp_dir: Path,
+                 chunk_size_mb: float = DEFAULT_CHUNK_SIZE_MB, max_concurrency: int = 4):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.chunk_prefix = f"{prefix.strip('/')}/chunks/"
+        self.manifest_prefix = f"{prefix.strip('/')}/manifests/"
+        self.temp_dir = Path(temp_dir)
+        self.chunk_size = max(int(chunk_size_mb * MB), 64 * 1024)
+        self.max_concurrency = max(1, max_concurrency)
+
+    @staticmethod
+    def is_version_id(version_id: Optional[str]) -> bool:
+        """Whether version_id names an incremental version (not an S3 object version)."""
+        return bool(version_id and VERSION_ID_PATTERN.match(version_id))
+
+    def manifest_key(self, version_id: str) -> str:
+        match = VERSION_ID_PATTERN.match(version_id)
+        if not match:
+            raise ValueError(f"Not an incremental database version: {version_id}")
+        return f"{self.manifest_prefix}{match['database']}/{match['timestamp']}.json"
+
+    def backup(self, db_path: Path, description: Optional[str] = None) -> Dict:
+        """
+        Snapshot db_path and upload the chunks S3 does not have yet.
+
+        Returns:
+            Dict with version_id, manifest key, size and chunk/upload counts
+        """
+        created = datetime.now(timezone.utc).replace(microsecond=0)
+        version_id = f"{db_path.name}@{created.strftime('%Y%m%dT%H%M%SZ')}"
+
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        snapshot_path = self.temp_dir / f"{db_path.name}.snapshot"
+        snapshot_path.unlink(missing_ok=True)
+
+        try:
+            logger.info(f"Taking snapshot of {db_path}...")
+            page_size = snapshot_database(db_path, snapshot_path)
+            # Whole pages per chunk, so one changed page touches one chunk
+            chunk_size = max(page_size, self.chunk_size // page_size * page_size)
+
+            file_hash = hashlib.sha256()
+            hashes = []
+            for chunk in iter_chunks(snapshot_path, chunk_size):
+                file_hash.update(chunk)
+                hashes.append(hashlib.sha256(chunk).hexdigest())
+
+            stored = self._list_chunks()
+            refresh_cutoff = datetime.now(timezone.utc) - CHUNK_REFRESH_AGE
+            missing = {}
+            stale = set()
+            for index, digest in enumerate(hashes):
+                if digest not in stored:
+                    missing.setdefault(digest, index)
+                elif stored[digest] < refresh_cutoff:
+                    # An old chunk may be unreferenced until our manifest exists
+                    stale.add(digest)
+
+            logger.info(f"Snapshot: {len(hashes)} chunks, {len(missing)} new, "
+                        f"{len(stale)} to refresh")
+
+            with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                    thread_name_prefix="db-chunk") as pool:
+                uploaded_bytes = sum(pool.map(
+                    lambda item: self._upload_chunk(snapshot_path, chunk_size, *item),
+                    missing.items()
+                ))
+                list(pool.map(self._refresh_chunk, stale))
+
+            size = snapshot_path.stat().st_size
+            manifest = {
+                'format': MANIFEST_FORMAT,
+                'version_id': version_id,
+                'database': db_path.name,
+                'created_at': created.isoformat(),
+                'description': description or '',
+                'size': size,
+                'sha256': file_hash.hexdigest(),
+                'page_size': page_size,
+                'chunk_size': chunk_size,
+                'chunks': hashes,
+            }
+            manifest_key = self.manifest_key(version_id)
+            self._put(manifest_key, json.dumps(manifest).encode(), 'application/json')
+
+        finally:
+            snapshot_path.unlink(missing_ok=True)
+
+        logger.info(f"✅ Database version {version_id}: uploaded {len(missing)}/{len(hashes)} chunks "
+                    f"({uploaded_bytes} bytes)")
+
+        return {
+            'success': True,
+            's3_key': manifest_key,
+            'version_id': version_id,
+            'size': size,
+            'description': description,
+            'total_chunks': len(hashes),
+            'uploaded_chunks': len(missing),
+            'uploaded_bytes': uploaded_bytes,
+            'refreshed_chunks': len(stale),
+        }
+
+    def list_versions(self) -> List[Dict]:
+        """All incremental versions, in the shape of S3BackupManager.list_database_versions()."""
+        keys, manifests = self._load_manifests()
+
+        latest = {}
+        for manifest in manifests:
+            name = manifest['database']
+            if name not in latest or manifest['created_at'] > latest[name]:
+                latest[name] = manifest['created_at']
+
+        return [
+            {
+                'version_id': manifest['version_id'],
+                's3_key': key,
+                'timestamp': manifest['created_at'],
+                'size': manifest['size'],
+                'description': manifest.get('description', ''),
+                'original_filename': manifest['database'],
+                'is_latest': latest[manifest['database']] == manifest['created_at'],
+                'mode': 'incremental',
+            }
+            for key, manifest in zip(keys, manifests)
+        ]
+
+    def restore(self, version_id: str, output_path: Path) -> Dict:
+        """Reassemble a version into output_path, checking every chunk's hash."""
+        manifest = self._get_manifest(self.manifest_key(version_id))
+        partial_path = output_path.with_name(output_path.name + '.partial')
+        file_hash = hashlib.sha256()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                    thread_name_prefix="db-chunk") as pool, \
+                    open(partial_path, 'wb') as f:
+                # map() yields in order while fetching ahead on the pool
+                for chunk in pool.map(self._get_chunk, manifest['chunks']):
+                    file_hash.update(chunk)
+                    f.write(chunk)
+
+            if file_hash.hexdigest() != manifest['sha256']:
+                raise ValueError(f"Restored database checksum mismatch for {version_id}")
+
+            partial_path.replace(output_path)
+        finally:
+            partial_path.unlink(missing_ok=True)
+
+        logger.info(f"✅ Database version {version_id} restored to {output_path}")
+
+        return {
+            'success': True,
+            'version_id': version_id,
+            'output_path': str(output_path),
+            'size': output_path.stat().st_size
+        }
+
+    def prune(self, keep_versions: int = DEFAULT_KEEP_VERSIONS,
+              keep_days: float = DEFAULT_KEEP_DAYS) -> Dict:
+        """
+        Delete old versions and the chunks no remaining version uses.
+
+        Per database, the newest keep_versions versions and all versions
+        younger than keep_days are kept. Unreferenced chunks are deleted
+        once they are older than CHUNK_GRACE_PERIOD, so a backup running
+        concurrently (chunks uploaded, manifest not yet written) is safe;
+        backup() refreshes the old chunks it reuses for the same reason.
+
+        Returns:
+            Dict with deleted_versions, deleted_chunks, kept_versions
+        """
+        keys, manifests = self._load_manifests()
+        cutoff = datetime.now(timezone.utc) - timedelta(days=keep_days)
+
+        by_database: Dict[str, List] = {}
+        for key, manifest in zip(keys, manifests):
+            by_database.setdefault(manifest['database'], []).append((key, manifest))
+
+        expired_keys = []
+        referenced: Set[str] = set()
+        for versions in by_database.values():
+            versions.sort(key=lambda item: item[1]['created_at'], reverse=True)
+            for index, (key, manifest) in enumerate(versions):
+                if index < keep_versions or datetime.fromisoformat(manifest['created_at']) >= cutoff:
+                    referenced.update(manifest['chunks'])
+                else:
+                    expired_keys.append(key)
+
+        # Manifests first: a chunk is only unreferenced once no manifest names it
+        self._delete(expired_keys)
+
+        grace_cutoff = datetime.now(timezone.utc) - CHUNK_GRACE_PERIOD
+        unreferenced = [
+            self._chunk_key(digest)
+            for digest, last_modified in self._list_chunks().items()
+            if digest not in referenced and last_modified < grace_cutoff
+        ]
+        self._delete(unreferenced)
+
+        if expired_keys or unreferenced:
+            logger.info(f"Pruned {len(expired_keys)} database versions and {len(unreferenced)} chunks")
+
+        return {
+            'deleted_versions': len(expired_keys),
+            'deleted_chunks': len(unreferenced),
+            'kept_versions': len(keys) - len(expired_keys),
+        }
+
+    def _load_manifests(self):
+        """Keys and parsed contents of every manifest."""
+        keys = [
+            obj['Key']
+            for page in self.s3_client.get_paginator('list_objects_v2').paginate(
+                Bucket=self.bucket, Prefix=self.manifest_prefix)
+            for obj in page.get('Contents', [])
+            if obj['Key'].endswith('.json')
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                thread_name_prefix="db-manifest") as pool:
+            manifests = list(pool.map(self._get_manifest, keys))
+
+        return keys, manifests
+
+    def _list_chunks(self) -> Dict[str, datetime]:
+        """Hash -> LastModified of the chunks in S3."""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        return {
+            obj['Key'][len(self.chunk_prefix):].split('.', 1)[0]: obj['LastModified']
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.chunk_prefix)
+            for obj in page.get('Contents', [])
+        }
+
+    def _delete(self, keys: List[str]):
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[start:start + DELETE_BATCH_SIZE]
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+            )
+            for error in response.get('Errors', []):
+                logger.warning(f"Could not delete {error.get('Key')}: {error.get('Message')}")
+
+    def _chunk_key(self, digest: str) -> str:
+        return f"{self.chunk_prefix}{digest}.gz"
+
+    def _upload_chunk(self, snapshot_path: Path, chunk_size: int, digest: str, index: int) -> int:
+        with open(snapshot_path, 'rb') as f:
+            f.seek(index * chunk_size)
+            body = gzip.compress(f.read(chunk_size), compresslevel=6, mtime=0)
+        self._put(self._chunk_key(digest), body, 'application/gzip')
+        return len(body)
+
+    def _refresh_chunk(self, digest: str):
+        """Copy a chunk onto itself to reset its LastModified."""
+        key = self._chunk_key(digest)
+        self.s3_client.copy_object(Bucket=self.bucket, Key=key,
+                                   CopySource={'Bucket': self.bucket, 'Key': key},
+                                   MetadataDirective='REPLACE', ContentType='application/gzip',
+                                   StorageClass='STANDARD')
+
+    def _get_chunk(self, digest: str) -> bytes:
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self._chunk_key(digest))
+        except ClientError as e:
+            raise RuntimeError(f"Database chunk {digest} unavailable: {e}") from e
+        chunk = gzip.decompress(response['Body'].read())
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise ValueError(f"Database chunk {digest} is corrupt")
+        return chunk
+
+    def _get_manifest(self, key: str) -> Dict:
+        response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+        return json.loads(response['Body'].read())
+
+    def _put(self, key: str, body: bytes, content_type: str):
+        # Deliberately untagged, see the module docstring
+        self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=body,
+                                  ContentType=content_type, StorageClass='STANDARD')
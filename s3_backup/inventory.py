@@ -0,0 +1,236 @@
+"""Local inventory of S3 objects for backup planning.
+
+Backup checks used to send one head_object per file. S3Inventory lists a
+whole prefix with paginated list_objects_v2 instead and keeps the result in
+the s3_inventory_objects table, so deciding what needs uploading is a local
+lookup. A prefix is listed again only once its listing is older than
+max_age_minutes; a re-listing writes only the rows that changed, and
+uploads made through the backup code are recorded as they complete.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, delete, insert, update
+
+from s3_backup.models import S3InventoryObject, S3InventoryPrefix
+
+logger = logging.getLogger(__name__)
+
+# Listings younger than this are trusted without asking S3 again
+DEFAULT_MAX_AGE_MINUTES = 60
+
+# Rows per executemany / IN clause when writing listing changes
+WRITE_CHUNK_SIZE = 500
+
+
+@dataclass(frozen=True)
+class InventoryEntry:
+    """One S3 object as listed."""
+    key: str
+    size: int
+    etag: str
+    last_modified: Optional[datetime]  # timezone-aware UTC
+    storage_class: str = 'STANDARD'
+
+
+def _to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Aware UTC datetime from S3 (aware) or the database (naive UTC)."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _parent_prefix(key: str) -> str:
+    """The 'directory' a key is in, e.g. backups/raw/2024/ for backups/raw/2024/S1.tar."""
+    return key.rsplit('/', 1)[0] + '/' if '/' in key else ''
+
+
+class S3Inventory:
+    """Cached listing of one bucket, loaded and refreshed per prefix."""
+
+    def __init__(self, s3_client, bucket: str, db_service,
+                 max_age_minutes: float = DEFAULT_MAX_AGE_MINUTES):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.db_service = db_service
+        self.max_age = timedelta(minutes=max_age_minutes)
+
+        self._entries: Dict[str, InventoryEntry] = {}
+        # Prefix -> when its listing was taken from S3 (naive UTC)
+        self._loaded: Dict[str, datetime] = {}
+        self._lock = threading.RLock()
+
+    def get(self, key: str, prefix: Optional[str] = None) -> Optional[InventoryEntry]:
+        """
+        Look up one key.
+
+        If no loaded prefix covers the key, or its listing has gone stale,
+        prefix (default: the key's parent directory) is loaded first. Pass a broader prefix when many
+        keys under it will be checked.
+        """
+        with self._lock:
+            if not self._covers(key):
+                self.load(prefix if prefix is not None else _parent_prefix(key))
+            return self._entries.get(key)
+
+    def objects(self, prefix: str, refresh: bool = False) -> Dict[str, InventoryEntry]:
+        """All objects under prefix, keyed by S3 key."""
+        with self._lock:
+            self.load(prefix, refresh=refresh)
+            return {key: entry for key, entry in self._entries.items() if key.startswith(prefix)}
+
+    def load(self, prefix: str, refresh: bool = False):
+        """
+        Make prefix available locally, listing it from S3 if its cached
+        listing is missing, stale, or refresh is set.
+        """
+        with self._lock:
+            if not refresh and self._covers_prefix(prefix):
+                return
+
+            session = self.db_service.db_manager.get_session()
+            try:
+                cached = {
+                    row.s3_key: InventoryEntry(row.s3_key, row.size, row.etag,
+                                               _to_utc(row.last_modified), row.storage_class)
+                    for row in session.query(S3InventoryObject).filter(
+                        S3InventoryObject.s3_bucket == self.bucket,
+                        S3InventoryObject.s3_key.startswith(prefix, autoescape=True)
+                    )
+                }
+                state = session.get(S3InventoryPrefix, (self.bucket, prefix))
+                stale = (refresh or state is None
+                         or state.refreshed_at < datetime.utcnow() - self.max_age)
+
+                if stale:
+                    listed = self._list(prefix)
+                    self._write_changes(session, cached, listed)
+                    if state is None:
+                        state = S3InventoryPrefix(s3_bucket=self.bucket, prefix=prefix)
+                        session.add(state)
+                    state.refreshed_at = datetime.utcnow()
+                    state.object_count = len(listed)
+                    session.commit()
+                    entries = listed
+                else:
+                    entries = cached
+                refreshed_at = state.refreshed_at
+            finally:
+                session.close()
+
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+            self._entries.update(entries)
+            self._loaded[prefix] = refreshed_at
+
+    def record(self, key: str, size: int, etag: str,
+               last_modified: Optional[datetime] = None, storage_class: str = 'STANDARD'):
+        """Add or update one object after uploading it, so the cache stays current."""
+        entry = InventoryEntry(key, size, etag.strip('"'),
+                               _to_utc(last_modified) or datetime.now(timezone.utc),
+                               storage_class or 'STANDARD')
+        with self._lock:
+            session = self.db_service.db_manager.get_session()
+            try:
+                row = session.query(S3InventoryObject).filter(
+                    S3InventoryObject.s3_bucket == self.bucket,
+                    S3InventoryObject.s3_key == key
+                ).first()
+                if row is None:
+                    row = S3InventoryObject(s3_bucket=self.bucket, s3_key=key)
+                    session.add(row)
+                row.size = entry.size
+                row.etag = entry.etag
+                row.last_modified = entry.last_modified.replace(tzinfo=None)
+                row.storage_class = entry.storage_class
+                row.listed_at = datetime.utcnow()
+                session.commit()
+            finally:
+                session.close()
+            self._entries[key] = entry
+
+    def _fresh_prefixes(self) -> List[str]:
+        """Loaded prefixes whose listing is younger than max_age."""
+        cutoff = datetime.utcnow() - self.max_age
+        return [prefix for prefix, refreshed_at in self._loaded.items() if refreshed_at >= cutoff]
+
+    def _covers(self, key: str) -> bool:
+        return any(key.startswith(prefix) for prefix in self._fresh_prefixes())
+
+    def _covers_prefix(self, prefix: str) -> bool:
+        return any(prefix.startswith(loaded) for loaded in self._fresh_prefixes())
+
+    def _list(self, prefix: str) -> Dict[str, InventoryEntry]:
+        """List every object under prefix from S3."""
+        listed = {}
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                listed[obj['Key']] = InventoryEntry(
+                    obj['Key'],
+                    obj['Size'],
+                    obj['ETag'].strip('"'),
+                    _to_utc(obj.get('LastModified')),
+                    obj.get('StorageClass', 'STANDARD')
+                )
+        logger.info(f"Listed {len(listed)} S3 objects under s3://{self.bucket}/{prefix}")
+        return listed
+
+    def _write_changes(self, session, cached: Dict[str, InventoryEntry],
+                       listed: Dict[str, InventoryEntry]):
+        """Apply the difference between the cached and fresh listing to the table."""
+        table = S3InventoryObject.__table__
+        now = datetime.utcnow()
+
+        def row(entry: InventoryEntry) -> Dict:
+            return {
+                'b_key': entry.key,
+                'b_size': entry.size,
+                'b_etag': entry.etag,
+                'b_last_modified': entry.last_modified.replace(tzinfo=None) if entry.last_modified else None,
+                'b_storage_class': entry.storage_class,
+            }
+
+        added = [row(e) for key, e in listed.items() if key not in cached]
+        changed = [row(e) for key, e in listed.items() if key in cached and cached[key] != e]
+        removed = [key for key in cached if key not in listed]
+
+        values = {
+            'size': bindparam('b_size'),
+            'etag': bindparam('b_etag'),
+            'last_modified': bindparam('b_last_modified'),
+            'storage_class': bindparam('b_storage_class'),
+            'listed_at': now,
+        }
+        for chunk in _chunks(added):
+            session.execute(
+                insert(table).values(s3_bucket=self.bucket, s3_key=bindparam('b_key'), **values),
+                chunk
+            )
+        for chunk in _chunks(changed):
+            session.execute(
+                update(table).where(
+                    table.c.s3_bucket == self.bucket,
+                    table.c.s3_key == bindparam('b_key')
+                ).values(**values),
+                chunk
+            )
+        for chunk in _chunks(removed):
+            session.execute(
+                delete(table).where(table.c.s3_bucket == self.bucket, table.c.s3_key.in_(chunk))
+            )
+
+        if added or changed or removed:
+            logger.info(f"Inventory changes: {len(added)} new, {len(changed)} changed, "
+                        f"{len(removed)} removed")
+
+
+def _chunks(items: List, size: int = WRITE_CHUNK_SIZE) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
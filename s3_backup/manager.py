@@ -4,6 +4,7 @@ UPDATED: Added markdown backup functionality while maintaining full backwards co
 """
 
 import os
+import gzip
 import json
 import tarfile
 import tempfile
@@ -21,6 +22,16 @@ from botocore.exceptions import ClientError
 from tqdm import tqdm
 
 from models import DatabaseService, FitsFile, ImagingSession as SessionModel
+from s3_backup.inventory import S3Inventory, DEFAULT_MAX_AGE_MINUTES
+from s3_backup.database_backup import (
+    IncrementalDatabaseBackup, DEFAULT_CHUNK_SIZE_MB, DEFAULT_KEEP_DAYS, DEFAULT_KEEP_VERSIONS
+)
+from s3_backup.streaming import (
+    MultipartStreamWriter,
+    PigzCompressor,
+    choose_part_size,
+    pigz_available
+)
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +47,20 @@ def format_size(bytes_size: int) -> str:
     return f"{bytes_size:.2f} PB"
 
 
+def catalog_file_size(folder: str, file_name: str, file_size: Optional[int]) -> int:
+    """Size of a cataloged file, from the database or from disk when not recorded.
+
+    Rows cataloged before file sizes were stored have file_size NULL.
+    Returns 0 if the file is missing too.
+    """
+    if file_size is not None:
+        return file_size
+    try:
+        return (Path(folder) / file_name).stat().st_size
+    except OSError:
+        return 0
+
+
 @dataclass
 class ArchiveResult:
     """Result of archive creation and upload."""
@@ -50,6 +75,7 @@ class ArchiveResult:
     s3_etag: Optional[str] = None
     upload_time: float = 0.0
     error: Optional[str] = None
+    md5: Optional[str] = None
 
 
 @dataclass
@@ -162,7 +188,8 @@ class S3BackupConfig:
                 "multipart_chunksize_mb": 25,
                 "max_concurrency": 4,
                 "use_threads": True,
-                "max_bandwidth_mbps": None
+                "max_bandwidth_mbps": None,
+                "processed_file_workers": 8
             },
             "restore_settings": {
                 "default_tier": "Standard",
@@ -172,11 +199,22 @@ class S3BackupConfig:
             "archive_settings": {
                 "compression_level": 0,
                 "use_pigz": False,
+                "streaming_upload": False,
                 "verify_after_upload": True,
                 "keep_archive_index": True,
                 "max_archive_size_gb": 50,
+                "max_temp_space_gb": None,
                 "temp_dir": ".tmp/backup_archives"
             },
+            "inventory_settings": {
+                "max_age_minutes": 60
+            },
+            "database_backup": {
+                "incremental": True,
+                "chunk_size_mb": 1,
+                "keep_versions": 30,
+                "keep_days": 30
+            },
             "retry_settings": {
                 "max_retries": 3,
                 "initial_backoff_seconds": 2,
@@ -260,6 +298,11 @@ class S3BackupConfig:
     def region(self) -> str:
         return self.config.get('aws_region', 'us-east-1')
     
+    @property
+    def endpoint_url(self) -> Optional[str]:
+        """Custom S3 endpoint (e.g. MinIO or a local moto server); None for AWS."""
+        return self.config.get('endpoint_url')
+    
     @property
     def bucket(self) -> str:
         return self.config['buckets']['primary']
@@ -293,6 +336,8 @@ class S3BackupManager:
         self.s3_config = s3_config
         self.dry_run = dry_run
         self.s3_client = None  # Will be None if S3 is disabled
+        self.inventory = None
+        self.database_backup = None
 
         # Set base directory for resolving relative paths
         if base_dir:
@@ -311,11 +356,26 @@ class S3BackupManager:
             region_name=s3_config.region,
             retries={'max_attempts': 3, 'mode': 'adaptive'}
         )
-        self.s3_client = boto3.client('s3', config=boto_config)
+        self.s3_client = boto3.client('s3', config=boto_config,
+                                      endpoint_url=s3_config.endpoint_url)
+        self.inventory = S3Inventory(
+            self.s3_client, s3_config.bucket, db_service,
+            max_age_minutes=s3_config.config.get('inventory_settings', {}).get(
+                'max_age_minutes', DEFAULT_MAX_AGE_MINUTES)
+        )
 
         self._verify_bucket_access()
         self._setup_temp_dir()
 
+        db_settings = s3_config.config.get('database_backup', {})
+        self.database_backup = IncrementalDatabaseBackup(
+            self.s3_client, s3_config.bucket,
+            s3_config.config.get('s3_paths', {}).get('database_backups', 'backups/database'),
+            temp_dir=self.temp_dir,
+            chunk_size_mb=db_settings.get('chunk_size_mb', DEFAULT_CHUNK_SIZE_MB),
+            max_concurrency=s3_config.config.get('upload_settings', {}).get('max_concurrency', 4)
+        )
+
         if auto_cleanup:
             self._cleanup_orphaned_archives()
 
@@ -386,7 +446,9 @@ class S3BackupManager:
         if not self.temp_dir.exists():
             return
         
-        orphaned = list(self.temp_dir.glob("*.tar*"))
+        # Archives of interrupted uploads are kept so the upload can resume
+        in_progress = self.in_progress_archive_paths()
+        orphaned = [p for p in self.temp_dir.glob("*.tar*") if p not in in_progress]
         if orphaned:
             logger.info(f"Cleaning up {len(orphaned)} orphaned archive(s) from previous runs...")
             for archive in orphaned:
@@ -398,6 +460,42 @@ class S3BackupManager:
                 except Exception as e:
                     logger.warning(f"Could not remove {archive}: {e}")
 
+    def in_progress_archive_paths(self) -> set:
+        """Local archives belonging to uploads that have not completed yet."""
+        from s3_backup.models import S3BackupArchive, UPLOAD_IN_PROGRESS
+
+        session_db = self.db_service.db_manager.get_session()
+        try:
+            rows = session_db.query(S3BackupArchive.local_archive_path).filter(
+                S3BackupArchive.upload_status == UPLOAD_IN_PROGRESS,
+                S3BackupArchive.local_archive_path.isnot(None)
+            ).all()
+            return {Path(row.local_archive_path) for row in rows}
+        except Exception as e:
+            # Backup tables may not exist yet
+            logger.debug(f"Could not read in-progress uploads: {e}")
+            return set()
+        finally:
+            session_db.close()
+
+    def discard_incomplete_upload(self, session_db, backup_archive):
+        """Abort a tracked multipart upload and drop its local archive and record."""
+        if backup_archive.upload_id:
+            try:
+                self.s3_client.abort_multipart_upload(
+                    Bucket=backup_archive.s3_bucket,
+                    Key=backup_archive.s3_key,
+                    UploadId=backup_archive.upload_id
+                )
+            except ClientError as e:
+                logger.warning(f"Failed to abort upload {backup_archive.upload_id}: {e}")
+
+        if backup_archive.local_archive_path:
+            self.safe_unlink(Path(backup_archive.local_archive_path))
+
+        session_db.delete(backup_archive)
+        session_db.commit()
+        logger.info(f"Discarded incomplete upload for {backup_archive.session_id}")
 
     
     def _verify_bucket_access(self):
@@ -415,15 +513,8 @@ class S3BackupManager:
                 raise RuntimeError(f"Error accessing bucket: {e}")
     
     def check_archive_exists(self, session_id: str, year: int) -> bool:
-        """Check if archive already exists in S3."""
-        s3_key = self._get_archive_key(session_id, year)
-        try:
-            self.s3_client.head_object(Bucket=self.s3_config.bucket, Key=s3_key)
-            return True
-        except ClientError as e:
-            if e.response['Error']['Code'] == '404':
-                return False
-            raise
+        """Check if archive already exists in S3 (from the inventory cache)."""
+        return self.inventory.get(self._get_archive_key(session_id, year)) is not None
     
     def _get_archive_key(self, session_id: str, year: int) -> str:
         """Generate S3 key for session archive."""
@@ -459,28 +550,21 @@ class S3BackupManager:
             return False, "Local file does not exist"
         
         try:
-            # Try to get S3 object metadata
-            response = self.s3_client.head_object(
-                Bucket=self.s3_config.bucket,
-                Key=s3_key
-            )
+            entry = self.inventory.get(s3_key)
+            if entry is None:
+                return True, "File not yet backed up to S3"
             
             # File exists in S3, check modification time
-            s3_last_modified = response['LastModified']
             local_mtime = datetime.fromtimestamp(local_path.stat().st_mtime, tz=timezone.utc)
             
-            if local_mtime > s3_last_modified:
+            if local_mtime > entry.last_modified:
                 return True, "Local file is newer than S3 version"
             else:
                 return False, "S3 version is current"
                 
         except ClientError as e:
-            if e.response['Error']['Code'] == '404':
-                # File doesn't exist in S3
-                return True, "File not yet backed up to S3"
-            else:
-                logger.error(f"Error checking S3 object: {e}")
-                return False, f"Error checking S3: {e}"
+            logger.error(f"Error listing S3 objects: {e}")
+            return False, f"Error checking S3: {e}"
         except Exception as e:
             logger.error(f"Unexpected error checking backup status: {e}")
             return False, f"Error: {e}"
@@ -564,6 +648,8 @@ class S3BackupManager:
                 Key=s3_key
             )
             etag = response['ETag'].strip('"')
+            self.inventory.record(s3_key, response['ContentLength'], etag,
+                                  response.get('LastModified'), response.get('StorageClass'))
             
             logger.info(f"Uploaded markdown to S3: {s3_key}")
             
@@ -817,6 +903,8 @@ class S3BackupManager:
                 Key=s3_key
             )
             etag = response['ETag'].strip('"')
+            self.inventory.record(s3_key, response['ContentLength'], etag,
+                                  response.get('LastModified'), response.get('StorageClass'))
             
             upload_time = (datetime.now() - start_time).total_seconds()
             upload_rate = file_size / upload_time / (1024 * 1024) if upload_time > 0 else 0
@@ -835,21 +923,158 @@ class S3BackupManager:
             logger.error(f"Upload error: {e}")
             return False, None, None
 
+    def stream_session_archive(
+        self,
+        session_id: str,
+        year: int,
+        archive_policy: str = 'fast',
+        backup_policy: str = 'deep',
+        progress_callback=None
+    ) -> ArchiveResult:
+        """Tar a session straight into an S3 multipart upload, without a temp archive.
+        
+        Compression follows archive_settings (compression_level, use_pigz) so
+        the content matches the key's extension. Parts upload concurrently
+        (upload_settings.max_concurrency) while the tar is written, and the
+        archive size and MD5 are computed on the way through.
+        
+        Args:
+            session_id: Imaging session ID
+            year: Year for S3 organization
+            archive_policy: Archive lifecycle policy ('fast', 'standard', 'delayed')
+            backup_policy: Backup lifecycle policy ('deep', 'flexible')
+            progress_callback: Optional callback(current, total, file_name)
+        
+        Returns:
+            ArchiveResult with the uploaded object's key, ETag, size and MD5
+        """
+        archive_settings = self.s3_config.config.get('archive_settings', {})
+        upload_settings = self.s3_config.config.get('upload_settings', {})
+        compression_level = archive_settings.get('compression_level', 0)
+        use_pigz = archive_settings.get('use_pigz', False) and compression_level > 0 and pigz_available()
+        
+        session_db = self.db_service.db_manager.get_session()
+        try:
+            files = session_db.query(FitsFile.folder, FitsFile.file, FitsFile.file_size).filter(
+                FitsFile.imaging_session_id == session_id
+            ).all()
+        finally:
+            session_db.close()
+        
+        if not files:
+            return ArchiveResult(success=False, session_id=session_id,
+                                 error="No files found for session")
+        
+        s3_key = self._get_archive_key(session_id, year)
+        expected_size = sum(catalog_file_size(*f) for f in files)
+        part_size = choose_part_size(
+            int(upload_settings.get('multipart_chunksize_mb', 25) * 1024 * 1024),
+            expected_size
+        )
+        
+        logger.info(f"Streaming archive to s3://{self.s3_config.bucket}/{s3_key}")
+        logger.info(f"  Files: {len(files)}, part size: {self._format_bytes(part_size)}")
+        if compression_level > 0:
+            logger.info(f"  Compression: {'pigz (parallel)' if use_pigz else f'gzip (level {compression_level})'}")
+        
+        tags = f"archive_policy={archive_policy}&backup_policy={backup_policy}"
+        extra_args = {
+            'StorageClass': 'STANDARD',
+            'Tagging': tags,
+            'Metadata': {
+                'session_id': session_id,
+                'year': str(year),
+                'original_size': str(expected_size),
+                'created_by': 'astrocat-backup'
+            }
+        }
+        
+        start_time = datetime.now()
+        original_size = 0
+        added_count = 0
+        
+        try:
+            with tqdm(total=expected_size, unit='B', unit_scale=True,
+                      desc="  Streaming", leave=False) as pbar, \
+                 MultipartStreamWriter(
+                     self.s3_client, self.s3_config.bucket, s3_key, part_size,
+                     max_concurrency=upload_settings.get('max_concurrency', 4),
+                     extra_args=extra_args
+                 ) as writer:
+                
+                if use_pigz:
+                    compressor = PigzCompressor(writer, compression_level)
+                elif compression_level > 0:
+                    compressor = gzip.GzipFile(fileobj=writer, mode='wb',
+                                               compresslevel=compression_level)
+                else:
+                    compressor = None
+                
+                try:
+                    with tarfile.open(fileobj=compressor or writer, mode='w|') as tar:
+                        for idx, (folder, file_name, _) in enumerate(files):
+                            file_path = Path(folder) / file_name
+                            
+                            if not file_path.exists():
+                                logger.warning(f"File not found (skipping): {file_path}")
+                                continue
+                            
+                            tar.add(file_path, arcname=f"{session_id}/{file_name}")
+                            file_size = file_path.stat().st_size
+                            original_size += file_size
+                            added_count += 1
+                            pbar.update(file_size)
+                            
+                            if progress_callback:
+                                progress_callback(idx + 1, len(files), file_name)
+                    
+                    if compressor:
+                        compressor.close()
+                except BaseException:
+                    if isinstance(compressor, PigzCompressor):
+                        compressor.kill()
+                    raise
+                
+                uploaded = writer.finish()
+                
+        except Exception as e:
+            logger.error(f"Streaming upload failed for {session_id}: {e}")
+            return ArchiveResult(success=False, session_id=session_id, s3_key=s3_key,
+                                 error=f"Streaming upload failed: {e}")
+        
+        upload_time = (datetime.now() - start_time).total_seconds()
+        compressed_size = uploaded['size']
+        
+        logger.info(f"✓ Streamed {added_count} files in {uploaded['parts']} parts")
+        logger.info(f"  Original size: {self._format_bytes(original_size)}")
+        logger.info(f"  Archive size: {self._format_bytes(compressed_size)}")
+        logger.info(f"  MD5: {uploaded['md5']}")
+        logger.info(f"  Time: {upload_time:.1f}s")
+        
+        return ArchiveResult(
+            success=True,
+            session_id=session_id,
+            file_count=added_count,
+            original_size=original_size,
+            compressed_size=compressed_size,
+            compression_ratio=compressed_size / original_size if original_size > 0 else 0,
+            s3_key=s3_key,
+            s3_etag=uploaded['etag'],
+            upload_time=upload_time,
+            md5=uploaded['md5']
+        )
+
     def calculate_session_size(self, session_id: str) -> int:
-        """Calculate total size of all LIGHT files in a session."""
+        """Calculate total size of all LIGHT files in a session from stored file sizes."""
+        from sqlalchemy import func
         session_db = self.db_service.db_manager.get_session()
         try:
-            files = session_db.query(FitsFile).filter(
+            total = session_db.query(func.sum(FitsFile.file_size)).filter(
                 FitsFile.imaging_session_id == session_id,
-                FitsFile.frame_type == 'LIGHT'
-            ).all()
-            
-            total = 0
-            for f in files:
-                p = Path(f.folder) / f.file
-                if p.exists():
-                    total += p.stat().st_size
-            return total
+                FitsFile.frame_type == 'LIGHT',
+                FitsFile.file_not_found.isnot(True)
+            ).scalar()
+            return total or 0
         finally:
             session_db.close()
 
@@ -907,15 +1132,47 @@ class S3BackupManager:
             session_db.close()
 
 
-    def verify_archive(self, session_id: str, year: int) -> VerifyResult:
-        """Verify archive exists in S3 and matches expected size."""
+    def verify_archive(self, session_id: str, year: int, use_inventory: bool = True) -> VerifyResult:
+        """Verify archive exists in S3 and matches expected size.
+        
+        By default the archive is looked up in the inventory cache, so
+        verifying many sessions costs one listing per year. Pass
+        use_inventory=False right after an upload to ask S3 directly.
+        """
         s3_key = self._get_archive_key(session_id, year)
         
+        if use_inventory:
+            try:
+                entry = self.inventory.get(s3_key)
+            except ClientError as e:
+                return VerifyResult(
+                    verified=False,
+                    session_id=session_id,
+                    method='inventory',
+                    error=str(e)
+                )
+            if entry is None:
+                return VerifyResult(
+                    verified=False,
+                    session_id=session_id,
+                    method='inventory',
+                    error='Archive not found in S3'
+                )
+            return VerifyResult(
+                verified=True,
+                session_id=session_id,
+                method='inventory',
+                s3_size=entry.size,
+                etag_match=True
+            )
+        
         try:
             response = self.s3_client.head_object(
                 Bucket=self.s3_config.bucket,
                 Key=s3_key
             )
+            self.inventory.record(s3_key, response['ContentLength'], response['ETag'],
+                                  response.get('LastModified'), response.get('StorageClass'))
             
             return VerifyResult(
                 verified=True,
@@ -940,11 +1197,75 @@ class S3BackupManager:
                 error=str(e)
             )
     
+    def check_existing_backup(self, session_db, session_id: str, year: int) -> Optional[ArchiveResult]:
+        """Return a skipped result if the session is already backed up, else None.
+        
+        Checks the database first; an archive found only in S3 gets its
+        database record created from the S3 metadata.
+        """
+        from s3_backup.models import S3BackupArchive
+
+        # Check database FIRST
+        existing_backup = session_db.query(S3BackupArchive).filter(
+            S3BackupArchive.session_id == session_id,
+            S3BackupArchive.is_complete()
+        ).first()
+        
+        if existing_backup:
+            logger.info(f"Archive already in database for {session_id}, skipping")
+            return ArchiveResult(
+                success=True,
+                session_id=session_id,
+                error="Already backed up (in database, skipped)"
+            )
+        
+        # Not in database - check if it exists in S3
+        s3_key = self._get_archive_key(session_id, year)
+        entry = self.inventory.get(s3_key)
+        if entry:
+            logger.info(f"Archive exists in S3 but not in database for {session_id}, syncing...")
+            
+            # Create database record from S3 metadata
+            backup_archive = S3BackupArchive(
+                session_id=session_id,
+                session_year=year,
+                s3_bucket=self.s3_config.bucket,
+                s3_key=s3_key,
+                s3_region=self.s3_config.region,
+                s3_etag=entry.etag,
+                compressed_size_bytes=entry.size,
+                original_size_bytes=entry.size,  # We don't know original, use compressed
+                file_count=0,  # Unknown
+                uploaded_at=entry.last_modified,
+                current_storage_class=entry.storage_class,
+                archive_policy='unknown',
+                backup_policy='unknown',
+                verified=True,
+                verification_method='inventory',
+                last_verified_at=datetime.now()
+            )
+            
+            session_db.add(backup_archive)
+            session_db.commit()
+            
+            logger.info(f"✓ Synced database record from S3 for {session_id}")
+            
+            return ArchiveResult(
+                success=True,
+                session_id=session_id,
+                s3_key=s3_key,
+                compressed_size=entry.size,
+                error="Already backed up (synced from S3)"
+            )
+        
+        return None
+
     def backup_session(
         self,
         session_id: str,
         skip_existing: bool = True,
-        cleanup_archive: bool = True
+        cleanup_archive: bool = True,
+        streaming: Optional[bool] = None
     ) -> ArchiveResult:
         """Complete backup workflow for a session: create archive, upload, verify.
         
@@ -952,10 +1273,14 @@ class S3BackupManager:
             session_id: Imaging session ID
             skip_existing: Skip if already backed up (checks DB first, then syncs from S3)
             cleanup_archive: Delete local archive after successful upload
+            streaming: Stream the archive straight to S3 instead of building it
+                in the temp dir (default: archive_settings.streaming_upload)
         
         Returns:
             ArchiveResult with operation details
         """
+        from s3_backup.models import S3BackupArchive, UPLOAD_IN_PROGRESS
+
         session_db = self.db_service.db_manager.get_session()
         
         try:
@@ -981,70 +1306,25 @@ class S3BackupManager:
                     error="Invalid session date format"
                 )
             
-            # NEW: Check database FIRST
+            # An interrupted scheduled upload is restarted from scratch here
+            pending = session_db.query(S3BackupArchive).filter(
+                S3BackupArchive.session_id == session_id,
+                S3BackupArchive.upload_status == UPLOAD_IN_PROGRESS
+            ).first()
+            if pending:
+                self.discard_incomplete_upload(session_db, pending)
+            
             if skip_existing:
-                existing_backup = session_db.query(S3BackupArchive).filter(
-                    S3BackupArchive.session_id == session_id
-                ).first()
-                
-                if existing_backup:
-                    logger.info(f"Archive already in database for {session_id}, skipping")
-                    return ArchiveResult(
-                        success=True,
-                        session_id=session_id,
-                        error="Already backed up (in database, skipped)"
-                    )
-                
-                # NEW: Not in database - check if it exists in S3
-                if self.check_archive_exists(session_id, year):
-                    logger.info(f"Archive exists in S3 but not in database for {session_id}, syncing...")
-                    
-                    # Get S3 metadata
-                    s3_key = self._get_archive_key(session_id, year)
-                    try:
-                        response = self.s3_client.head_object(
-                            Bucket=self.s3_config.bucket,
-                            Key=s3_key
-                        )
-                        
-                        # Create database record from S3 metadata
-                        from s3_backup.models import S3BackupArchive
-                        
-                        backup_archive = S3BackupArchive(
-                            session_id=session_id,
-                            session_year=year,
-                            s3_bucket=self.s3_config.bucket,
-                            s3_key=s3_key,
-                            s3_region=self.s3_config.region,
-                            s3_etag=response['ETag'].strip('"'),
-                            compressed_size_bytes=response['ContentLength'],
-                            original_size_bytes=response['ContentLength'],  # We don't know original, use compressed
-                            file_count=0,  # Unknown
-                            uploaded_at=response['LastModified'],
-                            current_storage_class=response.get('StorageClass', 'STANDARD'),
-                            archive_policy='unknown',
-                            backup_policy='unknown',
-                            verified=True,
-                            verification_method='head_object',
-                            last_verified_at=datetime.now()
-                        )
-                        
-                        session_db.add(backup_archive)
-                        session_db.commit()
-                        
-                        logger.info(f"✓ Synced database record from S3 for {session_id}")
-                        
-                        return ArchiveResult(
-                            success=True,
-                            session_id=session_id,
-                            s3_key=s3_key,
-                            compressed_size=response['ContentLength'],
-                            error="Already backed up (synced from S3)"
-                        )
-                        
-                    except ClientError as e:
-                        logger.warning(f"Failed to sync from S3 for {session_id}: {e}")
-                        # Fall through to normal upload
+                skipped = self.check_existing_backup(session_db, session_id, year)
+                if skipped:
+                    return skipped
+            
+            if streaming is None:
+                streaming = self.s3_config.config.get('archive_settings', {}).get('streaming_upload', False)
+            
+            # Streaming needs no temp space, so skips the space check below
+            if streaming:
+                return self._backup_session_streaming(session_db, session, year)
             
             # PRE-FLIGHT SPACE CHECK
             # Get session files
@@ -1128,7 +1408,7 @@ class S3BackupManager:
                 )
             
             # Verify
-            verify_result = self.verify_archive(session_id, year)
+            verify_result = self.verify_archive(session_id, year, use_inventory=False)
 
             if not verify_result.verified:
                 return ArchiveResult(
@@ -1140,8 +1420,6 @@ class S3BackupManager:
                 )
 
             # Create database record for successful backup
-            from s3_backup.models import S3BackupArchive
-
             backup_archive = S3BackupArchive(
                 session_id=session_id,
                 session_date=session.date,
@@ -1189,19 +1467,90 @@ class S3BackupManager:
         finally:
             session_db.close()
 
+    def _backup_session_streaming(self, session_db, session, year: int) -> ArchiveResult:
+        """Streaming branch of backup_session: stream, verify size, record the archive."""
+        from s3_backup.models import S3BackupArchive
+
+        rules = self.s3_config.config.get('backup_rules', {}).get('raw_lights', {})
+        archive_policy = rules.get('archive_policy', 'fast')
+        backup_policy = rules.get('backup_policy', 'deep')
+
+        result = self.stream_session_archive(
+            session.id, year,
+            archive_policy=archive_policy,
+            backup_policy=backup_policy
+        )
+        if not result.success:
+            return result
+
+        verify_result = self.verify_archive(session.id, year, use_inventory=False)
+        if not verify_result.verified or verify_result.s3_size != result.compressed_size:
+            result.success = False
+            result.error = (f"Verification failed: {verify_result.error}" if not verify_result.verified
+                            else f"Verification failed: S3 size {verify_result.s3_size} != "
+                                 f"streamed size {result.compressed_size}")
+            return result
+
+        backup_archive = S3BackupArchive(
+            session_id=session.id,
+            session_date=session.date,
+            session_year=year,
+            s3_bucket=self.s3_config.bucket,
+            s3_key=result.s3_key,
+            s3_region=self.s3_config.region,
+            s3_etag=result.s3_etag,
+            archive_md5=result.md5,
+            file_count=result.file_count,
+            original_size_bytes=result.original_size,
+            compressed_size_bytes=result.compressed_size,
+            compression_ratio=result.compression_ratio,
+            uploaded_at=datetime.now(),
+            verified=True,
+            verification_method='head_object',
+            archive_policy=archive_policy,
+            backup_policy=backup_policy,
+            camera_name=session.camera,
+            telescope_name=session.telescope,
+            current_storage_class='STANDARD'
+        )
+
+        session_db.add(backup_archive)
+        session_db.commit()
+        logger.info(f"✓ Created database record for backup: {session.id}")
+
+        return result
+
         
 # ========================================================================
     # DATABASE BACKUP METHODS WITH VERSIONING
     # Add these 3 methods to the end of your S3BackupManager class
     # ========================================================================
     
-    def backup_database(self, db_path: Path, description: str = None) -> Dict:
+    def _database_tags(self) -> str:
+        """Object tags for database backups, from backup_rules.database_files."""
+        # Get archive policies from config - default to 'fast' / 'deep' for database files
+        archive_policy = self.s3_config.config.get('backup_rules', {}).get('database_files', {}).get('archive_policy', 'standard')
+        backup_policy = self.s3_config.config.get('backup_rules', {}).get('database_files', {}).get('backup_policy', 'flexible')
+        
+        # Use correct key names for AWS lifecycle rules
+        return f"archive_policy={archive_policy}&backup_policy={backup_policy}"
+    
+    def backup_database(self, db_path: Path, description: str = None,
+                        incremental: Optional[bool] = None) -> Dict:
         """
         Backup database file to S3 with versioning.
         
+        Incremental backups (database_backup.incremental, on by default)
+        upload only the chunks of a consistent snapshot that changed since
+        any earlier version; full backups upload the whole file as a new
+        S3 object version. After an incremental backup, versions beyond
+        database_backup.keep_versions / keep_days and the chunks only they
+        used are deleted.
+        
         Args:
             db_path: Path to the database file
             description: Optional description for this backup version
+            incremental: Override database_backup.incremental
             
         Returns:
             Dict with backup results including version info
@@ -1209,18 +1558,27 @@ class S3BackupManager:
         if not db_path.exists():
             return {'success': False, 'error': f'Database file not found: {db_path}'}
         
+        if incremental is None:
+            incremental = self.s3_config.config.get('database_backup', {}).get('incremental', True)
+        
         try:
+            if incremental:
+                result = self.database_backup.backup(db_path, description)
+                db_settings = self.s3_config.config.get('database_backup', {})
+                try:
+                    result['pruned'] = self.database_backup.prune(
+                        keep_versions=db_settings.get('keep_versions', DEFAULT_KEEP_VERSIONS),
+                        keep_days=db_settings.get('keep_days', DEFAULT_KEEP_DAYS)
+                    )
+                except Exception as e:
+                    # The new version is stored; pruning is retried after the next backup
+                    logger.warning(f"Pruning old database versions failed: {e}")
+                return result
+            
             # S3 key for database backups
             s3_key = f"backups/database/{db_path.name}"
             
-            # Prepare metadata
-
-            # Get archive policies from config - default to 'fast' / 'deep' for database files
-            archive_policy = self.s3_config.config.get('backup_rules', {}).get('database_files', {}).get('archive_policy', 'standard')
-            backup_policy = self.s3_config.config.get('backup_rules', {}).get('database_files', {}).get('backup_policy', 'flexible')
-            
-            # Prepare tags - use correct key names for AWS lifecycle rules
-            tags = f"archive_policy={archive_policy}&backup_policy={backup_policy}"
+            tags = self._database_tags()
                        
             metadata = {
                 'original_filename': db_path.name,
@@ -1296,6 +1654,9 @@ class S3BackupManager:
                     Prefix='backups/database/'
                 ):
                     for version_obj in page.get('Versions', []):
+                        if self._is_incremental_object(version_obj['Key']):
+                            continue
+                        
                         # Get metadata for each version
                         try:
                             head_response = self.s3_client.head_object(
@@ -1313,7 +1674,8 @@ class S3BackupManager:
                                 'size': version_obj['Size'],
                                 'description': metadata.get('description', ''),
                                 'original_filename': metadata.get('original_filename', ''),
-                                'is_latest': version_obj.get('IsLatest', False)
+                                'is_latest': version_obj.get('IsLatest', False),
+                                'mode': 'full'
                             })
                         except Exception as e:
                             logger.warning(f"Error reading version metadata: {e}")
@@ -1329,6 +1691,9 @@ class S3BackupManager:
                 )
                 
                 for obj in response.get('Contents', []):
+                    if self._is_incremental_object(obj['Key']):
+                        continue
+                    
                     head_response = self.s3_client.head_object(
                         Bucket=self.s3_config.bucket,
                         Key=obj['Key']
@@ -1343,9 +1708,12 @@ class S3BackupManager:
                         'size': obj['Size'],
                         'description': metadata.get('description', ''),
                         'original_filename': metadata.get('original_filename', ''),
-                        'is_latest': True
+                        'is_latest': True,
+                        'mode': 'full'
                     })
             
+            versions.extend(self.database_backup.list_versions())
+            
             # Sort by timestamp (newest first)
             versions.sort(key=lambda x: x['timestamp'], reverse=True)
             
@@ -1355,18 +1723,26 @@ class S3BackupManager:
             logger.error(f"Error listing database versions: {e}")
             return []
     
+    def _is_incremental_object(self, key: str) -> bool:
+        """Chunks and manifests of incremental backups, not whole database files."""
+        return key.startswith((self.database_backup.chunk_prefix, self.database_backup.manifest_prefix))
+    
     def restore_database(self, version_id: str, output_path: Path) -> Dict:
         """
         Restore a specific database version from S3.
         
         Args:
-            version_id: S3 version ID to restore
+            version_id: S3 version ID, or incremental version id (name@timestamp)
             output_path: Where to save the restored database
             
         Returns:
             Dict with restore results
         """
         try:
+            if self.database_backup.is_version_id(version_id):
+                logger.info(f"Restoring database version {version_id}...")
+                return self.database_backup.restore(version_id, output_path)
+            
             # Find the version
             versions = self.list_database_versions()
             target_version = next((v for v in versions if v['version_id'] == version_id), None)
@@ -1,9 +1,17 @@
 """Database models for S3 backup tracking."""
 
+import logging
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Index, Boolean
+from sqlalchemy import inspect, or_, text
 from sqlalchemy.ext.declarative import declarative_base
 
+logger = logging.getLogger(__name__)
+
+# S3BackupArchive.upload_status values
+UPLOAD_IN_PROGRESS = 'uploading'
+UPLOAD_COMPLETED = 'completed'
+
 # Import Base from main models if extending existing schema
 # For now, create backup-specific base that will be integrated
 Base = declarative_base()
@@ -53,6 +61,14 @@ class S3BackupArchive(Base):
     # Verification
     verified = Column(Boolean, default=False)
     verification_method = Column(String(20))  # 'etag', 'md5', 'manual'
+    archive_md5 = Column(String(32))  # MD5 of the whole archive, computed while streaming
+    
+    # Upload progress, so an interrupted upload resumes at the part level
+    upload_status = Column(String(20))  # UPLOAD_IN_PROGRESS, or UPLOAD_COMPLETED / null when done
+    upload_id = Column(String(255))  # S3 multipart upload ID while uploading
+    upload_part_size = Column(Integer)
+    uploaded_parts = Column(Text)  # JSON list of {"PartNumber", "ETag"} already uploaded
+    local_archive_path = Column(String(1000))  # Archive being uploaded, kept until complete
     
     # Restore tracking
     restore_requested_at = Column(DateTime)
@@ -75,6 +91,11 @@ class S3BackupArchive(Base):
     
     def __repr__(self):
         return f"<S3BackupArchive(session_id='{self.session_id}', size={self.compressed_size_bytes})>"
+    
+    @classmethod
+    def is_complete(cls):
+        """Filter for archives whose upload finished (older rows have no upload_status)."""
+        return or_(cls.upload_status.is_(None), cls.upload_status == UPLOAD_COMPLETED)
 
 
 class S3BackupSessionNote(Base):
@@ -245,6 +266,47 @@ class S3BackupProcessingSessionSummary(Base):
 
 
 
+class S3InventoryObject(Base):
+    """
+    Cached S3 object listing, filled from list_objects_v2.
+    
+    Lets backup planning and verification check many keys locally instead
+    of sending one head_object per key. Kept current by re-listing stale
+    prefixes and by recording our own uploads as they finish.
+    """
+    __tablename__ = 's3_inventory_objects'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    s3_bucket = Column(String(255), nullable=False)
+    s3_key = Column(String(1024), nullable=False)
+    size = Column(Integer)
+    etag = Column(String(100))
+    last_modified = Column(DateTime)  # UTC
+    storage_class = Column(String(50))
+    listed_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_inventory_bucket_key', 's3_bucket', 's3_key', unique=True),
+    )
+    
+    def __repr__(self):
+        return f"<S3InventoryObject(key='{self.s3_key}', size={self.size})>"
+
+
+class S3InventoryPrefix(Base):
+    """When each cached prefix was last listed from S3."""
+    __tablename__ = 's3_inventory_prefixes'
+    
+    s3_bucket = Column(String(255), primary_key=True)
+    prefix = Column(String(1024), primary_key=True)
+    refreshed_at = Column(DateTime, nullable=False)
+    object_count = Column(Integer, default=0)
+    
+    def __repr__(self):
+        return f"<S3InventoryPrefix(prefix='{self.prefix}', refreshed_at={self.refreshed_at})>"
+
+
+
 # ============================================================================
 # ORIGINAL MODELS BELOW - UNCHANGED
 # ============================================================================
@@ -343,4 +405,28 @@ class S3BackupStats(Base):
     __table_args__ = (
         Index('idx_backup_stats_date', 'stat_date'),
         Index('idx_backup_stats_period', 'period_type'),
-    )
\ No newline at end of file
+    )
+
+
+def create_backup_tables(engine):
+    """Create backup tables, adding columns missing from older databases.
+
+    create_all() only creates whole tables, so columns added to a backup
+    model later are added with ALTER TABLE ADD COLUMN.
+    """
+    Base.metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+
+    for table_name, table in Base.metadata.tables.items():
+        existing = {col["name"] for col in inspector.get_columns(table_name)}
+
+        with engine.connect() as conn:
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(
+                    text(f"ALTER TABLE {table_name} ADD COLUMN {column.name} {col_type}")
+                )
+                logger.info("Added missing column: %s.%s", table_name, column.name)
+            conn.commit()
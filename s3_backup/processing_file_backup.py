@@ -5,21 +5,32 @@ Backs up intermediate and final files individually rather than as tarballs.
 
 import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Iterator, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
 import boto3
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
+from sqlalchemy import bindparam, update
 from tqdm import tqdm
 
 # Import all models from main models.py
 from models import ProcessingSession, ProcessedFile, DatabaseManager
+from s3_backup.inventory import S3Inventory, DEFAULT_MAX_AGE_MINUTES
 from s3_backup.models import S3BackupProcessedFileRecord
 
 logger = logging.getLogger(__name__)
 
+# Files uploaded concurrently by backup_session_files (upload_settings.processed_file_workers)
+DEFAULT_FILE_WORKERS = 8
+
+# Finished uploads written to the database per transaction
+RECORD_BATCH_SIZE = 200
+
 
 @dataclass
 class FileBackupResult:
@@ -55,7 +66,7 @@ class UploadProgressCallback:
 class ProcessingSessionFileBackup:
     """Manages individual file backups for processing sessions to S3."""
     
-    def __init__(self, config, s3_config, db_service):
+    def __init__(self, config, s3_config, db_service, workers: Optional[int] = None):
         """
         Initialize backup manager.
         
@@ -63,12 +74,16 @@ class ProcessingSessionFileBackup:
             config: Application configuration
             s3_config: S3BackupConfig object (from s3_backup.manager)
             db_service: Database service
+            workers: Files uploaded at once (default: upload_settings.processed_file_workers)
         """
         from boto3.s3.transfer import TransferConfig
 
         self.config = config
         self.s3_config = s3_config
         self.db_service = db_service
+        
+        upload_settings = self.s3_config.config.get('upload_settings', {})
+        self.workers = max(1, workers or upload_settings.get('processed_file_workers', DEFAULT_FILE_WORKERS))
 
         # Setup temp directory
         temp_dir = s3_config.resolve_temp_dir()
@@ -84,12 +99,19 @@ class ProcessingSessionFileBackup:
 
         # Initialize S3 client only if enabled
         if s3_config.enabled:
+            # One client and transfer config shared by all upload threads; the
+            # connection pool fits every worker's concurrent part uploads
+            max_concurrency = upload_settings.get('max_concurrency', 4)
             self.s3_client = boto3.client(
                 's3',
-                region_name=s3_config.region
+                config=BotoConfig(
+                    region_name=s3_config.region,
+                    retries={'max_attempts': 3, 'mode': 'adaptive'},
+                    max_pool_connections=max(10, self.workers * max_concurrency)
+                ),
+                endpoint_url=s3_config.endpoint_url
             )
 
-            upload_settings = self.s3_config.config.get('upload_settings', {})
             self.transfer_config = TransferConfig(
                 multipart_threshold=upload_settings.get('multipart_threshold_mb', 100) * 1024 * 1024,
                 multipart_chunksize=upload_settings.get('multipart_chunksize_mb', 25) * 1024 * 1024,
@@ -98,10 +120,16 @@ class ProcessingSessionFileBackup:
             )
 
             self.bucket = s3_config.bucket
+            self.inventory = S3Inventory(
+                self.s3_client, self.bucket, db_service,
+                max_age_minutes=s3_config.config.get('inventory_settings', {}).get(
+                    'max_age_minutes', DEFAULT_MAX_AGE_MINUTES)
+            )
         else:
             self.s3_client = None
             self.transfer_config = None
             self.bucket = None
+            self.inventory = None
             logger.warning("S3 backup is disabled - ProcessingSessionFileBackup initialized in disabled mode")
 
 
@@ -131,6 +159,15 @@ class ProcessingSessionFileBackup:
                 logger.warning(f"Could not remove {tarball}: {e}")
 
   
+    def _get_session_s3_prefix(self, session_id: str) -> str:
+        """S3 prefix holding all of a processing session's files."""
+        try:
+            year = int(session_id[:4])
+        except (ValueError, IndexError):
+            year = datetime.now().year
+        
+        return f"backups/processed/{year}/{session_id}/"
+    
     def _get_file_s3_key(self, session_id: str, subfolder: str, filename: str) -> str:
         """
         Generate S3 key for a processing session file.
@@ -138,12 +175,7 @@ class ProcessingSessionFileBackup:
         Structure: backups/processed/YEAR/SESSION_ID/subfolder/filename
         Example: backups/processed/2025/20250115_ABC123/final/M31_final.xisf
         """
-        try:
-            year = int(session_id[:4])
-        except (ValueError, IndexError):
-            year = datetime.now().year
-        
-        return f"backups/processed/{year}/{session_id}/{subfolder}/{filename}"
+        return f"{self._get_session_s3_prefix(session_id)}{subfolder}/{filename}"
     
     def check_file_needs_backup(self, file_record: ProcessedFile) -> Tuple[bool, str]:
         """
@@ -152,47 +184,126 @@ class ProcessingSessionFileBackup:
         Returns:
             (needs_backup, reason)
         """
+        return self.plan_backups([file_record])[file_record.id]
+    
+    def plan_backups(self, file_records: List[ProcessedFile]) -> Dict[int, Tuple[bool, str]]:
+        """
+        Decide which files need backing up, as one local diff.
+        
+        Backup records are read in a single query and S3 presence comes from
+        the inventory cache (one listing per session), instead of a database
+        lookup and S3 request per file.
+        
+        Returns:
+            Dict of processed file id -> (needs_backup, reason)
+        """
+        if not file_records:
+            return {}
+        
         session = self.db_service.db_manager.get_session()
         
         try:
-            backup_record = session.query(S3BackupProcessedFileRecord).filter(
-                S3BackupProcessedFileRecord.processed_file_id == file_record.id
-            ).first()
+            backup_records = {
+                record.processed_file_id: record
+                for record in session.query(S3BackupProcessedFileRecord).filter(
+                    S3BackupProcessedFileRecord.processed_file_id.in_([f.id for f in file_records])
+                )
+            }
             
-            if not backup_record:
-                return True, "No backup record exists"
+            plan = {}
+            new_md5s = self._hash_missing_md5s(file_records, backup_records)
             
-            file_path = Path(file_record.file_path)
-            if not file_path.exists():
-                return False, "Source file not found locally"
+            for file_record in file_records:
+                backup_record = backup_records.get(file_record.id)
+                if not backup_record:
+                    plan[file_record.id] = (True, "No backup record exists")
+                    continue
+                
+                file_path = Path(file_record.file_path)
+                if not file_path.exists():
+                    plan[file_record.id] = (False, "Source file not found locally")
+                    continue
+                
+                if file_path.is_dir():
+                    plan[file_record.id] = (False, "Directory already backed up (use --force to re-upload)")
+                    continue
+                
+                if self.inventory is not None and self.inventory.get(
+                    backup_record.s3_key,
+                    prefix=self._get_session_s3_prefix(file_record.processing_session_id)
+                ) is None:
+                    plan[file_record.id] = (True, "Backup record exists but object is missing from S3")
+                    continue
+                
+                current_md5 = file_record.md5sum
+                if not current_md5:
+                    current_md5 = new_md5s[file_record.id]
+                    file_record.md5sum = current_md5
+                
+                if backup_record.md5sum != current_md5:
+                    plan[file_record.id] = (
+                        True,
+                        f"File modified (old: {(backup_record.md5sum or '')[:8]}..., new: {current_md5[:8]}...)"
+                    )
+                    continue
+                
+                current_size = file_path.stat().st_size
+                if backup_record.file_size != current_size:
+                    plan[file_record.id] = (True, f"File size changed ({backup_record.file_size} -> {current_size})")
+                    continue
+                
+                plan[file_record.id] = (False, "File already backed up and unchanged")
             
-            current_md5 = file_record.md5sum
-            if not current_md5:
-                current_md5 = self.calculate_md5(file_path)
-                file_record.md5sum = current_md5
+            if new_md5s:
+                self._write_md5s(session, new_md5s)
                 session.commit()
             
-            if backup_record.md5sum != current_md5:
-                return True, f"File modified (old: {backup_record.md5sum[:8]}..., new: {current_md5[:8]}...)"
-            
-            current_size = file_path.stat().st_size
-            if backup_record.file_size != current_size:
-                return True, f"File size changed ({backup_record.file_size} -> {current_size})"
-            
-            return False, "File already backed up and unchanged"
+            return plan
             
         finally:
             session.close()
     
+    def _hash_missing_md5s(self, file_records: List[ProcessedFile],
+                           backup_records: Dict) -> Dict[int, str]:
+        """MD5 the backed-up files that have no stored checksum, on the worker pool."""
+        to_hash = [
+            f for f in file_records
+            if not f.md5sum and f.id in backup_records and Path(f.file_path).is_file()
+        ]
+        if not to_hash:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="processed-md5") as pool:
+            md5s = pool.map(lambda f: self.calculate_md5(Path(f.file_path)), to_hash)
+            return {f.id: md5 for f, md5 in zip(to_hash, md5s)}
+    
+    @staticmethod
+    def _write_md5s(session, md5s: Dict[int, str]):
+        """Store checksums on processed_files in one executemany."""
+        table = ProcessedFile.__table__
+        session.execute(
+            update(table).where(table.c.id == bindparam('b_id')).values(md5sum=bindparam('b_md5')),
+            [{'b_id': file_id, 'b_md5': md5} for file_id, md5 in md5s.items()]
+        )
+    
 
     def backup_file(
         self,
         file_record: ProcessedFile,
         force: bool = False,
         file_num: int = 1,
-        total_files: int = 1
+        total_files: int = 1,
+        plan: Optional[Tuple[bool, str]] = None,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        record_backup: bool = True
     ) -> FileBackupResult:
-        """Backup a single processed file to S3."""
+        """Backup a single processed file to S3.
+        
+        plan is this file's entry from plan_backups(); without it the file
+        is checked on its own. progress_callback(bytes) replaces the per-file
+        progress bar. With record_backup=False the checksum and backup record
+        are left for the caller to write (see _write_backup_records).
+        """
         file_path = Path(file_record.file_path)
         
         if not file_path.exists():
@@ -207,27 +318,23 @@ class ProcessingSessionFileBackup:
         temp_tarball = None
         upload_path = file_path
         
-        # Skip re-uploading existing directory backups BEFORE creating tarball
-        if needs_tarball and not force:
-            session = self.db_service.db_manager.get_session()
-            backup_record = session.query(S3BackupProcessedFileRecord).filter(
-                S3BackupProcessedFileRecord.processed_file_id == file_record.id
-            ).first()
-            session.close()
-            
-            if backup_record:
+        # Skip unchanged files (and existing directory backups) BEFORE creating a tarball
+        if not force:
+            needs_backup, reason = plan or self.check_file_needs_backup(file_record)
+            if not needs_backup:
                 return FileBackupResult(
                     success=True,
                     file_path=str(file_path),
                     needs_backup=False,
-                    reason="Directory already backed up (use --force to re-upload)"
+                    reason=reason
                 )
         
         if needs_tarball:
             import tarfile
             import tempfile
             
-            temp_tarball = self.temp_dir / f"{file_path.name}.tar"
+            # Prefixed with the file id so concurrent uploads of same-named folders don't collide
+            temp_tarball = self.temp_dir / f"{file_record.id}_{file_path.name}.tar"
             
             try:
                 with tarfile.open(temp_tarball, 'w') as tar:
@@ -241,22 +348,11 @@ class ProcessingSessionFileBackup:
                     error=f"Failed to create tarball: {e}"
                 )
         
-        if not force:
-            needs_backup, reason = self.check_file_needs_backup(file_record)
-            if not needs_backup:
-                if temp_tarball and temp_tarball.exists():
-                    temp_tarball.unlink()
-                return FileBackupResult(
-                    success=True,
-                    file_path=str(file_path),
-                    needs_backup=False,
-                    reason=reason
-                )
-        
         # Calculate MD5 of upload file (tarball for directories, original file otherwise)
         # Always recalculate for tarballs since directory content may have changed
         if not file_record.md5sum or needs_tarball:
             file_record.md5sum = self.calculate_md5(upload_path)
+        if record_backup:
             session = self.db_service.db_manager.get_session()
             session.merge(file_record)
             session.commit()
@@ -288,7 +384,9 @@ class ProcessingSessionFileBackup:
                 'pxiproject': 'application/octet-stream'
             }.get(file_record.file_type, 'application/octet-stream')
             
-            progress_callback = UploadProgressCallback(file_num, total_files, file_size)
+            progress_bar = None
+            if progress_callback is None:
+                progress_callback = progress_bar = UploadProgressCallback(file_num, total_files, file_size)
             
             with open(upload_path, 'rb') as f:
                 upload_kwargs = {
@@ -309,20 +407,24 @@ class ProcessingSessionFileBackup:
                     **upload_kwargs
                 )
             
-            progress_callback.close()
+            if progress_bar:
+                progress_bar.close()
             
             response = self.s3_client.head_object(
                 Bucket=self.bucket,
                 Key=s3_key
             )
             etag = response['ETag'].strip('"')
+            self.inventory.record(s3_key, response['ContentLength'], etag,
+                                  response.get('LastModified'), response.get('StorageClass'))
             
-            self._update_backup_record(
-                file_record,
-                s3_key,
-                etag,
-                file_size
-            )
+            if record_backup:
+                self._update_backup_record(
+                    file_record,
+                    s3_key,
+                    etag,
+                    file_size
+                )
             
             logger.info(f"✓ Uploaded: {file_record.filename}")
             
@@ -399,14 +501,118 @@ class ProcessingSessionFileBackup:
         finally:
             session.close()
     
+    def _write_backup_records(self, uploads: List[Tuple[ProcessedFile, FileBackupResult]]):
+        """
+        Record a batch of finished uploads in one transaction: checksums on
+        processed_files and the matching S3BackupProcessedFileRecord rows.
+        """
+        if not uploads:
+            return
+        
+        session = self.db_service.db_manager.get_session()
+        
+        try:
+            file_ids = [file_record.id for file_record, _ in uploads]
+            existing = {
+                record.processed_file_id: record
+                for record in session.query(S3BackupProcessedFileRecord).filter(
+                    S3BackupProcessedFileRecord.processed_file_id.in_(file_ids)
+                )
+            }
+            
+            now = datetime.utcnow()
+            for file_record, result in uploads:
+                backup_record = existing.get(file_record.id)
+                if backup_record is None:
+                    backup_record = S3BackupProcessedFileRecord(
+                        processed_file_id=file_record.id,
+                        processing_session_id=file_record.processing_session_id
+                    )
+                    session.add(backup_record)
+                backup_record.s3_bucket = self.bucket
+                backup_record.s3_key = result.s3_key
+                backup_record.s3_region = self.s3_config.region
+                backup_record.s3_etag = result.s3_etag
+                backup_record.file_size = result.file_size
+                backup_record.md5sum = result.md5sum
+                backup_record.uploaded_at = now
+            
+            self._write_md5s(session, {
+                file_record.id: result.md5sum for file_record, result in uploads if result.md5sum
+            })
+            session.commit()
+            
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _backup_files_concurrently(
+        self,
+        files: List[ProcessedFile],
+        plan: Dict[int, Tuple[bool, str]],
+        force: bool,
+        workers: int
+    ) -> Iterator[Tuple[ProcessedFile, FileBackupResult]]:
+        """
+        Back up files on a pool of upload threads, yielding results as they finish.
+        
+        All threads share the S3 client and transfer config. Progress is one
+        aggregated bar over the bytes to upload, and backup records are
+        written in batches of RECORD_BATCH_SIZE rather than per file.
+        """
+        to_upload = [f for f in files if force or plan.get(f.id, (True, ''))[0]]
+        total_bytes = sum(f.file_size or 0 for f in to_upload)
+        
+        lock = threading.Lock()
+        pending: List[Tuple[ProcessedFile, FileBackupResult]] = []
+        
+        with tqdm(total=total_bytes, desc=f"Uploading ({workers} workers)",
+                  unit='B', unit_scale=True, unit_divisor=1024) as pbar:
+            
+            def progress(bytes_transferred: int):
+                with lock:
+                    pbar.update(bytes_transferred)
+            
+            try:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="processed-upload") as pool:
+                    futures = {
+                        pool.submit(self.backup_file, file_record, force=force,
+                                    plan=plan.get(file_record.id), progress_callback=progress,
+                                    record_backup=False): file_record
+                        for file_record in files
+                    }
+                    
+                    for future in as_completed(futures):
+                        file_record = futures[future]
+                        result = future.result()
+                        
+                        if result.success and result.needs_backup:
+                            pending.append((file_record, result))
+                            if len(pending) >= RECORD_BATCH_SIZE:
+                                self._write_backup_records(pending)
+                                pending = []
+                        
+                        yield file_record, result
+            finally:
+                # Record whatever finished, even if the backup was interrupted
+                self._write_backup_records(pending)
+    
     def backup_session_files(
         self,
         session_id: str,
         subfolders: Optional[List[str]] = None,
         file_types: Optional[List[str]] = None,
-        force: bool = False
+        force: bool = False,
+        workers: Optional[int] = None
     ) -> Dict:
-        """Backup all files from a processing session."""
+        """
+        Backup all files from a processing session.
+        
+        Files are uploaded on `workers` threads (default: self.workers);
+        workers=1 uploads them one at a time with a progress bar per file.
+        """
         session = self.db_service.db_manager.get_session()
         
         try:
@@ -444,10 +650,22 @@ class ProcessingSessionFileBackup:
             
             logger.info(f"Backing up {len(files)} files from session {session_id}...")
             
-            with tqdm(total=len(files), desc="Backing up files", unit="files") as pbar:
-                for idx, file_record in enumerate(files, 1):
-                    result = self.backup_file(file_record, force=force, file_num=idx, total_files=len(files))
-                    
+            plan = {} if force else self.plan_backups(files)
+            
+            workers = max(1, workers or self.workers)
+            if workers > 1 and len(files) > 1:
+                results = self._backup_files_concurrently(files, plan, force, workers)
+                pbar = None
+            else:
+                results = (
+                    (file_record, self.backup_file(file_record, force=force, file_num=idx,
+                                                   total_files=len(files), plan=plan.get(file_record.id)))
+                    for idx, file_record in enumerate(files, 1)
+                )
+                pbar = tqdm(total=len(files), desc="Backing up files", unit="files")
+            
+            try:
+                for file_record, result in results:
                     if result.success:
                         if result.needs_backup:
                             stats['uploaded'] += 1
@@ -461,12 +679,16 @@ class ProcessingSessionFileBackup:
                             'error': result.error
                         })
                     
-                    pbar.update(1)
-                    pbar.set_postfix({
-                        'uploaded': stats['uploaded'],
-                        'skipped': stats['skipped'],
-                        'failed': stats['failed']
-                    })
+                    if pbar:
+                        pbar.update(1)
+                        pbar.set_postfix({
+                            'uploaded': stats['uploaded'],
+                            'skipped': stats['skipped'],
+                            'failed': stats['failed']
+                        })
+            finally:
+                if pbar:
+                    pbar.close()
             
             stats['success'] = stats['failed'] == 0
             
@@ -495,30 +717,27 @@ class ProcessingSessionFileBackup:
                 return False
             
             try:
-                response = self.s3_client.head_object(
-                    Bucket=backup_record.s3_bucket,
-                    Key=backup_record.s3_key
+                entry = self.inventory.get(
+                    backup_record.s3_key,
+                    prefix=self._get_session_s3_prefix(file_record.processing_session_id)
                 )
-                
-                s3_etag = response['ETag'].strip('"')
-                
-                if s3_etag != backup_record.s3_etag:
-                    logger.error(f"ETag mismatch for {file_record.filename}")
-                    return False
-                
-                s3_size = response['ContentLength']
-                if s3_size != backup_record.file_size:
-                    logger.error(f"Size mismatch for {file_record.filename}")
-                    return False
-                
-                return True
-                
             except ClientError as e:
-                if e.response['Error']['Code'] == '404':
-                    logger.error(f"File not found in S3: {backup_record.s3_key}")
-                else:
-                    logger.error(f"Error checking S3: {e}")
+                logger.error(f"Error checking S3: {e}")
                 return False
+            
+            if entry is None:
+                logger.error(f"File not found in S3: {backup_record.s3_key}")
+                return False
+            
+            if entry.etag != backup_record.s3_etag:
+                logger.error(f"ETag mismatch for {file_record.filename}")
+                return False
+            
+            if entry.size != backup_record.file_size:
+                logger.error(f"Size mismatch for {file_record.filename}")
+                return False
+            
+            return True
                 
         finally:
             session.close()
@@ -0,0 +1,513 @@
+"""Pipelined backup of many imaging sessions.
+
+An archiver thread builds the next session's archive in the temp dir while
+the current one uploads, so reading frames from disk overlaps with sending
+them to S3. Archives waiting on disk are bounded by a temp-space budget and
+all part uploads share one bandwidth limit. Each upload's multipart ID and
+finished parts are recorded on its S3BackupArchive row, so an interrupted
+run resumes the upload at the part where it stopped instead of rebuilding
+and resending the whole session.
+"""
+
+import json
+import logging
+import math
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from botocore.exceptions import ClientError
+from tqdm import tqdm
+
+from models import FitsFile, ImagingSession as SessionModel
+from s3_backup.manager import ArchiveResult, S3BackupManager, catalog_file_size
+from s3_backup.models import S3BackupArchive, UPLOAD_COMPLETED, UPLOAD_IN_PROGRESS
+from s3_backup.streaming import MB, choose_part_size
+
+logger = logging.getLogger(__name__)
+
+GB = 1024 * MB
+
+# Temp space reserved per archive beyond the frames' size, for tar headers
+ARCHIVE_OVERHEAD = 0.02
+
+# Share of the temp dir's free space used when no budget is configured
+DEFAULT_TEMP_SPACE_FRACTION = 0.9
+
+
+class TempSpaceBudget:
+    """Bytes of archives allowed in the temp dir at once."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.used = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, amount: int, stop: threading.Event) -> bool:
+        """
+        Reserve amount bytes, waiting for uploads to release space.
+
+        An archive larger than the whole budget is let through once nothing
+        else is reserved, so one oversized session cannot stall the run.
+        Returns False if stop was set while waiting.
+        """
+        with self._cond:
+            while self.used and self.used + amount > self.capacity:
+                if stop.is_set():
+                    return False
+                self._cond.wait(timeout=1.0)
+            self.used += amount
+            return True
+
+    def grow(self, amount: int):
+        """Count amount more bytes as used without waiting, for space already taken."""
+        with self._cond:
+            self.used += amount
+
+    def release(self, amount: int):
+        with self._cond:
+            self.used = max(0, self.used - amount)
+            self._cond.notify_all()
+
+
+class BandwidthLimiter:
+    """Paces uploads on all threads to an average bytes-per-second rate."""
+
+    def __init__(self, bytes_per_second: float):
+        self.rate = bytes_per_second
+        self._lock = threading.Lock()
+        self._next_send = time.monotonic()
+
+    def consume(self, amount: int):
+        """Block until amount more bytes may be sent."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_send)
+            self._next_send = start + amount / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+
+@dataclass
+class _ArchiveJob:
+    """A session handed from the archiver to the uploader; result is set if there is nothing to upload."""
+    session_id: str
+    year: int = 0
+    record_id: Optional[int] = None
+    archive_path: Optional[Path] = None
+    reserved: int = 0
+    result: Optional[ArchiveResult] = None
+
+
+def _failed(session_id: str, error: str) -> _ArchiveJob:
+    return _ArchiveJob(session_id, result=ArchiveResult(success=False, session_id=session_id, error=error))
+
+
+class BackupScheduler:
+    """Backs up sessions with archiving and uploading pipelined."""
+
+    def __init__(self, manager: S3BackupManager, max_temp_bytes: Optional[int] = None,
+                 max_bandwidth_mbps: Optional[float] = None):
+        """
+        Args:
+            manager: Backup manager providing the S3 client, config and database
+            max_temp_bytes: Temp-space budget (default: archive_settings.max_temp_space_gb,
+                else 90% of the temp dir's free space)
+            max_bandwidth_mbps: Upload limit in MB/s (default: upload_settings.max_bandwidth_mbps)
+        """
+        self.manager = manager
+        config = manager.s3_config.config
+        archive_settings = config.get('archive_settings', {})
+        upload_settings = config.get('upload_settings', {})
+
+        if max_temp_bytes is None:
+            max_temp_gb = archive_settings.get('max_temp_space_gb')
+            if max_temp_gb:
+                max_temp_bytes = int(max_temp_gb * GB)
+            else:
+                max_temp_bytes = int(shutil.disk_usage(manager.temp_dir).free * DEFAULT_TEMP_SPACE_FRACTION)
+        self.max_temp_bytes = max_temp_bytes
+
+        if max_bandwidth_mbps is None:
+            max_bandwidth_mbps = upload_settings.get('max_bandwidth_mbps')
+        self.limiter = BandwidthLimiter(max_bandwidth_mbps * MB) if max_bandwidth_mbps else None
+
+        self.compression_level = archive_settings.get('compression_level', 0)
+        self.use_pigz = archive_settings.get('use_pigz', False)
+        self.max_concurrency = max(1, upload_settings.get('max_concurrency', 4))
+        self.chunk_size = int(upload_settings.get('multipart_chunksize_mb', 25) * MB)
+
+        rules = config.get('backup_rules', {}).get('raw_lights', {})
+        self.archive_policy = rules.get('archive_policy', 'fast')
+        self.backup_policy = rules.get('backup_policy', 'deep')
+
+    def iter_backups(self, session_ids: Iterable[str], skip_existing: bool = True,
+                     cleanup_archive: bool = True) -> Iterator[ArchiveResult]:
+        """
+        Back up sessions, yielding each result as its upload finishes.
+
+        Args:
+            session_ids: Sessions in the order they should be archived
+            skip_existing: Skip sessions already backed up
+            cleanup_archive: Delete each local archive after its upload completes
+
+        Yields:
+            ArchiveResult per session, in the order given
+        """
+        budget = TempSpaceBudget(self.max_temp_bytes)
+        ready: queue.Queue = queue.Queue()
+        stop = threading.Event()
+
+        logger.info(f"Backup pipeline: temp budget {self.manager._format_bytes(self.max_temp_bytes)}, "
+                    f"bandwidth {'unlimited' if not self.limiter else f'{self.limiter.rate / MB:.1f} MB/s'}")
+
+        archiver = threading.Thread(
+            target=self._archive_sessions,
+            args=(list(session_ids), skip_existing, budget, ready, stop),
+            name="backup-archiver",
+            daemon=True
+        )
+        archiver.start()
+
+        try:
+            while True:
+                job = ready.get()
+                if job is None:
+                    break
+                try:
+                    result = job.result or self._upload_job(job, cleanup_archive)
+                finally:
+                    budget.release(job.reserved)
+                yield result
+        finally:
+            stop.set()
+            archiver.join()
+
+    # ------------------------------------------------------------------
+    # Archiver thread
+    # ------------------------------------------------------------------
+
+    def _archive_sessions(self, session_ids, skip_existing, budget, ready, stop):
+        try:
+            for session_id in session_ids:
+                if stop.is_set():
+                    break
+                try:
+                    job = self._prepare_archive(session_id, skip_existing, budget, stop)
+                except Exception as e:
+                    logger.error(f"Error archiving {session_id}: {e}")
+                    job = _failed(session_id, f"Archive failed: {e}")
+                if job is None:
+                    break
+                ready.put(job)
+        finally:
+            ready.put(None)
+
+    def _prepare_archive(self, session_id: str, skip_existing: bool,
+                         budget: TempSpaceBudget, stop: threading.Event) -> Optional[_ArchiveJob]:
+        """Archive one session and record it as uploading; None if stopped while waiting for space."""
+        session_db = self.manager.db_service.db_manager.get_session()
+        try:
+            session = session_db.query(SessionModel).filter(SessionModel.id == session_id).first()
+            if not session:
+                return _failed(session_id, "Session not found in database")
+            try:
+                year = datetime.strptime(session.date, '%Y-%m-%d').year
+            except (TypeError, ValueError):
+                return _failed(session_id, "Invalid session date format")
+
+            record = session_db.query(S3BackupArchive).filter(
+                S3BackupArchive.session_id == session_id
+            ).first()
+
+            if record and record.upload_status == UPLOAD_IN_PROGRESS:
+                archive_path = Path(record.local_archive_path) if record.local_archive_path else None
+                if (archive_path and archive_path.exists()
+                        and archive_path.stat().st_size == record.compressed_size_bytes):
+                    if not budget.acquire(record.compressed_size_bytes, stop):
+                        return None
+                    logger.info(f"Resuming interrupted upload of {session_id}")
+                    return _ArchiveJob(session_id, year, record.id, archive_path,
+                                       record.compressed_size_bytes)
+                # The archive the parts came from is gone, so start over
+                self.manager.discard_incomplete_upload(session_db, record)
+                record = None
+
+            if skip_existing:
+                skipped = self.manager.check_existing_backup(session_db, session_id, year)
+                if skipped:
+                    return _ArchiveJob(session_id, year, result=skipped)
+
+            files = session_db.query(
+                FitsFile.folder, FitsFile.file, FitsFile.file_size
+            ).filter(
+                FitsFile.imaging_session_id == session_id,
+                FitsFile.file_not_found.isnot(True)
+            ).all()
+            if not files:
+                return _failed(session_id, "No files found for session")
+            file_count = len(files)
+            original_size = sum(catalog_file_size(*f) for f in files)
+
+            reserved = int(original_size * (1 + ARCHIVE_OVERHEAD)) + MB
+            if not budget.acquire(reserved, stop):
+                return None
+
+            try:
+                archive_path = self.manager.create_session_archive(
+                    session_id,
+                    compression_level=self.compression_level,
+                    use_pigz=self.use_pigz
+                )
+                if not archive_path:
+                    budget.release(reserved)
+                    return _failed(session_id, "Failed to create archive")
+
+                # Give back what compression saved, or account for what the
+                # estimate missed so later archives wait for it
+                compressed_size = archive_path.stat().st_size
+                if compressed_size < reserved:
+                    budget.release(reserved - compressed_size)
+                elif compressed_size > reserved:
+                    budget.grow(compressed_size - reserved)
+                reserved = compressed_size
+
+                if record is None:
+                    record = S3BackupArchive(session_id=session_id)
+                    session_db.add(record)
+
+                record.session_date = session.date
+                record.session_year = year
+                record.s3_bucket = self.manager.s3_config.bucket
+                record.s3_key = self.manager._get_archive_key(session_id, year)
+                record.s3_region = self.manager.s3_config.region
+                record.file_count = file_count
+                record.original_size_bytes = original_size
+                record.compressed_size_bytes = compressed_size
+                record.compression_ratio = compressed_size / original_size if original_size > 0 else 0
+                record.archive_policy = self.archive_policy
+                record.backup_policy = self.backup_policy
+                record.camera_name = session.camera
+                record.telescope_name = session.telescope
+                record.verified = False
+                record.upload_status = UPLOAD_IN_PROGRESS
+                record.upload_id = None
+                record.upload_part_size = None
+                record.uploaded_parts = None
+                record.local_archive_path = str(archive_path)
+                session_db.commit()
+            except BaseException:
+                budget.release(reserved)
+                raise
+
+            return _ArchiveJob(session_id, year, record.id, archive_path, reserved)
+        finally:
+            session_db.close()
+
+    # ------------------------------------------------------------------
+    # Uploader
+    # ------------------------------------------------------------------
+
+    def _upload_job(self, job: _ArchiveJob, cleanup_archive: bool) -> ArchiveResult:
+        """Upload (or finish uploading) an archived session and mark it completed."""
+        session_db = self.manager.db_service.db_manager.get_session()
+        try:
+            record = session_db.get(S3BackupArchive, job.record_id)
+            start_time = time.monotonic()
+
+            try:
+                etag = self._upload_parts(session_db, record, job.archive_path)
+            except Exception as e:
+                logger.error(f"Upload failed for {job.session_id}: {e}")
+                return ArchiveResult(
+                    success=False,
+                    session_id=job.session_id,
+                    archive_path=job.archive_path,
+                    s3_key=record.s3_key,
+                    error=f"Upload failed (will resume on next run): {e}"
+                )
+
+            # The multipart upload is gone once completed; a failed check restarts it
+            record.upload_id = None
+            record.uploaded_parts = None
+
+            verify_result = self.manager.verify_archive(job.session_id, job.year, use_inventory=False)
+            if not verify_result.verified or verify_result.s3_size != record.compressed_size_bytes:
+                session_db.commit()
+                error = (verify_result.error if not verify_result.verified
+                         else f"S3 size {verify_result.s3_size} != archive size {record.compressed_size_bytes}")
+                return ArchiveResult(
+                    success=False,
+                    session_id=job.session_id,
+                    archive_path=job.archive_path,
+                    s3_key=record.s3_key,
+                    error=f"Verification failed: {error}"
+                )
+
+            record.upload_status = UPLOAD_COMPLETED
+            record.s3_etag = etag
+            record.uploaded_at = datetime.now()
+            record.verified = True
+            record.verification_method = 'head_object'
+            record.last_verified_at = datetime.now()
+            record.current_storage_class = 'STANDARD'
+            record.local_archive_path = None
+            session_db.commit()
+            logger.info(f"✓ Created database record for backup: {job.session_id}")
+
+            if cleanup_archive:
+                self.manager.safe_unlink(job.archive_path)
+
+            return ArchiveResult(
+                success=True,
+                session_id=job.session_id,
+                archive_path=None if cleanup_archive else job.archive_path,
+                file_count=record.file_count,
+                original_size=record.original_size_bytes,
+                compressed_size=record.compressed_size_bytes,
+                compression_ratio=record.compression_ratio,
+                s3_key=record.s3_key,
+                s3_etag=etag,
+                upload_time=time.monotonic() - start_time
+            )
+        finally:
+            session_db.close()
+
+    def _upload_parts(self, session_db, record: S3BackupArchive, archive_path: Path) -> str:
+        """
+        Multipart-upload archive_path, skipping parts already in S3.
+
+        Every finished part is committed to the record, so an interrupted
+        upload resumes from its recorded upload ID and parts.
+
+        Returns:
+            ETag of the completed object
+        """
+        s3_client = self.manager.s3_client
+        size = archive_path.stat().st_size
+        done = self._uploaded_parts(record)
+
+        if not record.upload_id:
+            record.upload_part_size = choose_part_size(self.chunk_size, size)
+            response = s3_client.create_multipart_upload(
+                Bucket=record.s3_bucket,
+                Key=record.s3_key,
+                StorageClass='STANDARD',
+                Tagging=f"archive_policy={record.archive_policy}&backup_policy={record.backup_policy}",
+                Metadata={
+                    'session_id': record.session_id,
+                    'year': str(record.session_year),
+                    'original_size': str(size),
+                    'created_by': 'astrocat-backup'
+                }
+            )
+            record.upload_id = response['UploadId']
+            record.uploaded_parts = json.dumps([])
+            session_db.commit()
+            done = {}
+
+        # Workers get plain values; the record is only touched on this thread
+        target = (record.s3_bucket, record.s3_key, record.upload_id)
+        part_size = record.upload_part_size
+        part_count = max(1, math.ceil(size / part_size))
+        pending = [n for n in range(1, part_count + 1) if n not in done]
+
+        if done:
+            logger.info(f"Resuming {record.s3_key}: {len(done)}/{part_count} parts already uploaded")
+
+        def part_length(part_number: int) -> int:
+            return min(part_size, size - (part_number - 1) * part_size)
+
+        with tqdm(total=size, initial=sum(part_length(n) for n in done if n <= part_count),
+                  unit='B', unit_scale=True, desc="  Uploading", leave=False) as pbar, \
+             ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="s3-part") as pool:
+            futures = {
+                pool.submit(self._upload_part, archive_path, target, part_number, part_size): part_number
+                for part_number in pending
+            }
+            try:
+                for future in as_completed(futures):
+                    part_number = futures[future]
+                    done[part_number] = future.result()
+                    record.uploaded_parts = json.dumps(
+                        [{'PartNumber': n, 'ETag': etag} for n, etag in sorted(done.items())]
+                    )
+                    session_db.commit()
+                    pbar.update(part_length(part_number))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        bucket, key, upload_id = target
+        response = s3_client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': [
+                {'PartNumber': n, 'ETag': done[n]} for n in range(1, part_count + 1)
+            ]}
+        )
+        return response['ETag'].strip('"')
+
+    def _upload_part(self, archive_path: Path, target: Tuple[str, str, str],
+                     part_number: int, part_size: int) -> str:
+        """Worker: read one part from the archive and upload it."""
+        with open(archive_path, 'rb') as f:
+            f.seek((part_number - 1) * part_size)
+            data = f.read(part_size)
+
+        if self.limiter:
+            self.limiter.consume(len(data))
+
+        bucket, key, upload_id = target
+        response = self.manager.s3_client.upload_part(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data
+        )
+        return response['ETag']
+
+    def _uploaded_parts(self, record: S3BackupArchive) -> Dict[int, str]:
+        """
+        Parts already uploaded for the record's multipart upload.
+
+        S3's own part list is authoritative, since a part can finish after
+        the last commit. If the upload no longer exists (aborted or expired)
+        the record is reset so a new upload starts.
+        """
+        if not record.upload_id:
+            return {}
+
+        parts = {p['PartNumber']: p['ETag'] for p in json.loads(record.uploaded_parts or '[]')}
+        try:
+            marker = 0
+            while True:
+                page = self.manager.s3_client.list_parts(
+                    Bucket=record.s3_bucket,
+                    Key=record.s3_key,
+                    UploadId=record.upload_id,
+                    PartNumberMarker=marker
+                )
+                for part in page.get('Parts', []):
+                    parts[part['PartNumber']] = part['ETag']
+                if not page.get('IsTruncated'):
+                    break
+                marker = page['NextPartNumberMarker']
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'NoSuchUpload':
+                raise
+            logger.warning(f"Multipart upload for {record.s3_key} no longer exists, restarting it")
+            record.upload_id = None
+            record.uploaded_parts = None
+            return {}
+
+        return parts
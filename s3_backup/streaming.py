@@ -0,0 +1,268 @@
+"""Streaming multipart uploads for session archives.
+
+Lets a tar (optionally gzip or pigz compressed) be written straight into an
+S3 multipart upload, so backing up a session needs no temp archive. Parts
+are uploaded concurrently while the archive is still being written; memory
+use is bounded by part_size * (max_concurrency + 1). The object size and
+MD5 are computed as the stream passes through.
+"""
+
+import hashlib
+import logging
+import math
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# S3 multipart limits
+MIN_PART_SIZE = 5 * MB
+MAX_PARTS = 10000
+
+# Read size when draining pigz output
+PIPE_CHUNK_SIZE = 1 * MB
+
+
+def choose_part_size(chunk_size: int, expected_size: Optional[int] = None) -> int:
+    """
+    Pick a multipart part size.
+
+    Starts from the configured chunk size and grows it, in whole MB, when an
+    archive of expected_size would otherwise need more than MAX_PARTS parts.
+    The 10% headroom covers tar headers and files growing during the backup.
+    """
+    part_size = max(chunk_size, MIN_PART_SIZE)
+    if expected_size:
+        needed = math.ceil(expected_size * 1.1 / (MAX_PARTS - 1))
+        part_size = max(part_size, math.ceil(needed / MB) * MB)
+    return part_size
+
+
+class MultipartStreamWriter:
+    """
+    Write-only file object that uploads what is written as an S3 multipart upload.
+
+    Data is buffered into part_size parts, each uploaded on a thread pool as
+    soon as it is full. Writers block once max_concurrency parts are in
+    flight. Call finish() to upload the last part and complete the upload,
+    or abort() to discard it; used as a context manager, an exception aborts.
+    """
+
+    def __init__(self, s3_client, bucket: str, key: str, part_size: int,
+                 max_concurrency: int = 4, extra_args: Optional[Dict] = None,
+                 progress_callback: Optional[Callable[[int], None]] = None):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.progress_callback = progress_callback
+
+        self.size = 0
+        self._md5 = hashlib.md5()
+        self._buffer = bytearray()
+        self._futures = []
+        self._closed = False
+
+        response = s3_client.create_multipart_upload(Bucket=bucket, Key=key, **(extra_args or {}))
+        self.upload_id = response['UploadId']
+
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency),
+                                            thread_name_prefix="s3-part")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        return False
+
+    @property
+    def md5(self) -> str:
+        """Hex MD5 of everything written so far."""
+        return self._md5.hexdigest()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        """Buffer data, uploading every full part."""
+        if self._closed:
+            raise ValueError("write to a finished multipart upload")
+
+        self._md5.update(data)
+        self.size += len(data)
+        self._buffer += data
+
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            self._submit(part)
+
+        return len(data)
+
+    def flush(self):
+        """Parts are uploaded as they fill; nothing to flush early."""
+
+    def _submit(self, data: bytes):
+        """Queue one part, waiting for a free upload slot."""
+        self._raise_failed()
+        self._slots.acquire()
+        part_number = len(self._futures) + 1
+        if part_number > MAX_PARTS:
+            self._slots.release()
+            raise RuntimeError(f"Archive exceeds {MAX_PARTS} parts of {self.part_size} bytes")
+
+        future = self._executor.submit(self._upload_part, part_number, data)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _upload_part(self, part_number: int, data: bytes) -> Dict:
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=data
+        )
+        if self.progress_callback:
+            self.progress_callback(len(data))
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    def _raise_failed(self):
+        """Re-raise the first failed part upload, if any."""
+        for future in self._futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def finish(self) -> Dict:
+        """
+        Upload the remaining data and complete the multipart upload.
+
+        Returns:
+            Dict with etag, size, md5 and part count of the uploaded object
+        """
+        try:
+            # A zero-byte object still needs one (empty) part
+            if self._buffer or not self._futures:
+                self._submit(bytes(self._buffer))
+                self._buffer = bytearray()
+
+            parts = [future.result() for future in self._futures]
+            response = self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._closed = True
+            self._executor.shutdown(wait=True)
+
+        return {
+            'etag': response['ETag'].strip('"'),
+            'size': self.size,
+            'md5': self.md5,
+            'parts': len(parts),
+        }
+
+    def abort(self):
+        """Stop uploading and discard the parts already stored in S3."""
+        if self._closed and not self._futures:
+            return
+        self._closed = True
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        self._futures = []
+
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id
+            )
+            logger.info(f"Aborted multipart upload for {self.key}")
+        except Exception as e:
+            logger.warning(f"Failed to abort multipart upload {self.upload_id} for {self.key}: {e}")
+
+
+def pigz_available() -> bool:
+    """Check whether pigz is on the PATH."""
+    return shutil.which('pigz') is not None
+
+
+class PigzCompressor:
+    """
+    Write-only file object that compresses through a pigz process.
+
+    Compressed output is drained on a background thread into target, which
+    only that thread writes to. close() flushes pigz and waits for it.
+    """
+
+    def __init__(self, target, compression_level: int = 6):
+        self.target = target
+        self._process = subprocess.Popen(
+            ['pigz', f'-{compression_level}', '-c'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+        self._error: Optional[BaseException] = None
+        self._reader = threading.Thread(target=self._drain, name="pigz-reader", daemon=True)
+        self._reader.start()
+
+    def _drain(self):
+        try:
+            while True:
+                chunk = self._process.stdout.read(PIPE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.target.write(chunk)
+        except BaseException as e:
+            self._error = e
+            # Unblock the writer side
+            self._process.kill()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self._error is not None:
+            raise self._error
+        try:
+            self._process.stdin.write(data)
+        except BrokenPipeError:
+            if self._error is not None:
+                raise self._error
+            raise
+        return len(data)
+
+    def flush(self):
+        self._process.stdin.flush()
+
+    def kill(self):
+        """Stop pigz without waiting for its output (used when the archive fails)."""
+        self._process.kill()
+        self._reader.join()
+        self._process.wait()
+
+    def close(self):
+        """Finish compression and wait until all output reached target."""
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._reader.join()
+        returncode = self._process.wait()
+
+        if self._error is not None:
+            raise self._error
+        if returncode != 0:
+            raise RuntimeError(f"pigz exited with status {returncode}")
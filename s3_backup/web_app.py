@@ -24,7 +24,8 @@ from config import load_config
 from models import DatabaseManager, DatabaseService, ImagingSession as SessionModel, ProcessedFile
 from s3_backup.manager import S3BackupManager, S3BackupConfig
 from s3_backup.processing_file_backup import ProcessingSessionFileBackup
-from s3_backup.models import Base as BackupBase, S3BackupArchive, S3BackupSessionNote, S3BackupProcessingSession, S3BackupProcessedFileRecord, S3BackupProcessingSessionSummary
+from s3_backup.scheduler import BackupScheduler
+from s3_backup.models import create_backup_tables, S3BackupArchive, S3BackupSessionNote, S3BackupProcessingSession, S3BackupProcessedFileRecord, S3BackupProcessingSessionSummary
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -152,7 +153,7 @@ async def _get_storage_categories_internal(session_db):
         
         # Category 1: Imaging Sessions
         all_fits = session_db.query(FitsFile).all()
-        backed_up_sessions = {a.session_id for a in session_db.query(S3BackupArchive).all()}
+        backed_up_sessions = {a.session_id for a in session_db.query(S3BackupArchive).filter(S3BackupArchive.is_complete())}
 
         total_local_size = 0
         backed_up_size = 0
@@ -571,7 +572,7 @@ async def startup_event():
         db_manager = DatabaseManager(config.database.connection_string)
         db_service = DatabaseService(db_manager)
 
-        BackupBase.metadata.create_all(bind=db_manager.engine)
+        create_backup_tables(db_manager.engine)
 
         s3_config = S3BackupConfig('s3_config.json')
 
@@ -635,7 +636,7 @@ async def get_status():
         total_sessions = session_db.query(SessionModel).count()
         
         # Raw FITS archives
-        archives = session_db.query(S3BackupArchive).all()
+        archives = session_db.query(S3BackupArchive).filter(S3BackupArchive.is_complete()).all()
         backed_up = len(archives)
         
         total_files = sum(a.file_count or 0 for a in archives)
@@ -788,7 +789,8 @@ async def get_sessions(
         result = []
         for session_model in sessions:
             archive = session_db.query(S3BackupArchive).filter(
-                S3BackupArchive.session_id == session_model.id
+                S3BackupArchive.session_id == session_model.id,
+                S3BackupArchive.is_complete()
             ).first()
 
             backed_up = archive is not None
@@ -947,7 +949,8 @@ async def backup_raw_files(request: BackupRequest):
         sessions_to_backup = []
         for session in sessions:
             archive = session_db.query(S3BackupArchive).filter(
-                S3BackupArchive.session_id == session.id
+                S3BackupArchive.session_id == session.id,
+                S3BackupArchive.is_complete()
             ).first()
 
             if not archive or request.force:
@@ -969,22 +972,22 @@ async def backup_raw_files(request: BackupRequest):
         def do_backup():
             stats = {"uploaded": 0, "failed": 0, "total": len(sessions_to_backup)}
 
-            for session in sessions_to_backup:
-                try:
-                    result = backup_manager.backup_session(
-                        session.id,
-                        skip_existing=False,
-                        cleanup_archive=True
-                    )
-
+            # Archives the next session while the current one uploads
+            scheduler = BackupScheduler(backup_manager)
+            try:
+                for result in scheduler.iter_backups(
+                    [session.id for session in sessions_to_backup],
+                    skip_existing=False,
+                    cleanup_archive=True
+                ):
                     if result.success:
                         stats["uploaded"] += 1
                     else:
+                        logger.error(f"Failed to backup session {result.session_id}: {result.error}")
                         stats["failed"] += 1
-
-                except Exception as e:
-                    logger.error(f"Failed to backup session {session.id}: {e}")
-                    stats["failed"] += 1
+            except Exception as e:
+                logger.error(f"Session backup pipeline failed: {e}")
+                stats["failed"] = stats["total"] - stats["uploaded"]
 
             return stats
 
@@ -1449,7 +1452,6 @@ async def backup_database(request: BackupRequest):
     try:
         from config import load_config
         from pathlib import Path
-        from datetime import datetime
         
         config, _, _, _ = load_config()
         db_path = Path(config.paths.database_path)
@@ -1462,28 +1464,16 @@ async def backup_database(request: BackupRequest):
         
         def do_backup():
             try:
-                # Create timestamped backup key
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                s3_key = f"backups/database/fits_cataloger_{timestamp}.db"
-                
-                # Upload database
-                with open(db_path, 'rb') as f:
-                    backup_manager.s3_client.upload_fileobj(
-                        f,
-                        backup_manager.s3_config.bucket,
-                        s3_key,
-                        ExtraArgs={
-                            'ContentType': 'application/x-sqlite3',
-                            'Tagging': 'backup_policy=standard'
-                        }
-                    )
-                
-                file_size = db_path.stat().st_size
+                # Snapshot and upload changed chunks (or the whole file, per config)
+                result = backup_manager.backup_database(db_path)
+                if not result['success']:
+                    raise RuntimeError(result['error'])
                 
                 return {
-                    "uploaded": 1,
-                    "size": file_size,
-                    "s3_key": s3_key
+                    "uploaded": result.get('uploaded_chunks', 1),
+                    "size": result['size'],
+                    "s3_key": result['s3_key'],
+                    "version_id": result.get('version_id')
                 }
                 
             except Exception as e:
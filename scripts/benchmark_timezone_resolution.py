@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-file metadata extraction time with and without the cached
+timezone resolver.
+
+"Uncached" resets the process-wide TimezoneFinder and the memoized lookups
+before every file, which reproduces the old behaviour of building a new
+finder on each call. "Cached" keeps them warm, as a worker does while
+processing a night of frames from the same site.
+
+Usage:
+    python scripts/benchmark_timezone_resolution.py [num_files]
+
+Run from the repository root so the profiles/ directory is found.
+"""
+
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from astropy.io import fits
+
+from processing import timezone_utils
+from processing.metadata_extractor import extract_fits_metadata_simple
+
+
+# A couple of imaging sites so the cache sees both hits and misses
+SITES = [
+    (51.0447, -114.0719),   # Calgary
+    (31.9583, -111.5967),   # Kitt Peak
+]
+
+
+def build_headers(num_files: int):
+    """Build synthetic light-frame headers spread over one night per site."""
+    headers = []
+    start = datetime(2024, 3, 15, 3, 0, 0)
+
+    for i in range(num_files):
+        lat, lon = SITES[i % len(SITES)]
+        header = fits.Header()
+        header['SWCREATE'] = 'N.I.N.A. 3.0'
+        header['IMAGETYP'] = 'LIGHT'
+        header['OBJECT'] = 'M 31'
+        header['INSTRUME'] = 'ZWO ASI2600MM Pro'
+        header['FILTER'] = 'Ha'
+        header['FOCALLEN'] = 530.0
+        header['NAXIS1'] = 6248
+        header['NAXIS2'] = 4176
+        header['EXPTIME'] = 300.0
+        header['SITELAT'] = lat
+        header['SITELONG'] = lon
+        header['DATE-OBS'] = (start + timedelta(minutes=5 * i)).isoformat()
+        headers.append(header)
+
+    return headers
+
+
+def time_extraction(headers, reset_each_file: bool):
+    """Return per-file extraction times in milliseconds."""
+    timings = []
+    timezone_utils.clear_timezone_cache()
+    timezone_utils._timezone_finder = None
+
+    for i, header in enumerate(headers):
+        if reset_each_file:
+            timezone_utils.clear_timezone_cache()
+            timezone_utils._timezone_finder = None
+
+        t0 = time.perf_counter()
+        extract_fits_metadata_simple(f"/bench/frame_{i:05d}.fits", header, {}, {}, {})
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    return timings
+
+
+def report(label: str, timings):
+    """Print summary statistics for a run."""
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) > 1 else timings[0]
+    print(f"{label:<10} mean {statistics.mean(timings):8.2f} ms   "
+          f"median {statistics.median(timings):8.2f} ms   "
+          f"p95 {p95:8.2f} ms   total {sum(timings) / 1000:6.2f} s")
+
+
+def main():
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    if not timezone_utils.TIMEZONE_AVAILABLE:
+        print("✗ timezonefinder/pytz not installed - nothing to benchmark")
+        return 1
+
+    print("=" * 60)
+    print("TIMEZONE RESOLUTION BENCHMARK")
+    print("=" * 60)
+    print(f"Files: {num_files}, sites: {len(SITES)}\n")
+
+    headers = build_headers(num_files)
+
+    uncached = time_extraction(headers, reset_each_file=True)
+    cached = time_extraction(headers, reset_each_file=False)
+
+    report("Uncached", uncached)
+    report("Cached", cached)
+    print(f"\nSpeedup: {statistics.mean(uncached) / statistics.mean(cached):.1f}x per file")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark request latency of the web interface under parallel dashboard load.
+
+A number of simulated clients repeatedly fetch the dashboard's data
+endpoints (stats, file list, filter options, session lists) while a probe
+polls /api/operations/current the way the UI does during a running scan.
+Reports p50/p95/max latency per endpoint. With database queries blocking
+the event loop, the probe's p95 tracks the slowest dashboard query; with
+them on the threadpool it stays in the low milliseconds.
+
+Usage:
+    python scripts/benchmark_web_concurrency.py [--url URL] [--clients N] [--duration SECONDS]
+
+Start the web interface first (python run_web.py); the benchmark only
+reads, so it is safe against a live catalog.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+
+# Requests the dashboard makes on load
+DASHBOARD_ENDPOINTS = [
+    "/api/stats",
+    "/api/files?page=1&limit=50",
+    "/api/filter-options",
+    "/api/imaging-sessions",
+    "/api/processing-sessions",
+]
+
+# Lightweight status poll issued by the UI while an operation runs
+PROBE_ENDPOINT = "/api/operations/current"
+PROBE_INTERVAL = 0.05
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def timed_get(client, path, latencies, errors):
+    start = time.perf_counter()
+    try:
+        response = await client.get(path)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        errors[path] += 1
+        return
+    latencies[path].append((time.perf_counter() - start) * 1000)
+
+
+async def dashboard_client(client, deadline, latencies, errors):
+    """Fetch every dashboard endpoint at once, like a page load, until the deadline."""
+    while time.monotonic() < deadline:
+        await asyncio.gather(*(timed_get(client, path, latencies, errors)
+                               for path in DASHBOARD_ENDPOINTS))
+
+
+async def probe(client, deadline, latencies, errors):
+    while time.monotonic() < deadline:
+        await timed_get(client, PROBE_ENDPOINT, latencies, errors)
+        await asyncio.sleep(PROBE_INTERVAL)
+
+
+async def run(url, clients, duration):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    limits = httpx.Limits(max_connections=clients * len(DASHBOARD_ENDPOINTS) + 1)
+
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        # Warm up caches so the first page load doesn't dominate the results
+        await asyncio.gather(*(timed_get(client, path, defaultdict(list), errors)
+                               for path in DASHBOARD_ENDPOINTS))
+        errors.clear()
+
+        deadline = time.monotonic() + duration
+        await asyncio.gather(
+            probe(client, deadline, latencies, errors),
+            *(dashboard_client(client, deadline, latencies, errors) for _ in range(clients))
+        )
+
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000", help="Web interface base URL")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent dashboard clients")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    args = parser.parse_args()
+
+    print(f"Loading {args.url} with {args.clients} dashboard clients for {args.duration:.0f}s...")
+    latencies, errors = asyncio.run(run(args.url, args.clients, args.duration))
+
+    if not latencies:
+        print("No successful requests - is the web interface running?")
+        return 1
+
+    print()
+    print(f"{'Endpoint':<32}{'Requests':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'Errors':>8}")
+    for path in [PROBE_ENDPOINT] + DASHBOARD_ENDPOINTS:
+        values = latencies.get(path)
+        if not values:
+            print(f"{path:<32}{0:>10}{'-':>10}{'-':>10}{'-':>10}{errors[path]:>8}")
+            continue
+        print(f"{path:<32}{len(values):>10}{statistics.median(values):>10.1f}"
+              f"{percentile(values, 95):>10.1f}{max(values):>10.1f}{errors[path]:>8}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,9 @@ const FilesBrowserComponent = {
         return {
             // Files Data
             files: [],
-            filePagination: { page: 1, limit: 50, total: 0, pages: 0 },
+            filePagination: { page: 1, limit: 50, total: 0, pages: 0, next_cursor: null, prev_cursor: null },
+            // Cursor for the next loadFiles() (set by next/prev page)
+            fileCursor: null,
             
             // Filters
             fileFilters: {
@@ -34,6 +36,8 @@ const FilesBrowserComponent = {
                 filters: [],
                 dates: []
             },
+            // Filter options narrowed to the current selections (null: use filterOptions)
+            fileFacetOptions: null,
             
             // Filter UI State
             activeFilter: null,
@@ -65,9 +69,10 @@ const FilesBrowserComponent = {
         },
         
         filteredObjectOptions() {
-            if (!this.objectSearchText) return this.filterOptions.objects;
+            const objects = (this.fileFacetOptions || this.filterOptions).objects;
+            if (!this.objectSearchText) return objects;
             const search = this.objectSearchText.toLowerCase();
-            return this.filterOptions.objects.filter(obj => 
+            return objects.filter(obj => 
                 obj.toLowerCase().includes(search)
             );
         },
@@ -104,6 +109,27 @@ const FilesBrowserComponent = {
             }
         },
         
+        async loadFileFacets() {
+            try {
+                const params = {};
+                for (const [key, values] of Object.entries(this.fileFilters)) {
+                    if (values.length > 0) {
+                        params[key] = values.join(',');
+                    }
+                }
+                
+                if (Object.keys(params).length === 0) {
+                    this.fileFacetOptions = null;
+                    return;
+                }
+                
+                const response = await ApiService.files.getFilterOptions(params);
+                this.fileFacetOptions = response.data;
+            } catch (error) {
+                console.error('Error loading filter options:', error);
+            }
+        },
+        
         async loadFiles() {
             try {
                 this.loading = true;
@@ -116,6 +142,12 @@ const FilesBrowserComponent = {
                     sort_order: this.fileSorting.sort_order
                 };
                 
+                // Step from the current page by keyset instead of offset
+                if (this.fileCursor) {
+                    params.cursor = this.fileCursor;
+                    this.fileCursor = null;
+                }
+                
                 // Add filters
                 for (const [key, values] of Object.entries(this.fileFilters)) {
                     if (values.length > 0) {
@@ -134,6 +166,8 @@ const FilesBrowserComponent = {
                 this.files = response.data.files;
                 this.filePagination.total = response.data.pagination.total;
                 this.filePagination.pages = response.data.pagination.pages;
+                this.filePagination.next_cursor = response.data.pagination.next_cursor;
+                this.filePagination.prev_cursor = response.data.pagination.prev_cursor;
                 
             } catch (error) {
                 console.error('Error loading files:', error);
@@ -161,6 +195,7 @@ const FilesBrowserComponent = {
             this.filePagination.page = 1;
             this.clearSelection();
             this.loadFiles();
+            this.loadFileFacets();
         },
         
         getFilterText(filterName) {
@@ -183,6 +218,7 @@ const FilesBrowserComponent = {
             }
             this.objectSearchText = '';
             this.activeFilter = null;
+            this.fileFacetOptions = null;
             this.filePagination.page = 1;
             this.clearSelection();
             this.loadFiles();
@@ -328,6 +364,7 @@ const FilesBrowserComponent = {
         prevFilePage() {
             if (this.filePagination.page > 1) {
                 this.filePagination.page--;
+                this.fileCursor = this.filePagination.prev_cursor;
                 this.loadFiles();
             }
         },
@@ -335,6 +372,7 @@ const FilesBrowserComponent = {
         nextFilePage() {
             if (this.filePagination.page < this.filePagination.pages) {
                 this.filePagination.page++;
+                this.fileCursor = this.filePagination.next_cursor;
                 this.loadFiles();
             }
         },
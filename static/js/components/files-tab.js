@@ -172,6 +172,7 @@ const FilesTab = {
                                                     <label v-for="option in filteredObjectOptions" :key="option" class="filter-option">
                                                         <input type="checkbox" :checked="$root.fileFilters.objects.includes(option)" @change="$root.toggleFilterOption('objects', option)">
                                                         <span>{{ option }}</span>
+                                                        <span class="text-gray-400 ml-1">{{ facetCount('objects', option) }}</span>
                                                     </label>
                                                 </div>
                                             </div>
@@ -198,6 +199,7 @@ const FilesTab = {
                                                 <label v-for="option in filterOptions.frame_types" :key="option" class="filter-option">
                                                     <input type="checkbox" :checked="$root.fileFilters.frame_types.includes(option)" @change="$root.toggleFilterOption('frame_types', option)">
                                                     <span>{{ option }}</span>
+                                                    <span class="text-gray-400 ml-1">{{ facetCount('frame_types', option) }}</span>
                                                 </label>
                                             </div>
                                         </div>
@@ -223,6 +225,7 @@ const FilesTab = {
                                                 <label v-for="option in filterOptions.cameras" :key="option" class="filter-option">
                                                     <input type="checkbox" :checked="$root.fileFilters.cameras.includes(option)" @change="$root.toggleFilterOption('cameras', option)">
                                                     <span>{{ option }}</span>
+                                                    <span class="text-gray-400 ml-1">{{ facetCount('cameras', option) }}</span>
                                                 </label>
                                             </div>
                                         </div>
@@ -248,6 +251,7 @@ const FilesTab = {
                                                 <label v-for="option in filterOptions.telescopes" :key="option" class="filter-option">
                                                     <input type="checkbox" :checked="$root.fileFilters.telescopes.includes(option)" @change="$root.toggleFilterOption('telescopes', option)">
                                                     <span>{{ option }}</span>
+                                                    <span class="text-gray-400 ml-1">{{ facetCount('telescopes', option) }}</span>
                                                 </label>
                                             </div>
                                         </div>
@@ -273,6 +277,7 @@ const FilesTab = {
                                                 <label v-for="option in filterOptions.filters" :key="option" class="filter-option">
                                                     <input type="checkbox" :checked="$root.fileFilters.filters.includes(option)" @change="$root.toggleFilterOption('filters', option)">
                                                     <span>{{ option }}</span>
+                                                    <span class="text-gray-400 ml-1">{{ facetCount('filters', option) }}</span>
                                                 </label>
                                             </div>
                                         </div>
@@ -386,6 +391,11 @@ const FilesTab = {
     methods: {
         ...FilesBrowserComponent.methods,
         
+        facetCount(facet, option) {
+            const counts = this.filterOptions.counts;
+            return counts && counts[facet] ? counts[facet][option] : '';
+        },
+        
         getFrameTypeClass(frameType) {
             const classes = {
                 'LIGHT': 'bg-blue-100 text-blue-800',
@@ -420,7 +430,7 @@ const FilesTab = {
         fileSorting() { return this.$root.fileSorting; },
         searchFilters() { return this.$root.searchFilters; },
         fileFilters() { return this.$root.fileFilters; },
-        filterOptions() { return this.$root.filterOptions; },
+        filterOptions() { return this.$root.fileFacetOptions || this.$root.filterOptions; },
         showSelectionOptions: {
             get() { return this.$root.showSelectionOptions; },
             set(val) { this.$root.showSelectionOptions = val; }
@@ -9,7 +9,7 @@ const ApiService = {
 
     files: {
         getFiles: (params) => axios.get('/api/files', { params }),
-        getFilterOptions: () => axios.get('/api/filter-options'),
+        getFilterOptions: (params) => axios.get('/api/filter-options', { params }),
         getAllFileIds: (params) => axios.get('/api/files/ids', { params }) 
     },
     
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming session archives to S3.
+Runs MultipartStreamWriter and PigzCompressor against a stub S3 client,
+so no AWS credentials or bucket are needed.
+"""
+
+import sys
+import gzip
+import hashlib
+import os
+import threading
+
+print("=" * 70)
+print("S3 STREAMING UPLOAD - TEST SCRIPT")
+print("=" * 70)
+
+
+class StubS3Client:
+    """Records multipart calls and assembles completed objects in memory."""
+
+    def __init__(self, fail_part=None):
+        self.fail_part = fail_part
+        self.uploads = {}
+        self.objects = {}
+        self.aborted = []
+        self._lock = threading.Lock()
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == self.fail_part:
+            raise IOError(f"part {PartNumber} failed")
+        with self._lock:
+            self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {'ETag': f'"{hashlib.md5(Body).hexdigest()}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = MultipartUpload['Parts']
+        numbers = [p['PartNumber'] for p in parts]
+        assert numbers == list(range(1, len(parts) + 1)), f"parts out of order: {numbers}"
+        stored = self.uploads.pop(UploadId)
+        for part in parts:
+            assert part['ETag'] == f'"{hashlib.md5(stored[part["PartNumber"]]).hexdigest()}"', \
+                f"ETag mismatch on part {part['PartNumber']}"
+        self.objects[Key] = b''.join(stored[n] for n in numbers)
+        return {'ETag': f'"combined-{len(parts)}"'}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(UploadId)
+        self.uploads.pop(UploadId, None)
+
+
+try:
+    # Test 1: Imports
+    print("\n1. Testing streaming imports...")
+    from s3_backup import streaming
+    from s3_backup.streaming import (
+        MB,
+        MAX_PARTS,
+        MIN_PART_SIZE,
+        MultipartStreamWriter,
+        PigzCompressor,
+        choose_part_size,
+        pigz_available
+    )
+    print("   ✓ Streaming imports successful")
+
+    # Test 2: Part size grows so large archives stay under MAX_PARTS
+    print("\n2. Testing choose_part_size...")
+    assert choose_part_size(25 * MB) == 25 * MB, "Configured chunk size should be kept"
+    assert choose_part_size(1 * MB) == MIN_PART_SIZE, "Part size should not go below the S3 minimum"
+    for expected_size in (10 * 1024**3, 300 * 1024**3, 2 * 1024**4):
+        part_size = choose_part_size(25 * MB, expected_size)
+        assert part_size % MB == 0, "Part size should be whole MB"
+        assert expected_size * 1.1 / part_size <= MAX_PARTS, \
+            f"{expected_size} bytes would need more than {MAX_PARTS} parts of {part_size}"
+    print("   ✓ Part size scales with expected archive size")
+
+    # Test 3: Parts are uploaded in order and reassemble to the written data
+    print("\n3. Testing MultipartStreamWriter upload...")
+    client = StubS3Client()
+    data = os.urandom(12 * MB + 12345)
+    progress = []
+    with MultipartStreamWriter(client, 'bucket', 'archive.tar', MIN_PART_SIZE,
+                               max_concurrency=2,
+                               progress_callback=progress.append) as writer:
+        # Uneven writes, as tarfile produces
+        for offset in range(0, len(data), 777777):
+            writer.write(data[offset:offset + 777777])
+        result = writer.finish()
+
+    assert client.objects['archive.tar'] == data, "Uploaded object should match written data"
+    assert result['parts'] == 3, f"Expected 3 parts, got {result['parts']}"
+    assert result['size'] == len(data), "Reported size should match written data"
+    assert result['md5'] == hashlib.md5(data).hexdigest(), "Reported MD5 should match written data"
+    assert sum(progress) == len(data), "Progress callback should see every byte"
+    assert not client.aborted, "Successful upload should not be aborted"
+    print("   ✓ Upload completed with correct size, MD5 and part order")
+
+    # Test 4: An empty archive still completes with one part
+    print("\n4. Testing empty MultipartStreamWriter upload...")
+    client = StubS3Client()
+    with MultipartStreamWriter(client, 'bucket', 'empty.tar', MIN_PART_SIZE) as writer:
+        result = writer.finish()
+    assert client.objects['empty.tar'] == b'', "Empty upload should create an empty object"
+    assert result['parts'] == 1, "Empty upload should send one part"
+    print("   ✓ Empty upload completed")
+
+    # Test 5: A failed part aborts the upload
+    print("\n5. Testing failed part upload...")
+    client = StubS3Client(fail_part=2)
+    try:
+        with MultipartStreamWriter(client, 'bucket', 'failed.tar', MIN_PART_SIZE) as writer:
+            writer.write(os.urandom(3 * MIN_PART_SIZE))
+            writer.finish()
+        print("   ✗ FAIL: Failed part should raise")
+        sys.exit(1)
+    except IOError:
+        pass
+    assert client.aborted == ['upload-1'], "Failed upload should be aborted"
+    assert 'failed.tar' not in client.objects, "Failed upload should not create an object"
+    print("   ✓ Failed part raised and upload was aborted")
+
+    # Test 6: Going past MAX_PARTS fails instead of sending an invalid upload
+    print("\n6. Testing MAX_PARTS limit...")
+    client = StubS3Client()
+    streaming.MAX_PARTS = 2
+    try:
+        with MultipartStreamWriter(client, 'bucket', 'large.tar', MIN_PART_SIZE) as writer:
+            writer.write(os.urandom(3 * MIN_PART_SIZE))
+            writer.finish()
+        print("   ✗ FAIL: Third part should exceed MAX_PARTS")
+        sys.exit(1)
+    except RuntimeError:
+        pass
+    finally:
+        streaming.MAX_PARTS = MAX_PARTS
+    assert client.aborted, "Upload over MAX_PARTS should be aborted"
+    print("   ✓ Upload over MAX_PARTS raised and was aborted")
+
+    # Test 7: pigz output streamed through the writer decompresses to the input
+    print("\n7. Testing PigzCompressor...")
+    if not pigz_available():
+        print("   - pigz not installed, skipped")
+    else:
+        client = StubS3Client()
+        data = os.urandom(4 * MB) + b'\0' * (8 * MB)
+        with MultipartStreamWriter(client, 'bucket', 'archive.tar.gz', MIN_PART_SIZE) as writer:
+            compressor = PigzCompressor(writer, compression_level=6)
+            for offset in range(0, len(data), MB):
+                compressor.write(data[offset:offset + MB])
+            compressor.close()
+            result = writer.finish()
+        compressed = client.objects['archive.tar.gz']
+        assert gzip.decompress(compressed) == data, "Decompressed object should match input"
+        assert result['size'] == len(compressed), "Reported size should be the compressed size"
+        print("   ✓ pigz output uploaded and decompresses to the input")
+
+    print("\n" + "=" * 70)
+    print("ALL TESTS PASSED! ✓")
+    print("=" * 70)
+
+    sys.exit(0)
+
+except Exception as e:
+    print(f"\n✗ TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
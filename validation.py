@@ -1,10 +1,17 @@
 """FITS File Validation Module - Scores files for migration readiness."""
 
+import hashlib
+import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from pathlib import Path
 
+import polars as pl
+from sqlalchemy import and_, bindparam, func, or_, select, true, update
 from sqlalchemy.orm import Session
 from tqdm import tqdm
 
@@ -12,6 +19,44 @@ from models import DatabaseService, FitsFile, Camera, Telescope, FilterMapping
 
 logger = logging.getLogger(__name__)
 
+# Records read, scored and written back per chunk
+VALIDATION_CHUNK_SIZE = 5000
+
+# Concurrent existence checks when check_files is set
+FILE_CHECK_WORKERS = 16
+
+# Bump when the scoring rules change so every row is re-scored
+VALIDATION_RULES_VERSION = 1
+
+# System settings recording the last complete validation run
+VALIDATION_LAST_RUN_SETTING = 'validation_last_run'
+VALIDATION_EQUIPMENT_SETTING = 'validation_equipment_fingerprint'
+
+_MISSING_EQUIPMENT = ['UNKNOWN', 'NULL', 'NONE']
+_INVALID_OBJECTS = ['UNKNOWN', 'CALIBRATION', 'NULL', 'NONE']
+_NO_FILTER = ['NONE', 'CLEAR']
+
+# Record fields the score depends on
+_SCORED_COLUMNS = [
+    'frame_type', 'object', 'obs_date', 'camera', 'telescope', 'filter',
+    'exposure', 'focal_length', 'ra', 'dec',
+]
+
+# Columns read for validation; the stored results come back as old_* so
+# unchanged results are not rewritten
+_VALIDATION_COLUMNS = ['id', 'folder', 'file'] + _SCORED_COLUMNS + [
+    'file_not_found', 'validation_score', 'migration_ready', 'validation_notes',
+    'validation_fingerprint',
+]
+_VALIDATION_SCHEMA = {
+    'id': pl.Int64, 'folder': pl.Utf8, 'file': pl.Utf8, 'frame_type': pl.Utf8,
+    'object': pl.Utf8, 'obs_date': pl.Utf8, 'camera': pl.Utf8,
+    'telescope': pl.Utf8, 'filter': pl.Utf8, 'exposure': pl.Float64,
+    'focal_length': pl.Float64, 'ra': pl.Utf8, 'dec': pl.Utf8,
+    'file_not_found': pl.Boolean, 'old_score': pl.Float64,
+    'old_ready': pl.Boolean, 'old_notes': pl.Utf8, 'old_fingerprint': pl.Utf8,
+}
+
 
 @dataclass
 class ValidationResult:
@@ -353,20 +398,235 @@ class FitsValidator:
                 breakdown={'frame_type': 0.0}
             )
     
+    def _equipment_exprs(self, column: str, equipment_set: set,
+                         full_points: float) -> Tuple[pl.Expr, pl.Expr]:
+        """Vectorized _score_equipment: (score, note) expressions for one column."""
+        col = pl.col(column)
+        missing = (col.is_null() | (col == "")
+                   | col.str.to_uppercase().is_in(_MISSING_EQUIPMENT)).fill_null(True)
+        standard = col.is_in(list(equipment_set)).fill_null(False)
+
+        score = (pl.when(missing).then(0.0)
+                 .when(standard).then(full_points)
+                 .otherwise(full_points * 0.25))
+        note = (pl.when(missing).then(pl.lit("missing/unknown"))
+                .when(standard).then(pl.lit("standard"))
+                .otherwise(pl.lit("non-standard")))
+        return score, note
+
+    def _filter_exprs(self, full_points: float) -> Tuple[pl.Expr, pl.Expr]:
+        """Vectorized _score_filter: (score, note) expressions for the filter column."""
+        col = pl.col('filter')
+        missing = (col.is_null() | (col == "")).fill_null(True)
+        no_filter = col.str.to_uppercase().is_in(_NO_FILTER).fill_null(False)
+        standard = col.is_in(list(self._filter_mappings)).fill_null(False)
+
+        # Unknown cameras default to OSC, as in _score_filter
+        mono_cameras = [name for name, is_osc in self._camera_types.items() if not is_osc]
+        is_osc = ~pl.col('camera').is_in(mono_cameras).fill_null(False)
+
+        score = (pl.when(missing).then(0.0)
+                 .when(is_osc & (standard | no_filter)).then(full_points)
+                 .when(is_osc).then(full_points * 0.25)
+                 .when(no_filter).then(2.5)
+                 .when(standard).then(full_points)
+                 .otherwise(full_points * 0.25))
+        note = (pl.when(missing).then(pl.lit("NULL filter"))
+                .when(is_osc & (standard | no_filter)).then(pl.lit("OSC + valid filter"))
+                .when(is_osc).then(pl.lit("OSC + non-standard filter"))
+                .when(no_filter).then(pl.lit("mono + no filter (unusual)"))
+                .when(standard).then(pl.lit("mono + standard filter"))
+                .otherwise(pl.lit("mono + non-standard filter")))
+        return score, note
+
+    def _frame_rules(self) -> Dict[str, List[Tuple[pl.Expr, pl.Expr]]]:
+        """
+        Vectorized form of the per-frame-type rules in _validate_*_frame.
+
+        Returns a list of (score, note) expressions per frame type, in the
+        order the notes are reported.
+        """
+        def present(column: str) -> pl.Expr:
+            col = pl.col(column)
+            return (col.is_not_null() & (col != "")).fill_null(False)
+
+        def check(condition: pl.Expr, points: float, ok: str, bad: str) -> Tuple[pl.Expr, pl.Expr]:
+            return (pl.when(condition).then(points).otherwise(0.0),
+                    pl.when(condition).then(pl.lit(ok)).otherwise(pl.lit(bad)))
+
+        def labelled(label: str, exprs: Tuple[pl.Expr, pl.Expr]) -> Tuple[pl.Expr, pl.Expr]:
+            score, note = exprs
+            return score, pl.concat_str([pl.lit(f"{label}: "), note])
+
+        def obs_date(points: float) -> Tuple[pl.Expr, pl.Expr]:
+            return check(present('obs_date'), points,
+                         "Observation date present", "Missing observation date")
+
+        def camera(points: float) -> Tuple[pl.Expr, pl.Expr]:
+            return labelled("Camera", self._equipment_exprs('camera', self._cameras, points))
+
+        def telescope(points: float) -> Tuple[pl.Expr, pl.Expr]:
+            return labelled("Telescope", self._equipment_exprs('telescope', self._telescopes, points))
+
+        def filter_(points: float) -> Tuple[pl.Expr, pl.Expr]:
+            return labelled("Filter", self._filter_exprs(points))
+
+        def exposure(points: float) -> Tuple[pl.Expr, pl.Expr]:
+            return check((pl.col('exposure').fill_nan(None) > 0).fill_null(False), points,
+                         "Valid exposure time", "Missing/invalid exposure")
+
+        valid_object = (present('object')
+                        & ~pl.col('object').str.to_uppercase().is_in(_INVALID_OBJECTS)).fill_null(False)
+
+        return {
+            'LIGHT': [
+                check(valid_object, 20.0, "Valid object name", "Missing/invalid object name"),
+                obs_date(20.0),
+                camera(15.0),
+                telescope(15.0),
+                filter_(10.0),
+                exposure(10.0),
+                check((pl.col('focal_length') != 0).fill_null(False), 5.0,
+                      "Focal length present", "Missing focal length"),
+                check(present('ra') & present('dec'), 5.0,
+                      "Coordinates present", "Missing coordinates"),
+            ],
+            'FLAT': [
+                obs_date(25.0),
+                camera(20.0),
+                telescope(20.0),
+                filter_(25.0),
+                exposure(10.0),
+            ],
+            'DARK': [
+                obs_date(30.0),
+                camera(50.0),
+                # Zero-second darks are valid (bias-like darks)
+                check((pl.col('exposure').fill_nan(None) >= 0).fill_null(False), 20.0,
+                      "Valid exposure time", "Missing/invalid exposure"),
+            ],
+            'BIAS': [
+                obs_date(50.0),
+                camera(50.0),
+            ],
+        }
+
+    def score_frame(self, df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Score a frame of records with vectorized expressions.
+
+        The frame needs the columns read by validate_record. Adds
+        validation_score, validation_ready and validation_notes columns with
+        the same values validate_record would give each row. Rows without a
+        frame_type get null results.
+        """
+        self._load_equipment_data()
+
+        frame_type = pl.col('frame_type').str.to_uppercase()
+        score = pl.when(frame_type.is_null()).then(None)
+        notes = pl.when(frame_type.is_null()).then(None)
+
+        for name, rules in self._frame_rules().items():
+            score = score.when(frame_type == name).then(pl.sum_horizontal([s for s, _ in rules]))
+            notes = notes.when(frame_type == name).then(
+                pl.concat_str([n for _, n in rules], separator="; "))
+
+        score = score.otherwise(0.0).cast(pl.Float64)
+        notes = notes.otherwise(pl.concat_str([pl.lit("Unknown frame type: "), frame_type]))
+
+        return df.with_columns(
+            validation_score=score,
+            validation_notes=notes,
+        ).with_columns(
+            validation_ready=pl.col('validation_score') >= self.AUTO_MIGRATE_THRESHOLD
+        )
+
+    def _check_paths_exist(self, folders: List[str], files: List[str]) -> List[bool]:
+        """Check file existence for many paths concurrently (stat calls block on NAS)."""
+        paths = [os.path.join(folder, file) for folder, file in zip(folders, files)]
+        with ThreadPoolExecutor(max_workers=FILE_CHECK_WORKERS) as pool:
+            return list(pool.map(os.path.exists, paths))
+
+    def _rules_signature(self) -> str:
+        """Scoring rule inputs that are not per-row: rule version and thresholds."""
+        return f"v{VALIDATION_RULES_VERSION}:{self.AUTO_MIGRATE_THRESHOLD}:{self.REVIEW_THRESHOLD}"
+
+    def equipment_fingerprint(self) -> str:
+        """
+        Fingerprint of the equipment and filter tables as seen by the scorer.
+
+        Stored after each complete run; when it differs on the next run every
+        row's fingerprint is rechecked, since an edit may affect any frame.
+        """
+        self._load_equipment_data()
+        state = json.dumps([
+            self._rules_signature(),
+            sorted(self._cameras),
+            sorted((name, bool(is_osc)) for name, is_osc in self._camera_types.items()),
+            sorted(self._telescopes),
+            sorted(self._filter_mappings),
+        ])
+        return hashlib.md5(state.encode()).hexdigest()
+
+    def fingerprint_frame(self, df: pl.DataFrame) -> pl.Series:
+        """
+        Per-row fingerprint of everything that row's score depends on.
+
+        Covers the scored columns plus the equipment facts looked up for the
+        row (known camera and its type, known telescope, known filter), so an
+        equipment edit only changes the fingerprints of the frames it affects.
+        """
+        self._load_equipment_data()
+
+        mono_cameras = [name for name, is_osc in self._camera_types.items() if not is_osc]
+        facts = [
+            pl.col('camera').is_in(list(self._cameras)),
+            pl.col('camera').is_in(mono_cameras),
+            pl.col('telescope').is_in(list(self._telescopes)),
+            pl.col('filter').is_in(list(self._filter_mappings)),
+        ]
+        parts = [pl.col(column).cast(pl.Utf8) for column in _SCORED_COLUMNS]
+        parts += [fact.cast(pl.Utf8) for fact in facts]
+        keys = df.select(
+            pl.concat_str([pl.lit(self._rules_signature())]
+                          + [part.fill_null('\x00') for part in parts],
+                          separator='\x1f')
+        ).to_series()
+
+        return pl.Series(
+            'validation_fingerprint',
+            [hashlib.md5(key.encode()).hexdigest()[:16] for key in keys],
+            dtype=pl.Utf8,
+        )
+
     def validate_all_files(self, limit: Optional[int] = None, 
                           check_files: bool = True,
-                          progress_callback=None) -> Dict[str, int]:
+                          progress_callback=None,
+                          full: bool = False) -> Dict[str, int]:
         """
-        Validate all FITS files in the database.
+        Validate FITS files in the database.
+
+        Validation is incremental: each row stores a fingerprint of its scored
+        fields and the equipment facts they were scored against, and only rows
+        whose fingerprint changed are re-scored. When the equipment tables are
+        unchanged since the last complete run, only rows that are new or were
+        updated since then are read at all.
+
+        Candidate rows are read in chunks of VALIDATION_CHUNK_SIZE, with only
+        the columns scoring needs, and scored as a Polars frame. Results are
+        written back with one bulk update and commit per chunk. With
+        check_files, the rows that were not re-scored are then checked for
+        existence in a second pass.
         
         Args:
             limit: Maximum number of files to validate
-            check_files: If True, also check if physical files exist
+            check_files: If True, also check if the validated files exist
             progress_callback: Optional callback for progress updates
+            full: If True, re-score every row regardless of fingerprints
         """
         import uuid
         run_id = str(uuid.uuid4())[:8]
-        logger.info(f"VALIDATION START - Run ID: {run_id}, Check files: {check_files}")
+        logger.info(f"VALIDATION START - Run ID: {run_id}, Check files: {check_files}, Full: {full}")
 
         self._load_equipment_data()
         
@@ -378,77 +638,93 @@ class FitsValidator:
             'manual_only': 0,
             'missing_files': 0,
             'updated': 0,
-            'errors': 0
+            'errors': 0,
+            'skipped': 0
         }
         
+        table = FitsFile.__table__
+        update_stmt = (
+            update(table)
+            .where(table.c.id == bindparam('b_id'))
+            .values(
+                validation_score=bindparam('b_score'),
+                migration_ready=bindparam('b_ready'),
+                validation_notes=bindparam('b_notes'),
+                file_not_found=bindparam('b_not_found'),
+                validation_fingerprint=bindparam('b_fingerprint'),
+                # Validation results are not metadata changes; keeping
+                # updated_at lets the next run skip these rows
+                updated_at=table.c.updated_at,
+            )
+        )
+        columns = [getattr(FitsFile, name) for name in _VALIDATION_COLUMNS]
+
+        # Rows untouched since the last complete run scored against the same
+        # equipment already have current results
+        run_started = datetime.utcnow()
+        equipment_fingerprint = self.equipment_fingerprint()
+        settings = self.db_service.get_all_settings()
+        last_run = settings.get(VALIDATION_LAST_RUN_SETTING)
+        if (not full and last_run
+                and settings.get(VALIDATION_EQUIPMENT_SETTING) == equipment_fingerprint):
+            since = datetime.fromisoformat(last_run)
+            candidates = or_(FitsFile.validation_fingerprint.is_(None),
+                             FitsFile.updated_at > since)
+            unchanged = and_(FitsFile.validation_fingerprint.isnot(None),
+                             or_(FitsFile.updated_at.is_(None), FitsFile.updated_at <= since))
+        else:
+            candidates = true()
+            unchanged = None
+
         try:
-            query = session.query(FitsFile)
-            if limit:
-                query = query.limit(limit)
-            
-            records = query.all()
-            stats['total'] = len(records)
-            
-            logger.info(f"Validating {len(records)} FITS files...")
+            table_rows = session.query(func.count(FitsFile.id)).scalar() or 0
+            available = session.query(func.count(FitsFile.id)).filter(candidates).scalar() or 0
+            total = min(available, limit) if limit else available
+            to_check = 0
+            if check_files and unchanged is not None:
+                to_check = session.query(func.count(FitsFile.id)).filter(unchanged).scalar() or 0
             
-            with tqdm(total=len(records), desc="Validating files") as pbar:
-                for i, db_record in enumerate(records):
-                    try:
-                        # Check if file exists on disk
-                        file_exists = True
-                        if check_files:
-                            file_exists = self._check_file_exists(db_record)
-                            if not file_exists:
-                                stats['missing_files'] += 1
-                                db_record.file_not_found = True
-                                logger.warning(f"File not found: {db_record.folder}/{db_record.file}")
-                        
-                        # Convert database record to dict
-                        record_dict = {
-                            'object': db_record.object,
-                            'obs_date': db_record.obs_date,
-                            'camera': db_record.camera,
-                            'telescope': db_record.telescope,
-                            'filter': db_record.filter,
-                            'exposure': db_record.exposure,
-                            'frame_type': db_record.frame_type,
-                            'focal_length': db_record.focal_length,
-                            'ra': db_record.ra,
-                            'dec': db_record.dec
-                        }
-                        
-                        # Validate metadata
-                        result = self.validate_record(record_dict)
-                        result.file_exists = file_exists
-                        
-                        # Update database record
-                        db_record.validation_score = result.score
-                        db_record.migration_ready = result.migration_ready and file_exists
-                        db_record.validation_notes = "; ".join(result.notes) if result.notes else None
-                        
-                        # Update stats
-                        if result.score >= self.AUTO_MIGRATE_THRESHOLD and file_exists:
-                            stats['auto_migrate'] += 1
-                        elif result.score >= self.REVIEW_THRESHOLD:
-                            stats['needs_review'] += 1
-                        else:
-                            stats['manual_only'] += 1
-                        
-                        stats['updated'] += 1
-                        
-                        # Progress callback
-                        if progress_callback and i % 100 == 0:
-                            progress = int((i + 1) / len(records) * 100)
-                            progress_callback(progress, stats)
-                        
-                    except Exception as e:
-                        logger.error(f"Error validating file {db_record.file}: {e}")
-                        stats['errors'] += 1
-                    
-                    pbar.update(1)
+            logger.info(f"Checking {total} of {table_rows} FITS files for changes...")
             
-            # Commit all changes
-            session.commit()
+            last_id = 0
+            with tqdm(total=total, desc="Validating files") as pbar:
+                while pbar.n < total:
+                    chunk_size = min(VALIDATION_CHUNK_SIZE, total - pbar.n)
+                    rows = session.execute(
+                        select(*columns)
+                        .where(FitsFile.id > last_id, candidates)
+                        .order_by(FitsFile.id)
+                        .limit(chunk_size)
+                    ).all()
+                    if not rows:
+                        break
+                    last_id = rows[-1][0]
+                    pbar.update(len(rows))
+
+                    df = pl.DataFrame(rows, schema=_VALIDATION_SCHEMA, orient='row')
+                    df = df.with_columns(self.fingerprint_frame(df))
+                    if not full:
+                        df = df.filter(pl.col('validation_fingerprint').ne_missing(pl.col('old_fingerprint')))
+
+                    if df.height:
+                        self._validate_chunk(session, df, update_stmt, check_files, stats)
+
+                    if progress_callback:
+                        progress = int(pbar.n / (total + to_check) * 100)
+                        progress_callback(progress, stats)
+
+            # Rows that were not re-scored can still have lost their file
+            if to_check:
+                self._check_unchanged_files(session, unchanged, to_check, total,
+                                            progress_callback, stats)
+
+            stats['skipped'] = table_rows - stats['total']
+
+            # A limited run may have left candidates behind, so only a
+            # complete run moves the incremental baseline forward
+            if pbar.n >= available:
+                self.db_service.set_setting(VALIDATION_LAST_RUN_SETTING, run_started.isoformat())
+                self.db_service.set_setting(VALIDATION_EQUIPMENT_SETTING, equipment_fingerprint)
             
             logger.info(f"VALIDATION COMPLETE - Run ID: {run_id}")
             logger.info(f"Stats: {stats}")
@@ -461,6 +737,106 @@ class FitsValidator:
             session.close()
         
         return stats
+
+    def _check_unchanged_files(self, session: Session, unchanged, to_check: int,
+                               done_before: int, progress_callback, stats: Dict[str, int]):
+        """Flag rows skipped by scoring whose files are missing from disk."""
+        table = FitsFile.__table__
+        missing_stmt = (
+            update(table)
+            .where(table.c.id == bindparam('b_id'))
+            .values(file_not_found=True, migration_ready=False,
+                    updated_at=table.c.updated_at)
+        )
+
+        last_id = 0
+        with tqdm(total=to_check, desc="Checking files") as pbar:
+            while True:
+                rows = session.execute(
+                    select(FitsFile.id, FitsFile.folder, FitsFile.file, FitsFile.file_not_found)
+                    .where(FitsFile.id > last_id, unchanged)
+                    .order_by(FitsFile.id)
+                    .limit(VALIDATION_CHUNK_SIZE)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                pbar.update(len(rows))
+
+                exists = self._check_paths_exist([row[1] for row in rows], [row[2] for row in rows])
+                missing = [row for row, found in zip(rows, exists) if not found]
+                for _, folder, file, _ in missing:
+                    logger.warning(f"File not found: {folder}/{file}")
+                stats['missing_files'] += len(missing)
+
+                newly_missing = [{'b_id': file_id} for file_id, _, _, not_found in missing if not not_found]
+                if newly_missing:
+                    session.execute(missing_stmt, newly_missing)
+                    session.commit()
+
+                if progress_callback:
+                    progress = int((done_before + min(pbar.n, to_check)) / (done_before + to_check) * 100)
+                    progress_callback(progress, stats)
+
+    def _validate_chunk(self, session: Session, df: pl.DataFrame, update_stmt,
+                        check_files: bool, stats: Dict[str, int]):
+        """Score one chunk of candidate rows, update stats and write back changes."""
+        # Check if files exist on disk
+        if check_files:
+            exists = self._check_paths_exist(df['folder'].to_list(), df['file'].to_list())
+            df = df.with_columns(file_exists=pl.Series(exists, dtype=pl.Boolean))
+            for folder, file in df.filter(~pl.col('file_exists')).select('folder', 'file').iter_rows():
+                logger.warning(f"File not found: {folder}/{file}")
+        else:
+            df = df.with_columns(file_exists=pl.lit(True))
+
+        df = self.score_frame(df).with_columns(
+            new_not_found=pl.col('file_not_found').fill_null(False) | ~pl.col('file_exists'),
+            new_ready=pl.col('validation_ready') & pl.col('file_exists'),
+        )
+
+        scored = df.filter(pl.col('validation_score').is_not_null())
+        auto = (pl.col('validation_score') >= self.AUTO_MIGRATE_THRESHOLD) & pl.col('file_exists')
+        review = ~auto & (pl.col('validation_score') >= self.REVIEW_THRESHOLD)
+        counts = scored.select(
+            auto=auto.sum(),
+            review=review.sum(),
+        ).row(0)
+        stats['total'] += df.height
+        stats['missing_files'] += int((~df['file_exists']).sum())
+        for (file,) in df.filter(pl.col('validation_score').is_null()).select('file').iter_rows():
+            logger.error(f"Error validating file {file}: missing frame type")
+            stats['errors'] += 1
+        stats['auto_migrate'] += counts[0]
+        stats['needs_review'] += counts[1]
+        stats['manual_only'] += scored.height - counts[0] - counts[1]
+        stats['updated'] += scored.height
+
+        # Unscorable rows (no frame type) keep their previous results
+        df = df.with_columns(
+            new_score=pl.coalesce('validation_score', 'old_score'),
+            new_ready=pl.when(pl.col('validation_score').is_null())
+                        .then(pl.col('old_ready')).otherwise(pl.col('new_ready')),
+            new_notes=pl.when(pl.col('validation_score').is_null())
+                        .then(pl.col('old_notes')).otherwise(pl.col('validation_notes')),
+        )
+        changed = df.filter(
+            pl.col('new_score').ne_missing(pl.col('old_score'))
+            | pl.col('new_ready').ne_missing(pl.col('old_ready'))
+            | pl.col('new_notes').ne_missing(pl.col('old_notes'))
+            | pl.col('new_not_found').ne_missing(pl.col('file_not_found'))
+            | pl.col('validation_fingerprint').ne_missing(pl.col('old_fingerprint'))
+        )
+        if changed.height:
+            session.execute(update_stmt, [
+                {'b_id': file_id, 'b_score': score, 'b_ready': ready, 'b_notes': notes,
+                 'b_not_found': not_found, 'b_fingerprint': fingerprint}
+                for file_id, score, ready, notes, not_found, fingerprint in changed.select(
+                    'id', 'new_score', 'new_ready', 'new_notes', 'new_not_found',
+                    'validation_fingerprint'
+                ).iter_rows()
+            ])
+            session.commit()
     
     def remove_missing_files(self, dry_run: bool = True) -> Dict[str, int]:
         """
@@ -2,12 +2,14 @@
 FastAPI application initialization for FITS Cataloger.
 """
 
+import asyncio
 import logging
 import os
 import subprocess
 import sys
 from pathlib import Path
 
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -36,6 +38,16 @@ def get_service_ports():
         's3_backup': int(os.environ.get('ASTROCAT_S3_BACKUP_PORT', '8083')),
     }
 
+
+def get_worker_thread_count():
+    """Get the number of threads that run sync (database) routes.
+
+    Uses ASTROCAT_WEB_THREADS env var if set, otherwise 16. The database
+    connection pool is sized to match so a request never waits for a
+    connection while holding a thread.
+    """
+    return max(1, int(os.environ.get('ASTROCAT_WEB_THREADS', '16')))
+
 from version import __version__
 from config import load_config
 from models import DatabaseManager, DatabaseService
@@ -58,6 +70,7 @@ processing_manager = None
 sqlite_web_process = None
 webdav_server = None
 s3_backup_process = None
+file_stats_reconcile_task = None
 
 app = FastAPI(
     title="FITS Cataloger",
@@ -149,6 +162,7 @@ def restart_s3_backup_web():
 async def startup_event():
     """Initialize application on startup with enhanced error checking."""
     global config, db_manager, db_service, cameras, telescopes, filter_mappings, processing_manager, webdav_server
+    global file_stats_reconcile_task
     
     try:
         logger.info("=" * 60)
@@ -168,9 +182,15 @@ async def startup_event():
         logger.info(f"  - Telescopes: {len(telescopes)}")
         logger.info(f"  - Filter mappings: {len(filter_mappings)}")
         
+        # Routes that query the database are plain `def`, which FastAPI runs
+        # on AnyIO's threadpool instead of the event loop
+        worker_threads = get_worker_thread_count()
+        anyio.to_thread.current_default_thread_limiter().total_tokens = worker_threads
+        logger.info(f"✓ Route threadpool: {worker_threads} threads")
+        
         # Initialize database
         logger.info("Initializing database connection...")
-        db_manager = DatabaseManager(config.database.connection_string)
+        db_manager = DatabaseManager(config.database.connection_string, pool_size=worker_threads)
         db_manager.create_tables()
         logger.info(f"✓ Database connected: {config.database.connection_string}")
         
@@ -239,6 +259,10 @@ async def startup_event():
         # Auto-start monitoring if enabled
         from web.routes import monitoring
         await monitoring.auto_start_monitoring()
+
+        # Keep stored file sizes in step with disk in the background
+        from web.routes import operations
+        file_stats_reconcile_task = asyncio.create_task(operations.file_stats_reconcile_loop())
         
     except Exception as e:
         logger.error(f"Failed to initialize application: {e}", exc_info=True)
@@ -252,6 +276,10 @@ async def shutdown_event():
     
     logger.info("Shutting down web interface...")
     
+    # Stop the background file stat reconcile loop
+    if file_stats_reconcile_task:
+        file_stats_reconcile_task.cancel()
+    
     # Stop sqlite_web
     if sqlite_web_process:
         try:
@@ -270,6 +298,13 @@ async def shutdown_event():
         except Exception as e:
             logger.warning(f"Error stopping S3 backup interface: {e}")
     
+    # Stop the warm FITS worker pool used by quarantine scans
+    try:
+        from processing import shutdown_worker_pool
+        shutdown_worker_pool()
+    except Exception as e:
+        logger.warning(f"Error stopping FITS worker pool: {e}")
+
     if db_manager:
         db_manager.close()
         logger.info("✓ Database connection closed")
@@ -2,7 +2,8 @@
 Dashboard statistics cache manager.
 
 This module manages a persistent cache of expensive-to-calculate statistics
-(particularly disk space usage). The cache is updated when catalog operations
+(disk space usage, and cleanup counts that need a directory scan or a
+full-table duplicate check). The cache is updated when catalog operations
 run, not on every API request.
 
 Approach similar to S3 Backup's storage_categories_cache.json
@@ -21,9 +22,12 @@ CACHE_FILE = Path("dashboard_stats_cache.json")
 # In-memory cache
 _cache = {
     "disk_space": None,
+    "cleanup": None,
     "last_updated": None
 }
 
+FITS_EXTENSIONS = ['.fits', '.fit', '.fts']
+
 
 def load_cache() -> None:
     """Load cache from disk on startup."""
@@ -33,6 +37,7 @@ def load_cache() -> None:
             with open(CACHE_FILE, 'r') as f:
                 data = json.load(f)
                 _cache["disk_space"] = data.get("disk_space")
+                _cache["cleanup"] = data.get("cleanup")
                 if data.get("last_updated"):
                     _cache["last_updated"] = datetime.fromisoformat(data["last_updated"])
                 logger.info(f"Loaded dashboard cache from {CACHE_FILE}")
@@ -45,6 +50,7 @@ def save_cache() -> None:
     try:
         cache_data = {
             "disk_space": _cache["disk_space"],
+            "cleanup": _cache["cleanup"],
             "last_updated": _cache["last_updated"].isoformat() if _cache["last_updated"] else None
         }
         with open(CACHE_FILE, 'w') as f:
@@ -59,6 +65,11 @@ def get_cached_disk_space() -> Optional[dict]:
     return _cache.get("disk_space")
 
 
+def get_cached_cleanup() -> Optional[dict]:
+    """Get cached cleanup counts (quarantine files, duplicates, bad files)."""
+    return _cache.get("cleanup")
+
+
 def get_cache_age() -> Optional[float]:
     """Get age of cache in seconds, or None if no cache."""
     if _cache["last_updated"]:
@@ -72,28 +83,26 @@ def calculate_and_cache_disk_space(db_session, config) -> dict:
 
     This should be called after catalog operations that add/remove files.
     """
-    from models import FitsFile
+    from sqlalchemy import func
+    from models import FitsFileStats
 
     logger.info("Calculating disk space statistics for cache...")
 
-    # Calculate cataloged file sizes by frame type
+    # Sum cataloged file sizes by frame type from the stats table (built from
+    # the stored stat columns, so no disk access here)
+    frame_types = ['LIGHT', 'DARK', 'FLAT', 'BIAS']
+    sizes = dict(db_session.query(
+        FitsFileStats.frame_type,
+        func.sum(FitsFileStats.total_size)
+    ).filter(
+        FitsFileStats.frame_type.in_(frame_types)
+    ).group_by(FitsFileStats.frame_type).all())
+
     cataloged_size = 0
     by_frame_type = {}
 
-    for frame_type in ['LIGHT', 'DARK', 'FLAT', 'BIAS']:
-        files = db_session.query(FitsFile.folder, FitsFile.file).filter(
-            FitsFile.frame_type == frame_type
-        ).all()
-
-        frame_size = 0
-        for folder, filename in files:
-            try:
-                file_path = Path(folder) / filename
-                if file_path.exists():
-                    frame_size += file_path.stat().st_size
-            except Exception as e:
-                logger.debug(f"Could not get size for {folder}/{filename}: {e}")
-
+    for frame_type in frame_types:
+        frame_size = sizes.get(frame_type) or 0
         cataloged_size += frame_size
         by_frame_type[frame_type] = {
             "bytes": frame_size,
@@ -209,10 +218,89 @@ def calculate_and_cache_disk_space(db_session, config) -> dict:
     return disk_space_data
 
 
+def count_physical_files_in_folder(folder_path: Path, extensions: list = None) -> int:
+    """
+    Count physical FITS files in a folder.
+
+    Args:
+        folder_path: Path to folder to scan
+        extensions: List of file extensions to count (default: ['.fits', '.fit', '.fts'])
+
+    Returns:
+        Number of files found
+    """
+    if extensions is None:
+        extensions = FITS_EXTENSIONS
+
+    if not folder_path.exists():
+        return 0
+
+    count = 0
+    try:
+        for ext in extensions:
+            # Use glob to find files with this extension (case-insensitive)
+            count += len(list(folder_path.glob(f"*{ext}")))
+            count += len(list(folder_path.glob(f"*{ext.upper()}")))
+    except Exception as e:
+        logger.error(f"Error counting files in {folder_path}: {e}")
+        return 0
+
+    return count
+
+
+def calculate_and_cache_cleanup(db_session, config) -> dict:
+    """
+    Count quarantine, duplicate and bad files on disk plus database
+    duplicates (same MD5), and update cache.
+
+    This should be called after catalog operations that add/remove files.
+    """
+    from sqlalchemy import func
+    from models import FitsFile
+
+    quarantine_path = Path(config.paths.quarantine_dir)
+
+    # Count files in main quarantine (excluding Duplicates and Bad subfolders)
+    quarantine_files = 0
+    if quarantine_path.exists():
+        for ext in FITS_EXTENSIONS:
+            # Get all files with this extension in quarantine
+            all_files = list(quarantine_path.glob(f"*{ext}"))
+            all_files.extend(list(quarantine_path.glob(f"*{ext.upper()}")))
+
+            # Filter out files in Duplicates or Bad subfolders
+            quarantine_files += len([
+                f for f in all_files
+                if 'Duplicates' not in str(f) and 'Bad' not in str(f)
+            ])
+
+    # Database duplicate detection (files with same MD5)
+    db_duplicates = db_session.query(FitsFile).filter(
+        FitsFile.md5sum.in_(
+            db_session.query(FitsFile.md5sum)
+            .group_by(FitsFile.md5sum)
+            .having(func.count(FitsFile.id) > 1)
+        )
+    ).count()
+
+    cleanup_data = {
+        "quarantine_files": quarantine_files,
+        "duplicates": count_physical_files_in_folder(quarantine_path / "Duplicates"),
+        "bad_files": count_physical_files_in_folder(quarantine_path / "Bad"),
+        "db_duplicates": db_duplicates
+    }
+
+    _cache["cleanup"] = cleanup_data
+    save_cache()
+
+    return cleanup_data
+
+
 def invalidate_cache() -> None:
     """Mark cache as needing refresh (without recalculating now)."""
     global _cache
     _cache["disk_space"] = None
+    _cache["cleanup"] = None
     _cache["last_updated"] = None
     save_cache()
     logger.info("Dashboard cache invalidated")
@@ -6,7 +6,11 @@ import sys
 
 
 def get_db_session():
-    """Dependency to get database session."""
+    """Dependency to get database session.
+
+    Queries block, so routes using it must be plain `def` (run on the
+    threadpool), never `async def` (run on the event loop).
+    """
     # Access module via sys.modules to avoid import confusion
     app_module = sys.modules['web.app']
     db_manager = app_module.db_manager
@@ -28,7 +28,7 @@ async def dashboard():
 
 
 @router.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint."""
     try:
         # Get module globals using sys.modules
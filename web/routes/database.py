@@ -59,7 +59,7 @@ def is_safe_query(query: str) -> bool:
 
 
 @router.post("/query", response_model=QueryResponse)
-async def execute_query(
+def execute_query(
     request: QueryRequest,
     session=Depends(get_db_session)
 ):
@@ -128,7 +128,7 @@ async def execute_query(
 
 
 @router.get("/schema")
-async def get_schema(session=Depends(get_db_session)):
+def get_schema(session=Depends(get_db_session)):
     """Get database schema information."""
     try:
         # Get all tables
@@ -163,7 +163,7 @@ async def get_schema(session=Depends(get_db_session)):
 
 
 @router.get("/tables")
-async def get_tables(session=Depends(get_db_session)):
+def get_tables(session=Depends(get_db_session)):
     """Get list of all tables in the database."""
     try:
         result = session.execute(text("""
@@ -181,7 +181,7 @@ async def get_tables(session=Depends(get_db_session)):
 
 
 @router.get("/table/{table_name}/info")
-async def get_table_info(table_name: str, session=Depends(get_db_session)):
+def get_table_info(table_name: str, session=Depends(get_db_session)):
     """Get information about a specific table."""
     try:
         # Validate table name (prevent SQL injection)
@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 
 from models import Camera, Telescope, FilterMapping
 from web.dependencies import get_db_session
+from web.routes.operations import schedule_equipment_revalidation
 
 logger = logging.getLogger(__name__)
 
@@ -69,7 +70,7 @@ class AstroBinFilterMappingRequest(BaseModel):
 # ============================================================================
 
 @router.get("/all")
-async def get_all_equipment(db: Session = Depends(get_db_session)):
+def get_all_equipment(db: Session = Depends(get_db_session)):
     """Get all equipment data from database."""
     try:
         cameras = db.query(Camera).filter_by(active=True).all()
@@ -128,7 +129,7 @@ async def get_all_equipment(db: Session = Depends(get_db_session)):
 # ============================================================================
 
 @router.get("/cameras")
-async def get_cameras(db: Session = Depends(get_db_session)):
+def get_cameras(db: Session = Depends(get_db_session)):
     """Get all cameras from database."""
     cameras = db.query(Camera).filter_by(active=True).all()
     return [
@@ -148,7 +149,7 @@ async def get_cameras(db: Session = Depends(get_db_session)):
 
 
 @router.post("/cameras")
-async def add_camera(camera: CameraModel, db: Session = Depends(get_db_session)):
+def add_camera(camera: CameraModel, db: Session = Depends(get_db_session)):
     """Add a new camera to database."""
     # Check if camera already exists
     existing = db.query(Camera).filter_by(name=camera.camera).first()
@@ -167,12 +168,13 @@ async def add_camera(camera: CameraModel, db: Session = Depends(get_db_session))
     db.add(new_camera)
     db.commit()
     db.refresh(new_camera)
+    schedule_equipment_revalidation()
     
     return {"message": "Camera added successfully", "camera": camera.dict()}
 
 
 @router.put("/cameras")
-async def update_camera(camera: CameraModel, db: Session = Depends(get_db_session)):
+def update_camera(camera: CameraModel, db: Session = Depends(get_db_session)):
     """Update an existing camera."""
     existing = db.query(Camera).filter_by(name=camera.camera).first()
     if not existing:
@@ -189,7 +191,7 @@ async def update_camera(camera: CameraModel, db: Session = Depends(get_db_sessio
 
 
 @router.delete("/cameras/{camera_name}")
-async def delete_camera(camera_name: str, db: Session = Depends(get_db_session)):
+def delete_camera(camera_name: str, db: Session = Depends(get_db_session)):
     """Delete a camera (soft delete by setting active=False)."""
     camera = db.query(Camera).filter_by(name=camera_name).first()
     if not camera:
@@ -197,6 +199,7 @@ async def delete_camera(camera_name: str, db: Session = Depends(get_db_session))
     
     camera.active = False
     db.commit()
+    schedule_equipment_revalidation()
     
     return {"message": f"Camera '{camera_name}' deleted successfully"}
 
@@ -206,7 +209,7 @@ async def delete_camera(camera_name: str, db: Session = Depends(get_db_session))
 # ============================================================================
 
 @router.get("/telescopes")
-async def get_telescopes(db: Session = Depends(get_db_session)):
+def get_telescopes(db: Session = Depends(get_db_session)):
     """Get all telescopes from database."""
     telescopes = db.query(Telescope).filter_by(active=True).all()
     return [
@@ -224,7 +227,7 @@ async def get_telescopes(db: Session = Depends(get_db_session)):
 
 
 @router.post("/telescopes")
-async def add_telescope(telescope: TelescopeModel, db: Session = Depends(get_db_session)):
+def add_telescope(telescope: TelescopeModel, db: Session = Depends(get_db_session)):
     """Add a new telescope to database."""
     existing = db.query(Telescope).filter_by(name=telescope.scope).first()
     if existing:
@@ -242,12 +245,13 @@ async def add_telescope(telescope: TelescopeModel, db: Session = Depends(get_db_
     db.add(new_telescope)
     db.commit()
     db.refresh(new_telescope)
+    schedule_equipment_revalidation()
     
     return {"message": "Telescope added successfully", "telescope": telescope.dict()}
 
 
 @router.put("/telescopes")
-async def update_telescope(telescope: TelescopeModel, db: Session = Depends(get_db_session)):
+def update_telescope(telescope: TelescopeModel, db: Session = Depends(get_db_session)):
     """Update an existing telescope."""
     existing = db.query(Telescope).filter_by(name=telescope.scope).first()
     if not existing:
@@ -264,7 +268,7 @@ async def update_telescope(telescope: TelescopeModel, db: Session = Depends(get_
 
 
 @router.delete("/telescopes/{telescope_name}")
-async def delete_telescope(telescope_name: str, db: Session = Depends(get_db_session)):
+def delete_telescope(telescope_name: str, db: Session = Depends(get_db_session)):
     """Delete a telescope (soft delete)."""
     telescope = db.query(Telescope).filter_by(name=telescope_name).first()
     if not telescope:
@@ -272,6 +276,7 @@ async def delete_telescope(telescope_name: str, db: Session = Depends(get_db_ses
     
     telescope.active = False
     db.commit()
+    schedule_equipment_revalidation()
     
     return {"message": f"Telescope '{telescope_name}' deleted successfully"}
 
@@ -281,7 +286,7 @@ async def delete_telescope(telescope_name: str, db: Session = Depends(get_db_ses
 # ============================================================================
 
 @router.get("/filters")
-async def get_filters(db: Session = Depends(get_db_session)):
+def get_filters(db: Session = Depends(get_db_session)):
     """Get all filter mappings from database."""
     filters = db.query(FilterMapping).all()
     return [
@@ -294,7 +299,7 @@ async def get_filters(db: Session = Depends(get_db_session)):
 
 
 @router.post("/filters")
-async def add_filter(filter_mapping: FilterMappingModel, db: Session = Depends(get_db_session)):
+def add_filter(filter_mapping: FilterMappingModel, db: Session = Depends(get_db_session)):
     """Add a new filter mapping to database."""
     existing = db.query(FilterMapping).filter_by(raw_name=filter_mapping.raw_name).first()
     if existing:
@@ -311,12 +316,13 @@ async def add_filter(filter_mapping: FilterMappingModel, db: Session = Depends(g
     db.add(new_filter)
     db.commit()
     db.refresh(new_filter)
+    schedule_equipment_revalidation()
     
     return {"message": "Filter mapping added successfully", "filter": filter_mapping.dict()}
 
 
 @router.put("/filters")
-async def update_filter(filter_mapping: FilterMappingModel, db: Session = Depends(get_db_session)):
+def update_filter(filter_mapping: FilterMappingModel, db: Session = Depends(get_db_session)):
     """Update an existing filter mapping."""
     existing = db.query(FilterMapping).filter_by(raw_name=filter_mapping.raw_name).first()
     if not existing:
@@ -327,12 +333,13 @@ async def update_filter(filter_mapping: FilterMappingModel, db: Session = Depend
     
     existing.standard_name = filter_mapping.proper_name
     db.commit()
+    schedule_equipment_revalidation()
     
     return {"message": "Filter mapping updated successfully", "filter": filter_mapping.dict()}
 
 
 @router.delete("/filters/{raw_name}")
-async def delete_filter(raw_name: str, db: Session = Depends(get_db_session)):
+def delete_filter(raw_name: str, db: Session = Depends(get_db_session)):
     """Delete a filter mapping."""
     filter_mapping = db.query(FilterMapping).filter_by(raw_name=raw_name).first()
     if not filter_mapping:
@@ -340,6 +347,7 @@ async def delete_filter(raw_name: str, db: Session = Depends(get_db_session)):
 
     db.delete(filter_mapping)
     db.commit()
+    schedule_equipment_revalidation()
 
     return {"message": f"Filter mapping '{raw_name}' deleted successfully"}
 
@@ -349,7 +357,7 @@ async def delete_filter(raw_name: str, db: Session = Depends(get_db_session)):
 # ============================================================================
 
 @router.post("/astrobin/parse-csv")
-async def parse_astrobin_csv(request: AstroBinFilterCSVRequest):
+def parse_astrobin_csv(request: AstroBinFilterCSVRequest):
     """Parse AstroBin CSV data and extract unique filter IDs."""
     try:
         csv_reader = csv.DictReader(StringIO(request.csv_data))
@@ -375,7 +383,7 @@ async def parse_astrobin_csv(request: AstroBinFilterCSVRequest):
 
 
 @router.get("/astrobin/filters")
-async def get_astrobin_filters():
+def get_astrobin_filters():
     """Get current AstroBin filter mappings from astrobin_filters.json."""
     astrobin_file = Path("astrobin_filters.json")
 
@@ -395,7 +403,7 @@ async def get_astrobin_filters():
 
 
 @router.post("/astrobin/filters")
-async def save_astrobin_filters(request: AstroBinFilterMappingRequest):
+def save_astrobin_filters(request: AstroBinFilterMappingRequest):
     """Save AstroBin filter mappings to astrobin_filters.json."""
     astrobin_file = Path("astrobin_filters.json")
 
@@ -2,50 +2,254 @@
 File browsing and filtering routes.
 """
 
+import base64
+import json
 import logging
-from typing import Optional
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
+from sqlalchemy import and_, or_, desc, asc, func
 
-from models import FitsFile
-from web.dependencies import get_db_session
+from models import FitsFacetCount, FitsFile
+from web.dependencies import get_db_session, get_db_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api")
 
 
+def _split(values: Optional[str]) -> List[str]:
+    """Comma-separated query parameter as a list of non-empty values."""
+    return [v.strip() for v in values.split(',') if v.strip()] if values else []
+
+
+# Filter dropdowns: response key -> fits_facet_counts column
+FACETS = {
+    'frame_types': FitsFacetCount.frame_type,
+    'cameras': FitsFacetCount.camera,
+    'telescopes': FitsFacetCount.telescope,
+    'objects': FitsFacetCount.object,
+    'filters': FitsFacetCount.filter,
+    'dates': FitsFacetCount.obs_date,
+}
+
+
+def _facet_counts(session: Session, selected: Dict[str, List[str]],
+                  date_start: Optional[str] = None, date_end: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Values of every facet with their file counts, from fits_facet_counts.
+
+    Each facet is restricted by the selections in the other facets but not
+    by its own, so the other values of a multi-select stay available.
+    """
+    counts = {}
+    for name, column in FACETS.items():
+        query = session.query(column, func.sum(FitsFacetCount.file_count)).filter(column != '')
+        for other, values in selected.items():
+            if other != name and values:
+                query = query.filter(FACETS[other].in_(values))
+        if date_start:
+            query = query.filter(FitsFacetCount.obs_date >= date_start)
+        if date_end:
+            query = query.filter(FitsFacetCount.obs_date <= date_end)
+        counts[name] = dict(query.group_by(column).all())
+    return counts
+
+
 @router.get("/filter-options")
-async def get_filter_options(session: Session = Depends(get_db_session)):
-    """Get unique values for filter dropdowns."""
+def get_filter_options(
+    frame_types: Optional[str] = Query(None, description="Comma-separated frame types"),
+    cameras: Optional[str] = Query(None, description="Comma-separated cameras"),
+    telescopes: Optional[str] = Query(None, description="Comma-separated telescopes"),
+    objects: Optional[str] = Query(None, description="Comma-separated objects"),
+    filters: Optional[str] = Query(None, description="Comma-separated filters"),
+    date_start: Optional[str] = None,
+    date_end: Optional[str] = None,
+    session: Session = Depends(get_db_session)
+):
+    """
+    Get unique values for filter dropdowns, with file counts.
+
+    Passing the current selections narrows every other dropdown to the
+    values that still match (e.g. the filters used with a chosen camera).
+    """
     try:
-        # Get unique values for each filterable column
-        frame_types = [row[0] for row in session.query(FitsFile.frame_type).distinct().all() if row[0]]
-        cameras_db = [row[0] for row in session.query(FitsFile.camera).distinct().all() if row[0]]
-        telescopes_db = [row[0] for row in session.query(FitsFile.telescope).distinct().all() if row[0]]
-        objects = [row[0] for row in session.query(FitsFile.object).distinct().all() if row[0] and row[0] != 'CALIBRATION']
-        filters = [row[0] for row in session.query(FitsFile.filter).distinct().all() if row[0]]
-        dates = [row[0] for row in session.query(FitsFile.obs_date).distinct().all() if row[0]]
-        
-        return {
-            "frame_types": sorted(frame_types),
-            "cameras": sorted(cameras_db),
-            "telescopes": sorted(telescopes_db),
-            "objects": sorted(objects)[:100],  # Limit to prevent huge lists
-            "filters": sorted(filters),
-            "dates": sorted(dates, reverse=True)[:50]  # Recent dates first, limited
+        selected = {
+            'frame_types': _split(frame_types),
+            'cameras': _split(cameras),
+            'telescopes': _split(telescopes),
+            'objects': _split(objects),
+            'filters': _split(filters),
+        }
+        counts = _facet_counts(session, selected, date_start, date_end)
+        counts['objects'].pop('CALIBRATION', None)
+
+        # Selected values stay listed (with count 0 if nothing matches) so they can be cleared
+        for name, values in selected.items():
+            for value in values:
+                counts[name].setdefault(value, 0)
+
+        options = {
+            "frame_types": sorted(counts['frame_types']),
+            "cameras": sorted(counts['cameras']),
+            "telescopes": sorted(counts['telescopes']),
+            "objects": sorted(counts['objects'])[:100],  # Limit to prevent huge lists
+            "filters": sorted(counts['filters']),
+            "dates": sorted(counts['dates'], reverse=True)[:50]  # Recent dates first, limited
+        }
+        options["objects"] += [o for o in selected['objects'] if o not in options["objects"]]
+        options["counts"] = {
+            name: {value: counts[name][value] for value in values}
+            for name, values in options.items()
         }
+        return options
     except Exception as e:
         logger.error(f"Error fetching filter options: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Columns the file browser can sort by; each has an index leading with it,
+# so ORDER BY column, id and the keyset condition below use an index
+SORT_COLUMNS = {
+    'id': FitsFile.id,
+    'file': FitsFile.file,
+    'object': FitsFile.object,
+    'frame_type': FitsFile.frame_type,
+    'camera': FitsFile.camera,
+    'telescope': FitsFile.telescope,
+    'filter': FitsFile.filter,
+    'exposure': FitsFile.exposure,
+    'obs_date': FitsFile.obs_date,
+    'imaging_session_id': FitsFile.imaging_session_id,
+}
+
+# Totals for a filter combination are reused for this long, so paging
+# through a large result set counts it once
+COUNT_CACHE_TTL = 30
+COUNT_CACHE_SIZE = 256
+
+_count_cache: Dict[Tuple, Tuple[float, int]] = {}
+_count_cache_lock = threading.Lock()
+
+
+def _file_filter_key(frame_types, cameras, telescopes, objects, filters, filename,
+                     imaging_session_id, exposure_min, exposure_max, date_start, date_end) -> Tuple:
+    """Normalized filter combination, used as the count cache key."""
+    return (
+        tuple(sorted(_split(frame_types))),
+        tuple(sorted(_split(cameras))),
+        tuple(sorted(_split(telescopes))),
+        tuple(sorted(_split(objects))),
+        tuple(sorted(_split(filters))),
+        filename or None,
+        imaging_session_id or None,
+        exposure_min,
+        exposure_max,
+        date_start or None,
+        date_end or None,
+    )
+
+
+def _apply_file_filters(query, filter_key: Tuple, filename_index: bool):
+    """Apply a filter combination from _file_filter_key() to a FitsFile query."""
+    (frame_type_list, camera_list, telescope_list, object_list, filter_list, filename,
+     imaging_session_id, exposure_min, exposure_max, date_start, date_end) = filter_key
+
+    if frame_type_list:
+        query = query.filter(FitsFile.frame_type.in_(frame_type_list))
+    if camera_list:
+        query = query.filter(FitsFile.camera.in_(camera_list))
+    if telescope_list:
+        query = query.filter(FitsFile.telescope.in_(telescope_list))
+    if object_list:
+        query = query.filter(FitsFile.object.in_(object_list))
+    if filter_list:
+        query = query.filter(FitsFile.filter.in_(filter_list))
+    if filename:
+        query = query.filter(FitsFile.filename_contains(filename, indexed=filename_index))
+    if imaging_session_id:
+        query = query.filter(FitsFile.imaging_session_id == imaging_session_id)
+    if exposure_min is not None:
+        query = query.filter(FitsFile.exposure >= exposure_min)
+    if exposure_max is not None:
+        query = query.filter(FitsFile.exposure <= exposure_max)
+    if date_start:
+        query = query.filter(FitsFile.obs_date >= date_start)
+    if date_end:
+        query = query.filter(FitsFile.obs_date <= date_end)
+    return query
+
+
+def _cached_count(session: Session, filter_key: Tuple, filename_index: bool) -> int:
+    """Number of files matching filter_key, cached for COUNT_CACHE_TTL seconds."""
+    now = time.monotonic()
+    with _count_cache_lock:
+        cached = _count_cache.get(filter_key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    total = _apply_file_filters(session.query(func.count(FitsFile.id)), filter_key, filename_index).scalar() or 0
+
+    with _count_cache_lock:
+        if len(_count_cache) >= COUNT_CACHE_SIZE:
+            for key in [k for k, (expires, _) in _count_cache.items() if expires <= now]:
+                del _count_cache[key]
+            if len(_count_cache) >= COUNT_CACHE_SIZE:
+                _count_cache.clear()
+        _count_cache[filter_key] = (now + COUNT_CACHE_TTL, total)
+    return total
+
+
+def _encode_cursor(sort_by: str, sort_order: str, direction: str, value, file_id: int) -> str:
+    payload = json.dumps([sort_by, sort_order, direction, value, file_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> Tuple:
+    """(sort_by, sort_order, direction, value, id) from a cursor made by _encode_cursor()."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_by, sort_order, direction, value, file_id = json.loads(payload)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if direction not in ('next', 'prev') or not isinstance(file_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_by, sort_order, direction, value, file_id
+
+
+def _keyset_segments(sort_column, ascending: bool, value, file_id: int) -> List:
+    """
+    Conditions selecting the rows after (value, file_id) in ORDER BY sort_column, id.
+
+    SQLite sorts NULL before every value, so a page can run from the NULL
+    rows into the non-NULL ones (ascending) or the other way round. Each
+    segment is one index range; query them in order until the page is full.
+    An OR across both would make SQLite walk the index from its start.
+    """
+    after_id = FitsFile.id > file_id if ascending else FitsFile.id < file_id
+    if sort_column is FitsFile.id:
+        return [after_id]
+
+    if value is None:
+        nulls = and_(sort_column.is_(None), after_id)
+        return [nulls, sort_column.isnot(None)] if ascending else [nulls]
+
+    if ascending:
+        return [and_(sort_column >= value, or_(sort_column > value, after_id))]
+    segments = [and_(sort_column <= value, or_(sort_column < value, after_id))]
+    if sort_column.nullable:
+        segments.append(sort_column.is_(None))
+    return segments
+
+
 @router.get("/files")
-async def get_files(
+def get_files(
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor/prev_cursor of a previous page"),
     frame_types: Optional[str] = Query(None, description="Comma-separated frame types"),
     cameras: Optional[str] = Query(None, description="Comma-separated cameras"),
     telescopes: Optional[str] = Query(None, description="Comma-separated telescopes"),
@@ -59,70 +263,66 @@ async def get_files(
     date_end: Optional[str] = None,
     sort_by: str = Query("obs_date"),
     sort_order: str = Query("desc"),
-    session: Session = Depends(get_db_session)
+    session: Session = Depends(get_db_session),
+    db_service = Depends(get_db_service)
 ):
-    """Get paginated list of FITS files with filtering and sorting."""
+    """
+    Get paginated list of FITS files with filtering and sorting.
+
+    Pass a page's next_cursor/prev_cursor to move one page forward/back by
+    keyset (no OFFSET scan); page alone still jumps to a page by offset.
+    """
     try:
-        # Base query
-        query = session.query(FitsFile)
-        
-        # Apply filters
-        if frame_types:
-            frame_type_list = [ft.strip() for ft in frame_types.split(',') if ft.strip()]
-            if frame_type_list:
-                query = query.filter(FitsFile.frame_type.in_(frame_type_list))
-        
-        if cameras:
-            camera_list = [c.strip() for c in cameras.split(',') if c.strip()]
-            if camera_list:
-                query = query.filter(FitsFile.camera.in_(camera_list))
-        
-        if telescopes:
-            telescope_list = [t.strip() for t in telescopes.split(',') if t.strip()]
-            if telescope_list:
-                query = query.filter(FitsFile.telescope.in_(telescope_list))
-        
-        if objects:
-            object_list = [o.strip() for o in objects.split(',') if o.strip()]
-            if object_list:
-                query = query.filter(FitsFile.object.in_(object_list))
-        
-        if filters:
-            filter_list = [f.strip() for f in filters.split(',') if f.strip()]
-            if filter_list:
-                query = query.filter(FitsFile.filter.in_(filter_list))
-        
-        if filename:
-            query = query.filter(FitsFile.file.like(f'%{filename}%'))
+        filename_index = db_service.db_manager.filename_search_index
+        filter_key = _file_filter_key(frame_types, cameras, telescopes, objects, filters, filename,
+                                      imaging_session_id, exposure_min, exposure_max,
+                                      date_start, date_end)
+        query = _apply_file_filters(session.query(FitsFile), filter_key, filename_index)
 
-        if imaging_session_id:
-            query = query.filter(FitsFile.imaging_session_id == imaging_session_id)
-        
-        if exposure_min is not None:
-            query = query.filter(FitsFile.exposure >= exposure_min)
-        
-        if exposure_max is not None:
-            query = query.filter(FitsFile.exposure <= exposure_max)
-        
-        if date_start:
-            query = query.filter(FitsFile.obs_date >= date_start)
-        
-        if date_end:
-            query = query.filter(FitsFile.obs_date <= date_end)
-        
-        # Get total count before pagination
-        total = query.count()
-        
-        # Apply sorting
-        sort_column = getattr(FitsFile, sort_by, FitsFile.obs_date)
-        if sort_order == 'asc':
-            query = query.order_by(asc(sort_column))
+        # Get total count, shared across the pages of one filter combination
+        total = _cached_count(session, filter_key, filename_index)
+
+        # Apply sorting; id breaks ties so the order (and the keyset) is total
+        if sort_by not in SORT_COLUMNS:
+            sort_by = 'obs_date'
+        sort_order = 'asc' if sort_order == 'asc' else 'desc'
+        sort_column = SORT_COLUMNS[sort_by]
+
+        direction = 'next'
+        if cursor:
+            cursor_sort_by, cursor_sort_order, direction, value, file_id = _decode_cursor(cursor)
+            if (cursor_sort_by, cursor_sort_order) != (sort_by, sort_order):
+                raise HTTPException(status_code=400, detail="Cursor is for a different sort order")
+
+        # A previous page is read backwards from the cursor, then reversed
+        ascending = (sort_order == 'asc') == (direction == 'next')
+        order = asc if ascending else desc
+        if sort_column is FitsFile.id:
+            query = query.order_by(order(FitsFile.id))
         else:
-            query = query.order_by(desc(sort_column))
-        
-        # Apply pagination
-        offset = (page - 1) * limit
-        files = query.offset(offset).limit(limit).all()
+            query = query.order_by(order(sort_column), order(FitsFile.id))
+
+        # One extra row tells whether there is a page beyond this one
+        if cursor:
+            files = []
+            for condition in _keyset_segments(sort_column, ascending, value, file_id):
+                files += query.filter(condition).limit(limit + 1 - len(files)).all()
+                if len(files) > limit:
+                    break
+        else:
+            files = query.offset((page - 1) * limit).limit(limit + 1).all()
+        more = len(files) > limit
+        files = files[:limit]
+        if direction == 'prev':
+            files.reverse()
+
+        def cursor_for(f, cursor_direction):
+            return _encode_cursor(sort_by, sort_order, cursor_direction, getattr(f, sort_by), f.id)
+
+        if direction == 'next':
+            has_next, has_prev = more, bool(cursor) or page > 1
+        else:
+            has_next, has_prev = True, more
         
         return {
             "files": [
@@ -151,16 +351,20 @@ async def get_files(
                 "page": page,
                 "limit": limit,
                 "total": total,
-                "pages": (total + limit - 1) // limit if total > 0 else 0
+                "pages": (total + limit - 1) // limit if total > 0 else 0,
+                "next_cursor": cursor_for(files[-1], 'next') if files and has_next else None,
+                "prev_cursor": cursor_for(files[0], 'prev') if files and has_prev else None
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching files: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/files/ids")
-async def get_file_ids(
+def get_file_ids(
     frame_types: Optional[str] = Query(None),
     cameras: Optional[str] = Query(None),
     telescopes: Optional[str] = Query(None),
@@ -172,56 +376,17 @@ async def get_file_ids(
     exposure_max: Optional[float] = None,
     date_start: Optional[str] = None,
     date_end: Optional[str] = None,
-    session: Session = Depends(get_db_session)
+    session: Session = Depends(get_db_session),
+    db_service = Depends(get_db_service)
 ):
     """Get file IDs matching filters (for bulk selection)."""
     try:
-        # Base query - only select IDs
-        query = session.query(FitsFile.id)
-        
-        # Apply same filters as get_files
-        if frame_types:
-            frame_type_list = [ft.strip() for ft in frame_types.split(',') if ft.strip()]
-            if frame_type_list:
-                query = query.filter(FitsFile.frame_type.in_(frame_type_list))
-        
-        if cameras:
-            camera_list = [c.strip() for c in cameras.split(',') if c.strip()]
-            if camera_list:
-                query = query.filter(FitsFile.camera.in_(camera_list))
-        
-        if telescopes:
-            telescope_list = [t.strip() for t in telescopes.split(',') if t.strip()]
-            if telescope_list:
-                query = query.filter(FitsFile.telescope.in_(telescope_list))
-        
-        if objects:
-            object_list = [o.strip() for o in objects.split(',') if o.strip()]
-            if object_list:
-                query = query.filter(FitsFile.object.in_(object_list))
-        
-        if filters:
-            filter_list = [f.strip() for f in filters.split(',') if f.strip()]
-            if filter_list:
-                query = query.filter(FitsFile.filter.in_(filter_list))
-        
-        if filename:
-            query = query.filter(FitsFile.file.like(f'%{filename}%'))
-
-        if imaging_session_id:
-            query = query.filter(FitsFile.imaging_session_id == imaging_session_id)
-        
-        if exposure_min is not None:
-            query = query.filter(FitsFile.exposure >= exposure_min)
-        
-        if exposure_max is not None:
-            query = query.filter(FitsFile.exposure <= exposure_max)
-        
-        if date_start:
-            query = query.filter(FitsFile.obs_date >= date_start)
-        
-        if date_end:
-            query = query.filter(FitsFile.obs_date <= date_end)
+        # Base query - only select IDs, with the same filters as get_files
+        filter_key = _file_filter_key(frame_types, cameras, telescopes, objects, filters, filename,
+                                      imaging_session_id, exposure_min, exposure_max,
+                                      date_start, date_end)
+        query = _apply_file_filters(session.query(FitsFile.id), filter_key,
+                                    db_service.db_manager.filename_search_index)
         
         # Get all IDs
         file_ids = [row[0] for row in query.all()]
@@ -232,4 +397,4 @@ async def get_file_ids(
         }
     except Exception as e:
         logger.error(f"Error fetching file IDs: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
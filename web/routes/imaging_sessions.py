@@ -22,7 +22,7 @@ router = APIRouter(prefix="/api/imaging-sessions")
 
 
 @router.get("")
-async def get_imaging_sessions(
+def get_imaging_sessions(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     date_start: Optional[str] = None,
@@ -53,12 +53,28 @@ async def get_imaging_sessions(
         offset = (page - 1) * limit
         sessions = query.offset(offset).limit(limit).all()
 
-        # Get file counts for each session
+        # Frame counts, LIGHT exposure and size for the whole page in one grouped query
+        totals = {}
+        for session_id, frame_type, count, exposure, size in session.query(
+            FitsFile.imaging_session_id,
+            FitsFile.frame_type,
+            func.count(FitsFile.id),
+            func.sum(FitsFile.exposure),
+            func.sum(FitsFile.file_size)
+        ).filter(
+            FitsFile.imaging_session_id.in_([s.id for s in sessions])
+        ).group_by(FitsFile.imaging_session_id, FitsFile.frame_type):
+            entry = totals.setdefault(session_id, {
+                "frame_counts": {}, "total_exposure": 0.0, "total_size": 0
+            })
+            entry["frame_counts"][frame_type or "UNKNOWN"] = count
+            if frame_type == 'LIGHT':
+                entry["total_exposure"] += exposure or 0
+            entry["total_size"] += size or 0
+
         session_data = []
         for s in sessions:
-            file_count = session.query(func.count(FitsFile.id)).filter(
-                FitsFile.imaging_session_id == s.id
-            ).scalar() or 0
+            session_totals = totals.get(s.id, {"frame_counts": {}, "total_exposure": 0.0, "total_size": 0})
             session_data.append({
                 "session_id": s.id,
                 "session_date": s.date,
@@ -67,7 +83,10 @@ async def get_imaging_sessions(
                 "site_name": s.site_name,
                 "observer": s.observer,
                 "notes": s.notes,
-                "file_count": file_count,
+                "file_count": sum(session_totals["frame_counts"].values()),
+                "frame_counts": session_totals["frame_counts"],
+                "total_exposure": session_totals["total_exposure"],
+                "total_size": session_totals["total_size"],
                 "created_at": s.created_at.isoformat() if s.created_at else None
             })
         
@@ -85,7 +104,7 @@ async def get_imaging_sessions(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{session_id}/details")
-async def get_imaging_session_details(
+def get_imaging_session_details(
     session_id: str,
     session: Session = Depends(get_db_session)):
     """Get detailed information about a specific imaging session including object-level summaries."""
@@ -249,7 +268,7 @@ async def get_imaging_session_details(
         
 
 @router.get("/{session_id}/session-info")
-async def get_imaging_session_info(
+def get_imaging_session_info(
     session_id: str,
     session: Session = Depends(get_db_session),
     config = Depends(get_config)
@@ -287,7 +306,7 @@ async def get_imaging_session_info(
 
 
 @router.put("/{session_id}/session-info")
-async def save_imaging_session_info(
+def save_imaging_session_info(
     session_id: str,
     content: str = Body(...),
     session: Session = Depends(get_db_session),
@@ -324,7 +343,7 @@ async def save_imaging_session_info(
 
 
 @router.get("/ids")
-async def get_imaging_session_ids(
+def get_imaging_session_ids(
     date_start: Optional[str] = None,
     date_end: Optional[str] = None,
     cameras: Optional[str] = Query(None, description="Comma-separated cameras"),
@@ -366,7 +385,7 @@ async def get_imaging_session_ids(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{session_id}")
-async def delete_imaging_session(
+def delete_imaging_session(
     session_id: str,
     scope: str = Query(
         "all",
@@ -500,7 +519,7 @@ async def delete_imaging_session(
 
 
 @router.get("/{session_id}/processing-sessions")
-async def get_processing_sessions_for_imaging_session(
+def get_processing_sessions_for_imaging_session(
     session_id: str,
     session: Session = Depends(get_db_session)
 ):
@@ -530,22 +549,28 @@ async def get_processing_sessions_for_imaging_session(
         if not processing_sessions:
             return []
         
+        # File counts by frame type for files from THIS imaging session, for
+        # all processing sessions in one grouped query
+        frame_counts_by_session = {
+            ps.id: {'LIGHT': 0, 'DARK': 0, 'FLAT': 0, 'BIAS': 0} for ps in processing_sessions
+        }
+        file_counts = session.query(
+            ProcessingSessionFile.processing_session_id,
+            FitsFile.frame_type,
+            func.count(FitsFile.id)
+        ).join(ProcessingSessionFile, ProcessingSessionFile.fits_file_id == FitsFile.id).filter(
+            ProcessingSessionFile.processing_session_id.in_(list(frame_counts_by_session)),
+            FitsFile.imaging_session_id == session_id  # Only count files from this imaging session
+        ).group_by(ProcessingSessionFile.processing_session_id, FitsFile.frame_type).all()
+        
+        for ps_id, frame_type, count in file_counts:
+            if frame_type in frame_counts_by_session[ps_id]:
+                frame_counts_by_session[ps_id][frame_type] = count
+        
         # Build response with file counts for each processing session
         result = []
         for ps in processing_sessions:
-            # Get file counts by frame type for files from THIS imaging session
-            file_counts = session.query(
-                FitsFile.frame_type,
-                func.count(FitsFile.id)
-            ).join(ProcessingSessionFile, ProcessingSessionFile.fits_file_id == FitsFile.id).filter(
-                ProcessingSessionFile.processing_session_id == ps.id,
-                FitsFile.imaging_session_id == session_id  # Only count files from this imaging session
-            ).group_by(FitsFile.frame_type).all()
-            
-            frame_counts = {'LIGHT': 0, 'DARK': 0, 'FLAT': 0, 'BIAS': 0}
-            for frame_type, count in file_counts:
-                if frame_type in frame_counts:
-                    frame_counts[frame_type] = count
+            frame_counts = frame_counts_by_session[ps.id]
             
             # Parse objects from JSON
             objects = json.loads(ps.objects) if ps.objects else []
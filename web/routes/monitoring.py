@@ -6,7 +6,7 @@ import asyncio
 import logging
 import sys
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Literal
 
 from fastapi import APIRouter, HTTPException, Body
 from pydantic import BaseModel
@@ -29,6 +29,7 @@ class MonitoringConfigModel(BaseModel):
     enabled: bool
     interval_minutes: int
     ignore_files_newer_than_minutes: int
+    mode: Optional[Literal["polling", "events"]] = None  # None keeps the saved mode
 
 
 async def monitoring_callback(filepaths: list):
@@ -99,7 +100,8 @@ async def periodic_scan_task(interval_minutes: int, initial_delay_minutes: int =
     # Seed the baseline (skip files modified very recently so they are picked
     # up properly once they stop changing).
     file_monitor.last_scan_files = set(
-        file_monitor.find_fits_files(config.paths.quarantine_dir, skip_recent=True)
+        file_monitor.find_fits_files(config.paths.quarantine_dir, skip_recent=True,
+                                     skip_cataloged=True)
     )
     logger.info(f"Periodic scan baseline: {len(file_monitor.last_scan_files)} existing file(s)")
 
@@ -145,6 +147,48 @@ async def periodic_scan_task(interval_minutes: int, initial_delay_minutes: int =
         await asyncio.sleep(interval_minutes * 60)
 
 
+async def event_scan_task():
+    """
+    Event-driven monitoring task.
+
+    Uses FileMonitor.start_event_monitoring() so frames are cataloged as soon
+    as they settle instead of waiting for the next periodic check.  Settled
+    files are handed to monitoring_callback, which runs the usual
+    scan → validate → migrate chain (cataloging processed files as part of
+    the scan).  Upload tokens are honoured by FileMonitor.
+
+    No initial delay is needed: files already in quarantine form the
+    baseline, so only new arrivals trigger the chain.
+    """
+    app_module = sys.modules['web.app']
+    config = app_module.config
+    db_service = app_module.db_service
+
+    async def on_new_files(filepaths: list):
+        global last_scan
+        last_scan = datetime.now().isoformat()
+        logger.info(
+            f"{len(filepaths)} new file(s) settled — "
+            "starting scan → validate → migrate chain"
+        )
+        await monitoring_callback(filepaths)
+
+    from file_monitor import FileMonitor
+    file_monitor = FileMonitor(config, on_new_files, db_service)
+
+    logger.info("Event-driven monitoring active")
+    await file_monitor.start_event_monitoring()
+
+
+def _create_monitoring_task(config: MonitoringConfigModel, initial_delay_minutes: int = 0):
+    """Create the monitoring task for the configured mode."""
+    if config.mode == "events":
+        return asyncio.create_task(event_scan_task())
+    return asyncio.create_task(
+        periodic_scan_task(config.interval_minutes, initial_delay_minutes=initial_delay_minutes)
+    )
+
+
 @router.get("/status")
 async def get_monitoring_status():
     """Get current monitoring status from database."""
@@ -157,6 +201,7 @@ async def get_monitoring_status():
     enabled_db = db_service.get_setting('monitoring.enabled', False)
     interval = db_service.get_setting('monitoring.interval_minutes', 5)
     ignore_newer = db_service.get_setting('monitoring.ignore_newer_than_minutes', 2)
+    mode = db_service.get_setting('monitoring.mode', 'polling')
     
     # Update global state from database
     monitoring_enabled = enabled_db
@@ -165,6 +210,7 @@ async def get_monitoring_status():
         "enabled": enabled_db,
         "interval_minutes": interval,
         "ignore_files_newer_than_minutes": ignore_newer,
+        "mode": mode,
         "last_scan": last_scan,
         "files_detected": files_detected,
         "next_scan": None  # TODO: Calculate based on last_scan + interval
@@ -182,17 +228,21 @@ async def start_monitoring(config: MonitoringConfigModel = Body(...)):
     app_module = sys.modules['web.app']
     db_service = app_module.db_service
     
+    if config.mode is None:
+        config.mode = db_service.get_setting('monitoring.mode', 'polling')
+    
     # Save settings to database
     db_service.set_setting('monitoring.enabled', True)
     db_service.set_setting('monitoring.interval_minutes', config.interval_minutes)
     db_service.set_setting('monitoring.ignore_newer_than_minutes', config.ignore_files_newer_than_minutes)
+    db_service.set_setting('monitoring.mode', config.mode)
     
     monitoring_enabled = True
     
     # Start monitoring task
-    monitoring_task = asyncio.create_task(periodic_scan_task(config.interval_minutes))
+    monitoring_task = _create_monitoring_task(config)
     
-    logger.info(f"Monitoring started: {config.interval_minutes}min interval")
+    logger.info(f"Monitoring started: {config.mode} mode, {config.interval_minutes}min interval")
     
     return {"message": "Monitoring started", "config": config.dict()}
 
@@ -231,11 +281,15 @@ async def update_monitoring_config(config: MonitoringConfigModel = Body(...)):
     app_module = sys.modules['web.app']
     db_service = app_module.db_service
     
+    if config.mode is None:
+        config.mode = db_service.get_setting('monitoring.mode', 'polling')
+    
     # Save to database
     db_service.set_setting('monitoring.interval_minutes', config.interval_minutes)
     db_service.set_setting('monitoring.ignore_newer_than_minutes', config.ignore_files_newer_than_minutes)
+    db_service.set_setting('monitoring.mode', config.mode)
     
-    # If monitoring is running and interval changed, restart it
+    # If monitoring is running and interval or mode changed, restart it
     global monitoring_task, monitoring_enabled
     if monitoring_enabled and monitoring_task and not monitoring_task.done():
         monitoring_task.cancel()
@@ -243,8 +297,8 @@ async def update_monitoring_config(config: MonitoringConfigModel = Body(...)):
             await monitoring_task
         except asyncio.CancelledError:
             pass
-        monitoring_task = asyncio.create_task(periodic_scan_task(config.interval_minutes))
-        logger.info(f"Monitoring restarted with new interval: {config.interval_minutes}min")
+        monitoring_task = _create_monitoring_task(config)
+        logger.info(f"Monitoring restarted: {config.mode} mode, {config.interval_minutes}min interval")
     
     return {"message": "Configuration updated", "config": config.dict()}
 
@@ -265,11 +319,13 @@ async def auto_start_monitoring():
         if enabled:
             interval = db_service.get_setting('monitoring.interval_minutes', 5)
             ignore_newer = db_service.get_setting('monitoring.ignore_newer_than_minutes', 2)
+            mode = db_service.get_setting('monitoring.mode', 'polling')
             
             config = MonitoringConfigModel(
                 enabled=True,
                 interval_minutes=interval,
-                ignore_files_newer_than_minutes=ignore_newer
+                ignore_files_newer_than_minutes=ignore_newer,
+                mode=mode
             )
             
             # Start monitoring with 60 second delay - DON'T await
@@ -312,6 +368,7 @@ async def start_monitoring_with_delay(config: MonitoringConfigModel, delay_secon
         db_service.set_setting('monitoring.enabled', True)
         db_service.set_setting('monitoring.interval_minutes', config.interval_minutes)
         db_service.set_setting('monitoring.ignore_newer_than_minutes', config.ignore_files_newer_than_minutes)
+        db_service.set_setting('monitoring.mode', config.mode)
         
         monitoring_enabled = True
 
@@ -319,9 +376,8 @@ async def start_monitoring_with_delay(config: MonitoringConfigModel, delay_secon
         # check fires after one complete interval rather than immediately.  This
         # prevents the auto-scan from overlapping with a manual scan the user may
         # run right after restarting the server.
-        monitoring_task = asyncio.create_task(
-            periodic_scan_task(config.interval_minutes,
-                               initial_delay_minutes=config.interval_minutes)
+        monitoring_task = _create_monitoring_task(
+            config, initial_delay_minutes=config.interval_minutes
         )
 
         logger.info(
@@ -7,10 +7,12 @@ import logging
 import sys
 from datetime import datetime
 
+import anyio.from_thread
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 
 from validation import FitsValidator
 from file_organizer import FileOrganizer
+from file_monitor import FileMonitor
 from fits_processor import OptimizedFitsProcessor
 from processed_catalog.cataloger import ProcessedFileCataloger
 from web.dependencies import get_config, get_db_service
@@ -21,6 +23,16 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/operations")
 
+# How often the background reconciler re-checks stored file stats against disk
+FILE_STATS_RECONCILE_INTERVAL_HOURS = 24
+
+# Quiet period after an equipment edit before revalidating, so a burst of
+# edits triggers one run
+EQUIPMENT_REVALIDATION_DELAY_SECONDS = 5
+
+_equipment_revalidation_pending = False
+_equipment_revalidation_task = None
+
 
 def refresh_dashboard_cache():
     """
@@ -40,6 +52,7 @@ def refresh_dashboard_cache():
         session = db_service.db_manager.get_session()
         logger.info("Refreshing dashboard cache after file operation...")
         dashboard_cache.calculate_and_cache_disk_space(session, config)
+        dashboard_cache.calculate_and_cache_cleanup(session, config)
         session.close()
         logger.info("Dashboard cache refreshed successfully")
 
@@ -72,6 +85,24 @@ def _run_scan_sync(task_id: str):
         # Create processor
         processor = OptimizedFitsProcessor(config, cameras, telescopes, filter_mappings, db_service)
 
+        # Find files the same way the CLI catalog command does: unchanged
+        # files the scan index already marks as cataloged are not re-hashed.
+        # Paths stream out of the walker while it runs, so processing starts
+        # before the whole quarantine has been listed.
+        logger.info("Scanning quarantine directory...")
+        file_monitor = FileMonitor(config, lambda files: None, db_service)
+        found_files = 0
+
+        def counted(paths):
+            nonlocal found_files
+            for path in paths:
+                found_files += 1
+                yield path
+
+        filepaths = counted(file_monitor.iter_fits_files(config.paths.quarantine_dir,
+                                                         skip_cataloged=True))
+        bg_tasks.set_task_status(task_id, "running", "Processing uncataloged files...", 5)
+
         # Dispose the connection pool before forking child processes.
         # ProcessPoolExecutor uses fork() on Linux, so worker processes inherit
         # all open file descriptors — including SQLite connections sitting idle
@@ -79,37 +110,48 @@ def _run_scan_sync(task_id: str):
         # leaving the parent pool holding dead connections.  The next DB write
         # (add_imaging_session) then fails with "unable to open database file".
         # Disposing here ensures no live SQLite fds are inherited by workers.
+        # The scan index has already been read by iter_fits_files() above.
         db_service.db_manager.engine.dispose()
 
-        logger.info("Scanning quarantine directory...")
-
-        # Scan and process files
-        df, sessions = processor.scan_quarantine()
-        
-        logger.info(f"Scan complete: found {len(df)} files, {len(sessions)} sessions")
-
-        if len(df) > 0:
-            # Add sessions to database FIRST (before files that reference them)
-            for session_data in sessions:
-                db_service.add_imaging_session(session_data)
-
-            logger.info(f"Saved {len(sessions)} sessions")
-
-            # Now add files to database (after sessions exist)
-            new_files = 0
-            duplicates = 0
-
-            for idx, row in enumerate(df.iter_rows(named=True)):
-                success, is_duplicate = db_service.add_fits_file(row)
-                if success and not is_duplicate:
-                    new_files += 1
-                elif is_duplicate:
-                    duplicates += 1
+        # Process files, writing each record batch to the database as soon
+        # as it is ready so nothing waits for the whole quarantine
+        total_files = 0
+        processed_files = 0
+        session_ids = set()
+        new_files = 0
+        duplicates = 0
+
+        for df, sessions, failed_files in processor.iter_file_batches(filepaths):
+            processed_files += len(df) + len(failed_files)
+
+            if not df.is_empty():
+                total_files += len(df)
+
+                # Add sessions to database FIRST (before files that reference them)
+                for session_data in sessions:
+                    db_service.add_imaging_session(session_data)
+                    session_ids.add(session_data['id'])
+
+                # Now add files to database (after sessions exist)
+                result = db_service.add_fits_files_bulk(df)
+                new_files += result['added']
+                duplicates += len(result['duplicates'])
+
+                for filename, error in result['errors']:
+                    logger.error(f"Failed to add {filename} to database: {error}")
+
+            # Raw files take the scan from 5% to 90%; processed files the rest.
+            # The total is only known once the walk finishes, so this tracks
+            # the files found so far.
+            progress = 5 + int(85 * processed_files / max(found_files, 1))
+            bg_tasks.set_task_status(task_id, "running",
+                f"Processing files... ({processed_files}/{found_files} found so far, {new_files} new)",
+                progress)
 
-                # Update progress
-                progress = int((idx + 1) / len(df) * 100)
-                bg_tasks.set_task_status(task_id, "running", f"Processing files... ({idx + 1}/{len(df)})", progress)
+        logger.info(f"Scan complete: found {total_files} files, {len(session_ids)} sessions")
 
+        if total_files > 0:
+            logger.info(f"Saved {len(session_ids)} sessions")
             logger.info(f"Saved to database: {new_files} new files, {duplicates} duplicates")
 
             # Clean up any orphaned imaging sessions (sessions with no files)
@@ -140,7 +182,7 @@ def _run_scan_sync(task_id: str):
             results = {
                 'added': new_files,
                 'duplicates': duplicates,
-                'sessions': len(sessions),
+                'sessions': len(session_ids),
                 'processed_cataloged': processed_stats['files_cataloged'],
                 'processed_updated': processed_stats['files_updated'],
                 'processed_skipped': processed_stats['files_skipped']
@@ -199,7 +241,7 @@ def _run_scan_sync(task_id: str):
         asyncio.run(bg_tasks.clear_operation())
 
 
-def _run_validation_sync(task_id: str, check_files: bool):
+def _run_validation_sync(task_id: str, check_files: bool, full: bool = False):
     """Synchronous validation wrapper."""
     try:
         bg_tasks.set_task_status(task_id, "running", "Validating files...", 0)
@@ -217,7 +259,8 @@ def _run_validation_sync(task_id: str, check_files: bool):
         
         stats = validator.validate_all_files(
             check_files=check_files,
-            progress_callback=update_progress
+            progress_callback=update_progress,
+            full=full
         )
         
         bg_tasks.set_task_status(task_id, "completed", 
@@ -248,11 +291,11 @@ def _run_migration_sync(task_id: str):
         try:
             from models import FitsFile
             quarantine_files = session.query(FitsFile).filter(
-                FitsFile.folder.like(f"%{config.paths.quarantine_dir}%")
+                FitsFile.in_folder_tree(config.paths.quarantine_dir)
             ).count()
 
             validated_files = session.query(FitsFile).filter(
-                FitsFile.folder.like(f"%{config.paths.quarantine_dir}%"),
+                FitsFile.in_folder_tree(config.paths.quarantine_dir),
                 FitsFile.validation_score != None,
                 FitsFile.validation_score > 0
             ).count()
@@ -313,6 +356,45 @@ def _run_migration_sync(task_id: str):
     finally:
         asyncio.run(bg_tasks.clear_operation())
 
+def _run_reconcile_sync(task_id: str):
+    """
+    Synchronous file stat reconcile wrapper.
+
+    Runs at low priority: batches are throttled, and the run stops early
+    if a scan, validation or migration starts.
+    """
+    try:
+        bg_tasks.set_task_status(task_id, "running", "Reconciling file stats...", 0)
+
+        app_module = sys.modules['web.app']
+        db_service = app_module.db_service
+
+        if not db_service:
+            raise ValueError("Database service not initialized")
+
+        def update_progress(checked, total):
+            progress = int(checked / total * 100) if total else 100
+            bg_tasks.set_task_status(task_id, "running",
+                f"Reconciling file stats... ({checked}/{total})", progress)
+
+        result = db_service.reconcile_file_stats(
+            progress_callback=update_progress,
+            should_stop=bg_tasks.is_operation_in_progress
+        )
+
+        if result['updated']:
+            refresh_dashboard_cache()
+
+        bg_tasks.set_task_status(task_id, "completed",
+            f"File stats reconciled: {result['checked']} checked, "
+            f"{result['updated']} updated, {result['missing']} missing", 100,
+            results=result)
+
+    except Exception as e:
+        logger.error(f"File stat reconcile failed: {e}", exc_info=True)
+        bg_tasks.set_task_status(task_id, "failed", f"File stat reconcile failed: {str(e)}", 0)
+
+
 # ============================================================================
 # ASYNC OPERATION WRAPPERS
 # ============================================================================
@@ -324,11 +406,55 @@ async def run_scan_operation(task_id: str):
     await loop.run_in_executor(bg_tasks.executor, _run_scan_sync, task_id)
 
 
-async def run_validation_operation(task_id: str, check_files: bool):
+async def run_validation_operation(task_id: str, check_files: bool, full: bool = False):
     """Async wrapper to run validation in executor."""
     await bg_tasks.set_operation("validation")
     loop = asyncio.get_event_loop()
-    await loop.run_in_executor(bg_tasks.executor, _run_validation_sync, task_id, check_files)
+    await loop.run_in_executor(bg_tasks.executor, _run_validation_sync, task_id, check_files, full)
+
+
+async def _equipment_revalidation_worker():
+    """Run incremental validations until no equipment edits are pending."""
+    global _equipment_revalidation_pending
+
+    while _equipment_revalidation_pending:
+        await asyncio.sleep(EQUIPMENT_REVALIDATION_DELAY_SECONDS)
+        if bg_tasks.is_operation_in_progress():
+            continue
+
+        _equipment_revalidation_pending = False
+        task_id = f"validate_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        logger.info(f"Revalidating after equipment change: {task_id}")
+        bg_tasks.set_task_status(task_id, "pending", "Revalidation queued after equipment change...", 0,
+                                 check_files=False)
+        await run_validation_operation(task_id, False)
+
+
+def schedule_equipment_revalidation():
+    """
+    Queue an incremental validation after a camera, telescope or filter edit.
+
+    Only frames whose equipment facts changed are re-scored. Edits made while
+    a run is queued or in progress are picked up by a follow-up run.
+
+    The equipment routes are plain `def` and call this from a threadpool
+    worker, so the worker task is started on the event loop via AnyIO.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        anyio.from_thread.run_sync(_start_equipment_revalidation)
+    else:
+        _start_equipment_revalidation()
+
+
+def _start_equipment_revalidation():
+    """Mark an edit pending and start the worker if needed (event loop thread only)."""
+    global _equipment_revalidation_pending, _equipment_revalidation_task
+
+    _equipment_revalidation_pending = True
+    if _equipment_revalidation_task is None or _equipment_revalidation_task.done():
+        _equipment_revalidation_task = asyncio.create_task(_equipment_revalidation_worker())
 
 
 async def run_migration_operation(task_id: str):
@@ -338,10 +464,43 @@ async def run_migration_operation(task_id: str):
     await loop.run_in_executor(bg_tasks.executor, _run_migration_sync, task_id)
 
 
+async def run_reconcile_operation(task_id: str):
+    """
+    Async wrapper to run the file stat reconcile.
+
+    Uses the default executor rather than bg_tasks.executor and does not
+    take the operation lock, so it never blocks user-started operations.
+    """
+    await asyncio.to_thread(_run_reconcile_sync, task_id)
+
+
+async def file_stats_reconcile_loop(initial_delay_seconds: int = 600):
+    """Periodically reconcile stored file stats with disk in the background."""
+    await asyncio.sleep(initial_delay_seconds)
+
+    while True:
+        if bg_tasks.is_operation_in_progress():
+            logger.info("Skipping file stat reconcile: operation in progress")
+        else:
+            task_id = f"reconcile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            await run_reconcile_operation(task_id)
+
+        await asyncio.sleep(FILE_STATS_RECONCILE_INTERVAL_HOURS * 3600)
+
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
 
+@router.post("/reconcile-file-stats")
+async def start_reconcile(background_tasks: BackgroundTasks):
+    """Start a file stat reconcile (size/mtime/inode drift check)."""
+    task_id = f"reconcile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    bg_tasks.set_task_status(task_id, "pending", "File stat reconcile queued...", 0)
+    background_tasks.add_task(run_reconcile_operation, task_id)
+    return {"task_id": task_id, "message": "File stat reconcile started"}
+
+
 @router.post("/scan")
 async def start_scan(background_tasks: BackgroundTasks):
     """Start a quarantine scan operation."""
@@ -372,10 +531,11 @@ async def start_scan(background_tasks: BackgroundTasks):
 @router.post("/validate")
 async def start_validation(
     background_tasks: BackgroundTasks,
-    check_files: bool = Query(True, description="Check if physical files exist")
+    check_files: bool = Query(True, description="Check if physical files exist"),
+    full: bool = Query(False, description="Re-score every file, not just new or changed ones")
 ):
     """Start a validation operation."""
-    logger.info(f"🔍 Validation request received: check_files={check_files}")
+    logger.info(f"🔍 Validation request received: check_files={check_files}, full={full}")
     
     if bg_tasks.is_operation_in_progress():
         logger.warning(f"❌ Cannot start validation: operation already in progress")
@@ -391,7 +551,7 @@ async def start_validation(
     bg_tasks.set_task_status(task_id, "pending", "Validation queued...", 0, check_files=check_files)
     
     try:
-        background_tasks.add_task(run_validation_operation, task_id, check_files)
+        background_tasks.add_task(run_validation_operation, task_id, check_files, full)
         logger.info(f"✅ Validation task {task_id} queued successfully")
         return {"task_id": task_id, "message": "Validation started"}
     except Exception as e:
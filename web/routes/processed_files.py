@@ -19,7 +19,7 @@ router = APIRouter(prefix="/api/processed-files")
 
 
 @router.get("/session/{session_id}/stats")
-async def get_session_processed_stats(
+def get_session_processed_stats(
     session_id: str,
     session: Session = Depends(get_db_session)
 ):
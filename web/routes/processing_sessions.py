@@ -29,7 +29,7 @@ class PreSelectFilesRequest(BaseModel):
 
 
 @router.get("")
-async def get_processing_sessions(
+def get_processing_sessions(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None),
@@ -37,13 +37,12 @@ async def get_processing_sessions(
 ):
     """Get processing sessions with pagination and filtering."""
     try:
-        # Get sessions using ProcessingSessionManager which returns ProcessingSessionInfo objects
-        all_sessions = processing_manager.list_processing_sessions(status_filter=status)
-        
-        # Apply pagination
-        total = len(all_sessions)
+        # Get one page using ProcessingSessionManager which returns ProcessingSessionInfo objects
+        total = processing_manager.count_processing_sessions(status_filter=status)
         offset = (page - 1) * limit
-        sessions = all_sessions[offset:offset + limit]
+        sessions = processing_manager.list_processing_sessions(
+            status_filter=status, limit=limit, offset=offset
+        )
         
         # Build response using ProcessingSessionInfo attributes
         session_data = []
@@ -63,6 +62,8 @@ async def get_processing_sessions(
                 "darks": s.darks,
                 "flats": s.flats,
                 "bias": s.bias,
+                "total_exposure": s.total_exposure,
+                "total_size": s.total_size,
                 "processing_started": s.processing_started.isoformat() if s.processing_started else None,
                 "processing_completed": s.processing_completed.isoformat() if s.processing_completed else None,
                 "created_at": s.created_at.isoformat() if s.created_at else None,
@@ -84,7 +85,7 @@ async def get_processing_sessions(
 
 
 @router.get("/ids")
-async def get_processing_session_ids(
+def get_processing_session_ids(
     status: Optional[str] = Query(None),
     processing_manager = Depends(get_processing_manager)
 ):
@@ -94,11 +95,8 @@ async def get_processing_session_ids(
     Returns sessions in descending creation date order.
     """
     try:
-        # Get all sessions matching the filter
-        all_sessions = processing_manager.list_processing_sessions(status_filter=status)
-        
-        # Extract just the IDs in order
-        session_ids = [s.id for s in all_sessions]
+        # Get the IDs of all sessions matching the filter, in order
+        session_ids = processing_manager.list_processing_session_ids(status_filter=status)
         
         return {
             "session_ids": session_ids,
@@ -111,7 +109,7 @@ async def get_processing_session_ids(
 
 
 @router.get("/{session_id}")
-async def get_processing_session(
+def get_processing_session(
     session_id: str,
     session: Session = Depends(get_db_session)
 ):
@@ -252,7 +250,7 @@ async def get_processing_session(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("")
-async def create_processing_session(
+def create_processing_session(
     name: str = Body(...),
     file_ids: Optional[List[int]] = Body(default=[]),  # Changed: now optional with empty list default
     notes: Optional[str] = Body(None),
@@ -293,7 +291,7 @@ async def create_processing_session(
 
 
 @router.put("/{session_id}/status")
-async def update_processing_session_status(
+def update_processing_session_status(
     session_id: str,
     status: str = Body(...),
     notes: Optional[str] = Body(None),
@@ -319,7 +317,7 @@ async def update_processing_session_status(
 
 
 @router.delete("/{session_id}")
-async def delete_processing_session(
+def delete_processing_session(
     session_id: str,
     remove_files: bool = Query(True, description="Remove staged files"),
     processing_manager = Depends(get_processing_manager)
@@ -337,7 +335,7 @@ async def delete_processing_session(
 
 
 @router.post("/{session_id}/add-files")
-async def add_files_to_processing_session(
+def add_files_to_processing_session(
     session_id: str,
     file_ids: List[int] = Body(...),
     processing_manager = Depends(get_processing_manager)
@@ -366,7 +364,7 @@ async def add_files_to_processing_session(
 
 
 @router.get("/{session_id}/calibration-matches")
-async def get_calibration_matches(
+def get_calibration_matches(
     session_id: str,
     processing_manager = Depends(get_processing_manager)
 ):
@@ -411,7 +409,7 @@ async def get_calibration_matches(
         
 
 @router.get("/{session_id}/session-info")
-async def get_processing_session_info(
+def get_processing_session_info(
     session_id: str,
     processing_manager = Depends(get_processing_manager),
     config = Depends(get_config)
@@ -460,7 +458,7 @@ async def get_processing_session_info(
 
 
 @router.put("/{session_id}/session-info")
-async def save_processing_session_info(
+def save_processing_session_info(
     session_id: str,
     content: str = Body(...),
     processing_manager = Depends(get_processing_manager),
@@ -506,7 +504,7 @@ async def save_processing_session_info(
 
 
 @router.post("/{session_id}/preselect-files")
-async def preselect_files_for_session(
+def preselect_files_for_session(
     session_id: str,
     request: PreSelectFilesRequest,
     session: Session = Depends(get_db_session)
@@ -658,7 +656,7 @@ def _build_calibration_markdown(match_data: dict) -> str:
 
 
 @router.get("/{session_id}/calibration-scoring")
-async def get_calibration_scoring(
+def get_calibration_scoring(
     session_id: str,
     session: Session = Depends(get_db_session),
     config = Depends(get_config),
@@ -718,7 +716,7 @@ async def get_calibration_scoring(
 
 
 @router.delete("/{session_id}/objects/{object_name}")
-async def remove_object_from_session(
+def remove_object_from_session(
     session_id: str,
     object_name: str,
     session: Session = Depends(get_db_session),
@@ -885,7 +883,7 @@ async def remove_object_from_session(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{session_id}/files")
-async def get_processing_session_files(
+def get_processing_session_files(
     session_id: str,
     session: Session = Depends(get_db_session)
 ):
@@ -1,9 +1,14 @@
 """
 Updated web/routes/stats.py - Complete corrected version with physical file counts
+
+Frame counts, integration time and object counts are read from the
+fits_file_stats / fits_object_stats tables, which triggers keep current on
+every catalog change, so the endpoint's cost doesn't grow with the catalog.
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import func, distinct, extract
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 import logging
 import shutil
@@ -11,7 +16,9 @@ from typing import Optional
 import pygal
 from pygal.style import Style
 
-from models import FitsFile, ImagingSession, ProcessingSession, ProcessingSessionFile
+from models import (
+    FitsFile, FitsFileStats, FitsObjectStats, ImagingSession, ProcessingSession, ProcessingSessionFile
+)
 from web.dependencies import get_db_service, get_config
 from web import dashboard_cache
 
@@ -33,35 +40,8 @@ custom_style = Style(
     tooltip_font_size=14,
 )
 
-
-def count_physical_files_in_folder(folder_path: Path, extensions: list = None) -> int:
-    """
-    Count physical FITS files in a folder.
-
-    Args:
-        folder_path: Path to folder to scan
-        extensions: List of file extensions to count (default: ['.fits', '.fit', '.fts'])
-
-    Returns:
-        Number of files found
-    """
-    if extensions is None:
-        extensions = ['.fits', '.fit', '.fts']
-
-    if not folder_path.exists():
-        return 0
-
-    count = 0
-    try:
-        for ext in extensions:
-            # Use glob to find files with this extension (case-insensitive)
-            count += len(list(folder_path.glob(f"*{ext}")))
-            count += len(list(folder_path.glob(f"*{ext.upper()}")))
-    except Exception as e:
-        logger.error(f"Error counting files in {folder_path}: {e}")
-        return 0
-
-    return count
+# Rendered charts kept per distinct data set; unchanged stats reuse the SVG
+CHART_CACHE_SIZE = 32
 
 
 def format_number(value: float, max_digits: int = 3) -> float:
@@ -146,12 +126,21 @@ def generate_integration_time_chart(data_dict: dict, title: str) -> str:
     if not data_dict:
         return None
 
+    return _render_integration_time_chart(
+        tuple((label, time_data['total_seconds']) for label, time_data in data_dict.items()),
+        title
+    )
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _render_integration_time_chart(items: tuple, title: str) -> str:
+    """Render an integration time chart from (label, seconds) pairs."""
     # Sort by label for years, by value for equipment
-    is_year_data = all(key.isdigit() and len(key) == 4 for key in data_dict.keys())
+    is_year_data = all(key.isdigit() and len(key) == 4 for key, _ in items)
     if is_year_data:
-        sorted_items = sorted(data_dict.items(), key=lambda x: x[0])
+        sorted_items = sorted(items, key=lambda x: x[0])
     else:
-        sorted_items = sorted(data_dict.items(), key=lambda x: x[1]['total_seconds'], reverse=True)
+        sorted_items = sorted(items, key=lambda x: x[1], reverse=True)
 
     # Create chart with custom configuration
     # Use consistent dimensions and margins to align chart areas across all three charts
@@ -176,8 +165,7 @@ def generate_integration_time_chart(data_dict: dict, title: str) -> str:
     chart.x_labels = [item[0] for item in sorted_items]
     values = []
     tooltip_texts = []
-    for label, time_data in sorted_items:
-        seconds = time_data['total_seconds']
+    for label, seconds in sorted_items:
         formatted = format_time_for_display(seconds)
         tooltip_text = f"{label}: {formatted}"
         values.append(seconds / 3600)  # Convert to hours for chart
@@ -198,12 +186,18 @@ def generate_object_count_chart(data_dict: dict, title: str) -> str:
     if not data_dict:
         return None
 
+    return _render_object_count_chart(tuple(data_dict.items()), title)
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _render_object_count_chart(items: tuple, title: str) -> str:
+    """Render an object count chart from (label, count) pairs."""
     # Sort by label for years, by value for equipment
-    is_year_data = all(key.isdigit() and len(key) == 4 for key in data_dict.keys())
+    is_year_data = all(key.isdigit() and len(key) == 4 for key, _ in items)
     if is_year_data:
-        sorted_items = sorted(data_dict.items(), key=lambda x: x[0])
+        sorted_items = sorted(items, key=lambda x: x[0])
     else:
-        sorted_items = sorted(data_dict.items(), key=lambda x: x[1], reverse=True)
+        sorted_items = sorted(items, key=lambda x: x[1], reverse=True)
 
     # Create chart with custom configuration
     # Use consistent dimensions and margins to align chart areas across all three charts
@@ -244,45 +238,40 @@ def generate_object_count_chart(data_dict: dict, title: str) -> str:
     return svg_string
 
 
-def calculate_integration_time_stats(session):
-    """Calculate integration time statistics for LIGHT frames."""
-    # Total integration time
-    total_time = session.query(func.sum(FitsFile.exposure)).filter(
-        FitsFile.frame_type == 'LIGHT'
-    ).scalar() or 0
-
-    # By year
-    by_year_raw = session.query(
-        func.substr(FitsFile.obs_date, 1, 4).label('year'),
-        func.sum(FitsFile.exposure).label('total_time')
-    ).filter(
-        FitsFile.frame_type == 'LIGHT',
-        FitsFile.obs_date.isnot(None)
-    ).group_by('year').order_by('year').all()
-
-    by_year = {year: format_integration_time(time) for year, time in by_year_raw if year}
-
-    # By telescope
-    by_telescope_raw = session.query(
-        FitsFile.telescope,
-        func.sum(FitsFile.exposure).label('total_time')
-    ).filter(
-        FitsFile.frame_type == 'LIGHT',
-        FitsFile.telescope.isnot(None)
-    ).group_by(FitsFile.telescope).order_by(func.sum(FitsFile.exposure).desc()).all()
+def _stats_key(value: str):
+    """Stats tables store unknown values as ''; report them as None like fits_files."""
+    return value or None
 
-    by_telescope = {tel: format_integration_time(time) for tel, time in by_telescope_raw if tel}
 
-    # By camera
-    by_camera_raw = session.query(
-        FitsFile.camera,
-        func.sum(FitsFile.exposure).label('total_time')
+def calculate_integration_time_stats(session):
+    """Calculate integration time statistics for LIGHT frames."""
+    obs_year = func.substr(FitsFileStats.obs_day, 1, 4)
+    rows = session.query(
+        obs_year,
+        FitsFileStats.camera,
+        FitsFileStats.telescope,
+        func.sum(FitsFileStats.total_exposure)
     ).filter(
-        FitsFile.frame_type == 'LIGHT',
-        FitsFile.camera.isnot(None)
-    ).group_by(FitsFile.camera).order_by(func.sum(FitsFile.exposure).desc()).all()
-
-    by_camera = {cam: format_integration_time(time) for cam, time in by_camera_raw if cam}
+        FitsFileStats.frame_type == 'LIGHT'
+    ).group_by(obs_year, FitsFileStats.camera, FitsFileStats.telescope).all()
+
+    total_time = 0
+    by_year_raw, by_telescope_raw, by_camera_raw = {}, {}, {}
+    for year, camera, telescope, time in rows:
+        time = time or 0
+        total_time += time
+        if year:
+            by_year_raw[year] = by_year_raw.get(year, 0) + time
+        if telescope:
+            by_telescope_raw[telescope] = by_telescope_raw.get(telescope, 0) + time
+        if camera:
+            by_camera_raw[camera] = by_camera_raw.get(camera, 0) + time
+
+    by_year = {year: format_integration_time(time) for year, time in sorted(by_year_raw.items())}
+    by_telescope = {tel: format_integration_time(time) for tel, time in
+                    sorted(by_telescope_raw.items(), key=lambda x: x[1], reverse=True)}
+    by_camera = {cam: format_integration_time(time) for cam, time in
+                 sorted(by_camera_raw.items(), key=lambda x: x[1], reverse=True)}
 
     # Generate charts with consistent physical dimensions for visual alignment
     chart_by_year = generate_integration_time_chart(by_year, "Integration Time by Year")
@@ -304,51 +293,21 @@ def calculate_integration_time_stats(session):
 
 def calculate_object_count_stats(session):
     """Calculate object count statistics for LIGHT frames."""
+    distinct_objects = func.count(distinct(FitsObjectStats.object))
+
     # Total unique objects
-    total_objects = session.query(func.count(distinct(FitsFile.object))).filter(
-        FitsFile.frame_type == 'LIGHT',
-        FitsFile.object.isnot(None),
-        FitsFile.object != ''
-    ).scalar() or 0
-
-    # By year
-    by_year_raw = session.query(
-        func.substr(FitsFile.obs_date, 1, 4).label('year'),
-        func.count(distinct(FitsFile.object)).label('count')
-    ).filter(
-        FitsFile.frame_type == 'LIGHT',
-        FitsFile.object.isnot(None),
-        FitsFile.object != '',
-        FitsFile.obs_date.isnot(None)
-    ).group_by('year').order_by('year').all()
-
-    by_year = {year: count for year, count in by_year_raw if year}
-
-    # By telescope
-    by_telescope_raw = session.query(
-        FitsFile.telescope,
-        func.count(distinct(FitsFile.object)).label('count')
-    ).filter(
-        FitsFile.frame_type == 'LIGHT',
-        FitsFile.object.isnot(None),
-        FitsFile.object != '',
-        FitsFile.telescope.isnot(None)
-    ).group_by(FitsFile.telescope).order_by(func.count(distinct(FitsFile.object)).desc()).all()
-
-    by_telescope = {tel: count for tel, count in by_telescope_raw if tel}
-
-    # By camera
-    by_camera_raw = session.query(
-        FitsFile.camera,
-        func.count(distinct(FitsFile.object)).label('count')
-    ).filter(
-        FitsFile.frame_type == 'LIGHT',
-        FitsFile.object.isnot(None),
-        FitsFile.object != '',
-        FitsFile.camera.isnot(None)
-    ).group_by(FitsFile.camera).order_by(func.count(distinct(FitsFile.object)).desc()).all()
+    total_objects = session.query(distinct_objects).scalar() or 0
+
+    def count_by(column):
+        return {
+            key: count for key, count in session.query(column, distinct_objects).filter(
+                column != ''
+            ).group_by(column).order_by(distinct_objects.desc()).all()
+        }
 
-    by_camera = {cam: count for cam, count in by_camera_raw if cam}
+    by_year = dict(sorted(count_by(FitsObjectStats.obs_year).items()))
+    by_telescope = count_by(FitsObjectStats.telescope)
+    by_camera = count_by(FitsObjectStats.camera)
 
     # Generate charts with consistent physical dimensions for visual alignment
     chart_by_year = generate_object_count_chart(by_year, "Object Count by Year")
@@ -374,44 +333,27 @@ def calculate_new_sessions_stats(session, config):
 
     def get_stats_for_period(start_date):
         """Get stats for a specific time period based on observation date."""
+        start_day = start_date.strftime('%Y-%m-%d')
+
         # Count imaging sessions by date (observation date)
         session_count = session.query(ImagingSession).filter(
-            ImagingSession.date >= start_date.strftime('%Y-%m-%d')
+            ImagingSession.date >= start_day
         ).count()
 
-        # Count frames by type based on observation date
-        frame_counts = session.query(
-            FitsFile.frame_type,
-            func.count(FitsFile.id).label('count')
+        # Frame counts, LIGHT integration time and size on disk per frame
+        # type for this observation period (unknown dates are '' and sort first)
+        rows = session.query(
+            FitsFileStats.frame_type,
+            func.sum(FitsFileStats.file_count),
+            func.sum(FitsFileStats.total_exposure),
+            func.sum(FitsFileStats.total_size)
         ).filter(
-            FitsFile.obs_date >= start_date.strftime('%Y-%m-%d'),
-            FitsFile.obs_date.isnot(None)
-        ).group_by(FitsFile.frame_type).all()
-
-        frame_dict = {ft: count for ft, count in frame_counts}
-
-        # Total integration time for LIGHT frames based on observation date
-        integration_time = session.query(func.sum(FitsFile.exposure)).filter(
-            FitsFile.frame_type == 'LIGHT',
-            FitsFile.obs_date >= start_date.strftime('%Y-%m-%d'),
-            FitsFile.obs_date.isnot(None)
-        ).scalar() or 0
+            FitsFileStats.obs_day >= start_day
+        ).group_by(FitsFileStats.frame_type).all()
 
-        # Calculate actual file sizes for files from this observation period
-        # This is reasonable since we're only looking at recent observations
-        files = session.query(FitsFile.folder, FitsFile.file).filter(
-            FitsFile.obs_date >= start_date.strftime('%Y-%m-%d'),
-            FitsFile.obs_date.isnot(None)
-        ).all()
-
-        total_size = 0
-        for folder, filename in files:
-            try:
-                file_path = Path(folder) / filename
-                if file_path.exists():
-                    total_size += file_path.stat().st_size
-            except Exception as e:
-                logger.debug(f"Could not get size for {folder}/{filename}: {e}")
+        frame_dict = {_stats_key(ft): count for ft, count, _, _ in rows}
+        integration_time = sum(exposure or 0 for ft, _, exposure, _ in rows if ft == 'LIGHT')
+        total_size = sum(size or 0 for _, _, _, size in rows)
 
         return {
             "session_count": session_count,
@@ -517,58 +459,51 @@ def calculate_disk_space_stats(session, config):
 
 
 @router.get("/stats")
-async def get_stats(db_service = Depends(get_db_service), config = Depends(get_config)):
+def get_stats(db_service = Depends(get_db_service), config = Depends(get_config)):
     """Get comprehensive database and file statistics."""
     try:
         session = db_service.db_manager.get_session()
         
-        # Existing database queries
-        total_files = session.query(FitsFile).count()
+        # Catalog-wide counts from the trigger-maintained stats table
+        totals = session.query(
+            func.sum(FitsFileStats.file_count),
+            func.sum(FitsFileStats.review_count),
+            func.sum(FitsFileStats.manual_count),
+            func.sum(FitsFileStats.unscored_count),
+            func.sum(FitsFileStats.missing_count)
+        ).one()
+        total_files, needs_review, manual_only, no_score, missing_files = (value or 0 for value in totals)
+        
         recent_files = session.query(FitsFile).filter(
             FitsFile.created_at >= (datetime.now() - timedelta(days=7))
         ).count()
         
-        # Validation score groups (only for files still in quarantine)
+        # Validation score groups (only for files still in quarantine); the
+        # folder range only touches quarantined rows
+        in_quarantine = FitsFile.in_folder_tree(config.paths.quarantine_dir)
         auto_migrate = session.query(FitsFile).filter(
             FitsFile.validation_score >= 95,
-            FitsFile.folder.like(f"%{config.paths.quarantine_dir}%")
-        ).count()
-        
-        needs_review = session.query(FitsFile).filter(
-            FitsFile.validation_score.between(80, 95)
-        ).count()
-        
-        manual_only = session.query(FitsFile).filter(
-            FitsFile.validation_score < 80,
-            FitsFile.validation_score > 0
-        ).count()
-        
-        no_score = session.query(FitsFile).filter(
-            FitsFile.validation_score.is_(None)
+            in_quarantine
         ).count()
         
         # Registered files (migrated out of quarantine to library)
-        registered_files = session.query(FitsFile).filter(
-            ~FitsFile.folder.like(f"%{config.paths.quarantine_dir}%")
-        ).count()
+        registered_files = total_files - session.query(FitsFile).filter(in_quarantine).count()
+        
+        def count_by(column, limit=None):
+            count = func.sum(FitsFileStats.file_count)
+            query = session.query(column, count).group_by(column).order_by(count.desc())
+            if limit:
+                query = query.limit(limit)
+            return [(_stats_key(key), value) for key, value in query.all()]
         
         # Frame type counts
-        frame_type_counts = session.query(
-            FitsFile.frame_type, 
-            func.count(FitsFile.id)
-        ).group_by(FitsFile.frame_type).all()
+        frame_type_counts = count_by(FitsFileStats.frame_type)
         
         # Camera counts
-        camera_counts = session.query(
-            FitsFile.camera, 
-            func.count(FitsFile.id)
-        ).group_by(FitsFile.camera).limit(10).all()
+        camera_counts = count_by(FitsFileStats.camera, limit=10)
         
         # Telescope counts
-        telescope_counts = session.query(
-            FitsFile.telescope, 
-            func.count(FitsFile.id)
-        ).group_by(FitsFile.telescope).limit(10).all()
+        telescope_counts = count_by(FitsFileStats.telescope, limit=10)
         
         # Processing session stats
         total_processing = session.query(ProcessingSession).count()
@@ -591,48 +526,14 @@ async def get_stats(db_service = Depends(get_db_service), config = Depends(get_c
         # Staged files (in processing sessions)
         staged_files = session.query(ProcessingSessionFile).count()
         
-        # Database-based cleanup stats (for missing files)
-        missing_files = session.query(FitsFile).filter(
-            FitsFile.file_not_found == True
-        ).count()
-        
         # Orphaned records
         orphaned = db_service.get_orphaned_records()
         
-        # **NEW: Physical file counts for quarantine, duplicates, and bad files**
-        quarantine_path = Path(config.paths.quarantine_dir)
-        duplicates_path = quarantine_path / "Duplicates"
-        bad_files_path = quarantine_path / "Bad"
-        
-        # Count files in main quarantine (excluding Duplicates and Bad subfolders)
-        quarantine_files = 0
-        if quarantine_path.exists():
-            extensions = ['.fits', '.fit', '.fts']
-            for ext in extensions:
-                # Get all files with this extension in quarantine
-                all_files = list(quarantine_path.glob(f"*{ext}"))
-                all_files.extend(list(quarantine_path.glob(f"*{ext.upper()}")))
-                
-                # Filter out files in Duplicates or Bad subfolders
-                quarantine_files += len([
-                    f for f in all_files 
-                    if 'Duplicates' not in str(f) and 'Bad' not in str(f)
-                ])
-        
-        # Count physical duplicate files
-        duplicates_count = count_physical_files_in_folder(duplicates_path)
-        
-        # Count physical bad files
-        bad_files_count = count_physical_files_in_folder(bad_files_path)
-        
-        # Database duplicate detection (files with same MD5)
-        db_duplicates = session.query(FitsFile).filter(
-            FitsFile.md5sum.in_(
-                session.query(FitsFile.md5sum)
-                .group_by(FitsFile.md5sum)
-                .having(func.count(FitsFile.id) > 1)
-            )
-        ).count()
+        # Physical quarantine/duplicate/bad file counts and MD5 duplicates,
+        # refreshed after catalog operations rather than per request
+        cleanup = dashboard_cache.get_cached_cleanup()
+        if cleanup is None:
+            cleanup = dashboard_cache.calculate_and_cache_cleanup(session, config)
         
         # Calculate new statistics
         integration_time_stats = calculate_integration_time_stats(session)
@@ -668,13 +569,13 @@ async def get_stats(db_service = Depends(get_db_service), config = Depends(get_c
                 "unique_telescopes": unique_telescopes_in_sessions
             },
             "cleanup": {
-                "duplicates": duplicates_count,  # Physical files in Duplicates folder
-                "bad_files": bad_files_count,     # Physical files in Bad folder
-                "missing_files": missing_files,   # DB records with file_not_found=True
-                "db_duplicates": db_duplicates    # DB records that are duplicates (same MD5)
+                "duplicates": cleanup["duplicates"],        # Physical files in Duplicates folder
+                "bad_files": cleanup["bad_files"],          # Physical files in Bad folder
+                "missing_files": missing_files,             # DB records with file_not_found=True
+                "db_duplicates": cleanup["db_duplicates"]   # DB records that are duplicates (same MD5)
             },
             "orphaned": orphaned,
-            "quarantine_files": quarantine_files,  # Physical files in main quarantine
+            "quarantine_files": cleanup["quarantine_files"],  # Physical files in main quarantine
             "staged_files": staged_files,
             "integration_time": integration_time_stats,
             "object_counts": object_count_stats,
@@ -689,7 +590,7 @@ async def get_stats(db_service = Depends(get_db_service), config = Depends(get_c
 
 
 @router.post("/stats/refresh-disk-cache")
-async def refresh_disk_cache(db_service = Depends(get_db_service), config = Depends(get_config)):
+def refresh_disk_cache(db_service = Depends(get_db_service), config = Depends(get_config)):
     """
     Manually refresh the disk space cache.
 
@@ -699,8 +600,9 @@ async def refresh_disk_cache(db_service = Depends(get_db_service), config = Depe
         session = db_service.db_manager.get_session()
         logger.info("Manual disk cache refresh requested")
 
-        # Recalculate and cache disk space stats
+        # Recalculate and cache disk space stats and cleanup counts
         disk_stats = dashboard_cache.calculate_and_cache_disk_space(session, config)
+        dashboard_cache.calculate_and_cache_cleanup(session, config)
 
         session.close()
 